@@ -0,0 +1,27 @@
+"""leaderboard rank index
+
+Revision ID: 20261017_000003
+Revises: 20250927_000002
+Create Date: 2026-10-17 09:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261017_000003'
+down_revision = '20250927_000002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # matches ORDER BY accuracy_score DESC, total_predictions DESC, user_address
+    op.create_index(
+        'ix_leaderboard_rank',
+        'leaderboard',
+        [sa.text('accuracy_score DESC'), sa.text('total_predictions DESC'), 'user_address'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leaderboard_rank', table_name='leaderboard')
@@ -0,0 +1,36 @@
+"""add predictions table
+
+Revision ID: 20261017_000004
+Revises: 20261017_000003
+Create Date: 2026-10-17 10:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261017_000004'
+down_revision = '20261017_000003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'predictions',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('user_address', sa.String(length=42), nullable=False),
+        sa.Column('user_prediction', sa.Float(), nullable=False),
+        sa.Column('ai_prediction', sa.Float(), nullable=False),
+        sa.Column('ai_reasoning', sa.Text(), nullable=False),
+        sa.Column('transaction_hash', sa.String(length=66), nullable=False),
+        sa.Column('market_price', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_predictions_user_address', 'predictions', ['user_address'])
+    op.create_index('ix_predictions_created_at', 'predictions', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_predictions_created_at', table_name='predictions')
+    op.drop_index('ix_predictions_user_address', table_name='predictions')
+    op.drop_table('predictions')
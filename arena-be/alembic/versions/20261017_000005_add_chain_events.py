@@ -0,0 +1,46 @@
+"""add chain events and indexer checkpoints
+
+Revision ID: 20261017_000005
+Revises: 20261017_000004
+Create Date: 2026-10-17 12:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261017_000005'
+down_revision = '20261017_000004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'chain_events',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('block_number', sa.BigInteger(), nullable=False),
+        sa.Column('block_hash', sa.String(length=66), nullable=False),
+        sa.Column('transaction_hash', sa.String(length=66), nullable=False),
+        sa.Column('log_index', sa.Integer(), nullable=False),
+        sa.Column('event', sa.String(length=32), nullable=False),
+        sa.Column('user_address', sa.String(length=42), nullable=True),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('event_timestamp', sa.BigInteger(), nullable=False),
+        sa.UniqueConstraint('transaction_hash', 'log_index', name='uq_chain_events_log'),
+    )
+    op.create_index('ix_chain_events_block_number', 'chain_events', ['block_number'])
+    op.create_index('ix_chain_events_user_address', 'chain_events', ['user_address'])
+    op.create_table(
+        'indexer_checkpoints',
+        sa.Column('name', sa.String(length=64), primary_key=True),
+        sa.Column('block_number', sa.BigInteger(), nullable=False),
+        sa.Column('block_hash', sa.String(length=66), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('indexer_checkpoints')
+    op.drop_index('ix_chain_events_user_address', table_name='chain_events')
+    op.drop_index('ix_chain_events_block_number', table_name='chain_events')
+    op.drop_table('chain_events')
@@ -0,0 +1,37 @@
+"""unique leaderboard address and scored rounds
+
+Revision ID: 20261017_000006
+Revises: 20261017_000005
+Create Date: 2026-10-17 14:00:00
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261017_000006'
+down_revision = '20261017_000005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # keep the oldest row per address; the ranking index already ignored the others
+    op.execute(
+        "DELETE FROM leaderboard WHERE id NOT IN "
+        "(SELECT MIN(id) FROM leaderboard GROUP BY user_address)"
+    )
+    op.drop_index('ix_leaderboard_user_address', table_name='leaderboard')
+    op.create_index('ix_leaderboard_user_address', 'leaderboard', ['user_address'], unique=True)
+    op.create_table(
+        'scored_rounds',
+        sa.Column('round_id', sa.String(length=66), primary_key=True),
+        sa.Column('actual_value', sa.Float(), nullable=False),
+        sa.Column('participants', sa.Integer(), nullable=False),
+        sa.Column('scored_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scored_rounds')
+    op.drop_index('ix_leaderboard_user_address', table_name='leaderboard')
+    op.create_index('ix_leaderboard_user_address', 'leaderboard', ['user_address'])
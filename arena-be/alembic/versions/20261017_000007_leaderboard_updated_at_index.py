@@ -0,0 +1,22 @@
+"""leaderboard updated_at index
+
+Revision ID: 20261017_000007
+Revises: 20261017_000006
+Create Date: 2026-10-17 18:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261017_000007'
+down_revision = '20261017_000006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # incremental leaderboard reloads: WHERE updated_at >= <newest seen>
+    op.create_index('ix_leaderboard_updated_at', 'leaderboard', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leaderboard_updated_at', table_name='leaderboard')
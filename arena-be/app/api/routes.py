@@ -1,11 +1,26 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Path, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+
+from app import services  # attribute access builds each service on first use
+from app.middleware.rate_limit import ROUTE_COSTS, charge_more
 from app.schemas import (
+    RESOLUTIONS,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    ChainPredictionOut,
+    LeaderboardOut,
     PredictionRequest,
     PredictionResponse,
+    PriceHistoryOut,
     PriceOut,
-    LeaderboardOut,
+    RankOut,
+    TxStatusOut,
 )
-from app.services import price, ml, gemini, blockchain, leaderboard
+from app.utils.responses import PreparedJSONResponse, dumps
 from config import get_settings
 
 settings = get_settings()
@@ -15,65 +30,153 @@ router = APIRouter()
 @router.get("/price", response_model=PriceOut)
 async def get_price():
     try:
-        return await price.get_eth_price()
+        return PreparedJSONResponse(await services.price.get_eth_price_json())
+    except Exception as e:
+        raise HTTPException(500, str(e))
+
+@router.get("/price/history", response_model=PriceHistoryOut)
+async def get_price_history(
+    resolution: str = Query("1h", pattern="^(" + "|".join(RESOLUTIONS) + ")$"),
+    limit: int = Query(200, ge=1, le=1000),
+):
+    try:
+        return await services.price.get_history(resolution, limit)
     except Exception as e:
         raise HTTPException(500, str(e))
 
 @router.post("/predict", response_model=PredictionResponse)
 async def predict(req: PredictionRequest):
     try:
-        market = await price.get_eth_price()
-        ai_pred = await ml.predict_future_price(days_ahead=7)
-        reasoning = await gemini.analyze_market_sentiment(market, ai_pred)
-        tx_hash = blockchain.store_prediction(
-            req.user_address, req.prediction_value, ai_pred
-        )
-        return PredictionResponse(
-            user_prediction=req.prediction_value,
-            ai_prediction=ai_pred,
-            ai_reasoning=reasoning,
-            transaction_hash=tx_hash,
-            market_data=market,
-            timestamp=market["timestamp"],
-        )
+        result = await services.prediction.predict(req)
+        # already a validated PredictionResponse: encode it directly
+        return PreparedJSONResponse(dumps(result.model_dump()))
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "Prediction pipeline timed out")
     except Exception as e:
         raise HTTPException(500, str(e))
 
+@router.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(req: BatchPredictionRequest, request: Request):
+    # the pipeline charged one item's cost up front; the other items pay the same
+    refused = await charge_more(
+        request.scope, (len(req.items) - 1) * ROUTE_COSTS.get(request.url.path, 1)
+    )
+    if refused is not None:
+        return refused
+    try:
+        return await services.prediction.predict_batch(req.items)
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "Prediction pipeline timed out")
+    except Exception as e:
+        raise HTTPException(500, str(e))
+
+def _topics(spec: str) -> List[str]:
+    from app.services.stream_service import TOPICS
+
+    topics = [t.strip() for t in spec.split(",") if t.strip()]
+    unknown = set(topics) - set(TOPICS)
+    if unknown or not topics:
+        raise HTTPException(400, f"topics must be a subset of {','.join(TOPICS)}")
+    return topics
+
+@router.get("/stream")
+async def stream_events(topics: str = "price,leaderboard"):
+    """Server-sent events: a snapshot per topic, then live updates."""
+    return StreamingResponse(
+        services.stream.sse(_topics(topics)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def stream_websocket(websocket: WebSocket, topics: str = "price,leaderboard"):
+    try:
+        selected = _topics(topics)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await services.stream.websocket(websocket, selected)
+
+@router.get("/tx/{transaction_hash}", response_model=TxStatusOut)
+async def get_tx_status(transaction_hash: str):
+    try:
+        status = await services.blockchain.receipt_status(transaction_hash)
+    except Exception as e:
+        raise HTTPException(500, str(e))
+    if status is None:
+        raise HTTPException(404, "Unknown transaction")
+    return {"transaction_hash": transaction_hash, "status": status}
+
+@router.get("/chain/predictions/{user_address}", response_model=List[ChainPredictionOut])
+async def get_chain_predictions(user_address: str = Path(..., pattern=r"^0x[a-fA-F0-9]{40}$")):
+    # served from the indexed chain_events table, no RPC
+    from app.services.blockchain_service import VALUE_SCALE
+
+    try:
+        events = await services.indexer.predictions_for(user_address)
+    except Exception as e:
+        raise HTTPException(500, str(e))
+    return [
+        {
+            "user_address": e.user_address,
+            "value": e.value / VALUE_SCALE,
+            "block_number": e.block_number,
+            "transaction_hash": e.transaction_hash,
+            "timestamp": datetime.utcfromtimestamp(e.event_timestamp),
+        }
+        for e in events
+    ]
+
 @router.get("/leaderboard", response_model=LeaderboardOut)
-async def get_leaderboard():
+async def get_leaderboard(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    try:
+        return PreparedJSONResponse(await services.leaderboard.get_leaderboard_json(limit, cursor))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except Exception as e:
+        raise HTTPException(500, str(e))
+
+@router.get("/leaderboard/rank/{user_address}", response_model=RankOut)
+async def get_rank(user_address: str):
     try:
-        return await leaderboard.get_leaderboard()
+        row = await services.leaderboard.get_rank(user_address)
     except Exception as e:
         raise HTTPException(500, str(e))
+    if row is None:
+        raise HTTPException(404, "Address not ranked")
+    return row
 
 
 # Optional user registration endpoints (feature-flagged)
 if settings.enable_user_registration:
-    from app.schemas import UserCreate, UserOut  # local import to avoid unused when disabled
-    from app.db.session import SessionLocal
+    from sqlalchemy import select
+
     from app.db.models import User
+    from app.db.session import AsyncSessionLocal
+    from app.schemas import UserCreate, UserOut  # local import to avoid unused when disabled
 
     @router.post("/users/register", response_model=UserOut)
     async def register_user(payload: UserCreate):
         try:
-            with SessionLocal() as db:
-                existing = (
-                    db.query(User)
-                    .filter(User.user_address == payload.user_address)
-                    .one_or_none()
+            async with AsyncSessionLocal() as db:
+                existing = await db.scalar(
+                    select(User).where(User.user_address == payload.user_address)
                 )
                 if existing:
                     # update nickname if provided
                     if payload.nickname is not None and payload.nickname != existing.nickname:
                         existing.nickname = payload.nickname
-                        db.commit()
-                        db.refresh(existing)
+                        await db.commit()
+                        await db.refresh(existing)
                     user = existing
                 else:
                     user = User(user_address=payload.user_address, nickname=payload.nickname)
                     db.add(user)
-                    db.commit()
-                    db.refresh(user)
+                    await db.commit()
+                    await db.refresh(user)
                 return UserOut(
                     id=user.id,
                     user_address=user.user_address,
@@ -86,8 +189,8 @@ if settings.enable_user_registration:
     @router.get("/users/{user_address}", response_model=UserOut)
     async def get_user(user_address: str):
         try:
-            with SessionLocal() as db:
-                user = db.query(User).filter(User.user_address == user_address).one_or_none()
+            async with AsyncSessionLocal() as db:
+                user = await db.scalar(select(User).where(User.user_address == user_address))
                 if not user:
                     raise HTTPException(404, "User not found")
                 return UserOut(
@@ -0,0 +1,49 @@
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Union
+
+from sqlalchemy import FromClause
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# column names to overwrite with the incoming values, or a function of the
+# `excluded` pseudo-table returning {column: expression} (e.g. running totals)
+Update = Union[Iterable[str], Callable[[Any], Dict[str, Any]]]
+
+
+def _insert(dialect: str) -> Callable[[Any], Any]:
+    if dialect == "postgresql":
+        from sqlalchemy.dialects import postgresql
+
+        return postgresql.insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects import sqlite
+
+        return sqlite.insert
+    raise NotImplementedError(f"upsert not supported on {dialect}")
+
+
+async def upsert(
+    conn: AsyncConnection,
+    table: FromClause,  # a model's __table__
+    rows: List[dict],
+    keys: Sequence[str],
+    update: Update = (),
+    returning: Sequence[Any] = (),
+) -> List[Any]:
+    """Multi-row INSERT ... ON CONFLICT (keys) in one statement.
+
+    Conflicting rows are skipped, or updated per `update`. `keys` must match a
+    unique index. Returns the `returning` columns of every inserted or updated
+    row (empty when nothing is requested).
+    """
+    if not rows:
+        return []
+    stmt = _insert(conn.dialect.name)(table)
+    set_ = update(stmt.excluded) if callable(update) else {c: stmt.excluded[c] for c in update}
+    if set_:
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=set_)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(keys))
+    if returning:
+        stmt = stmt.returning(*returning)
+        return list((await conn.execute(stmt, rows)).all())
+    await conn.execute(stmt, rows)
+    return []
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Integer, Float, DateTime, UniqueConstraint
 
 
 class Base(DeclarativeBase):
@@ -12,16 +13,27 @@ class LeaderboardEntry(Base):
     __tablename__ = "leaderboard"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_address: Mapped[str] = mapped_column(String(42), index=True, nullable=False)
+    # one aggregate row per address; the scoring engine upserts on it
+    user_address: Mapped[str] = mapped_column(String(42), index=True, unique=True, nullable=False)
     accuracy_score: Mapped[float] = mapped_column(Float, nullable=False)
     total_predictions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     avg_error: Mapped[float] = mapped_column(Float, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # indexed: leaderboard reloads read only rows updated since the last one
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
 
 
+# Serves the leaderboard ordering (and keyset scans) without a sort
+Index(
+    "ix_leaderboard_rank",
+    LeaderboardEntry.accuracy_score.desc(),
+    LeaderboardEntry.total_predictions.desc(),
+    LeaderboardEntry.user_address,
+)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -36,3 +48,59 @@ class User(Base):
     __table_args__ = (
         UniqueConstraint('user_address', name='uq_users_user_address'),
     )
+
+
+class Prediction(Base):
+    __tablename__ = "predictions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_address: Mapped[str] = mapped_column(String(42), index=True, nullable=False)
+    user_prediction: Mapped[float] = mapped_column(Float, nullable=False)
+    ai_prediction: Mapped[float] = mapped_column(Float, nullable=False)
+    ai_reasoning: Mapped[str] = mapped_column(Text, nullable=False)
+    transaction_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    market_price: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ChainEvent(Base):
+    """PredictionArena log decoded by the event indexer (one row per log)."""
+
+    __tablename__ = "chain_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, index=True, nullable=False)
+    block_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    transaction_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    log_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    event: Mapped[str] = mapped_column(String(32), nullable=False)
+    user_address: Mapped[Optional[str]] = mapped_column(String(42), index=True, nullable=True)
+    # contract values are scaled integers (price * 100)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    event_timestamp: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('transaction_hash', 'log_index', name='uq_chain_events_log'),
+    )
+
+
+class IndexerCheckpoint(Base):
+    __tablename__ = "indexer_checkpoints"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    block_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class ScoredRound(Base):
+    """Resolved rounds already folded into the leaderboard (scoring is exactly-once)."""
+
+    __tablename__ = "scored_rounds"
+
+    round_id: Mapped[str] = mapped_column(String(66), primary_key=True)
+    actual_value: Mapped[float] = mapped_column(Float, nullable=False)
+    participants: Mapped[int] = mapped_column(Integer, nullable=False)
+    scored_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
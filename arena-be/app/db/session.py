@@ -1,8 +1,61 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from app.utils.metrics_store import exporter
 from config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# DATABASE_URL stays sync-style for Alembic; the app swaps in the async driver
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "DB connections currently checked out",
+    multiprocess_mode="livesum",
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+def async_url(url: str) -> URL:
+    u = make_url(url)
+    driver = ASYNC_DRIVERS.get(u.get_backend_name())
+    return u.set(drivername=driver) if driver else u
+
+
+def _create_engine():
+    url = async_url(settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        # SQLite connections are cheap and must not outlive the loop they were opened on
+        return create_async_engine(url, poolclass=NullPool)
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=True,
+    )
+
+
+engine = _create_engine()
+AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+exporter.set_function(POOL_IN_USE, lambda: getattr(engine.pool, "checkedout", lambda: 0)())
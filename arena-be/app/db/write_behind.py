@@ -0,0 +1,127 @@
+import asyncio
+import time
+from typing import List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import Table, insert
+
+from app.db.session import engine
+from app.utils.logger import logger
+
+WRITE_BEHIND_ROWS = Counter(
+    "write_behind_rows_total",
+    "Rows handled by write-behind queues",
+    ["table", "outcome"],  # written | dropped | failed
+)
+WRITE_BEHIND_PENDING = Gauge(
+    "write_behind_pending_rows",
+    "Rows waiting to be flushed",
+    ["table"],
+    multiprocess_mode="livesum",
+)
+WRITE_BEHIND_FLUSH = Histogram(
+    "write_behind_flush_seconds",
+    "Duration of one bulk flush",
+    ["table"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+class WriteBehindQueue:
+    """Buffers rows for one table and writes them as a single multi-row INSERT.
+
+    A flush runs when `batch_size` rows are pending or every `flush_interval`
+    seconds, whichever comes first; `stop()` drains what is left. `enqueue` never
+    touches the DB. Once `max_pending` rows are buffered (DB down or too slow),
+    the oldest rows are dropped and counted rather than growing without bound.
+    """
+
+    def __init__(self, table: Table, batch_size: int, flush_interval: float, max_pending: int):
+        self.table = table
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self._pending: List[dict] = []
+        self._flushing: Optional[asyncio.Task] = None
+        self._ticker: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, row: dict) -> None:
+        self._pending.append(row)
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            WRITE_BEHIND_ROWS.labels(table=self.table.name, outcome="dropped").inc(overflow)
+        WRITE_BEHIND_PENDING.labels(table=self.table.name).set(len(self._pending))
+        if len(self._pending) >= self.batch_size:
+            self._kick()
+
+    async def start(self) -> None:
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._tick())
+
+    async def stop(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+        await self._quietly(self.flush)
+
+    async def flush(self) -> int:
+        # let a size-triggered flush finish first so rows are written in order
+        task = self._flushing
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            await asyncio.shield(task)
+        return await self._drain()
+
+    async def _drain(self) -> int:
+        written = 0
+        while self._pending:
+            written += await self._write_batch()
+        return written
+
+    def _kick(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop (e.g. sync caller); the ticker or stop() will flush
+        task = self._flushing
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._flushing = loop.create_task(self._quietly(self._drain))
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._quietly(self.flush)
+
+    async def _quietly(self, step) -> None:
+        try:
+            await step()
+        except Exception:
+            pass  # logged in _write_batch; rows stay pending for the next attempt
+
+    async def _write_batch(self) -> int:
+        batch = self._pending[: self.batch_size]
+        del self._pending[: len(batch)]
+        WRITE_BEHIND_PENDING.labels(table=self.table.name).set(len(self._pending))
+        if not batch:
+            return 0
+        start = time.perf_counter()
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(self.table), batch)
+        except Exception as e:
+            # put the rows back in front; the overflow bound in enqueue still applies
+            self._pending[:0] = batch
+            WRITE_BEHIND_ROWS.labels(table=self.table.name, outcome="failed").inc(len(batch))
+            WRITE_BEHIND_PENDING.labels(table=self.table.name).set(len(self._pending))
+            logger.error(f"Write-behind insert failed ({self.table.name}, {len(batch)} rows): {e}")
+            raise
+        WRITE_BEHIND_FLUSH.labels(table=self.table.name).observe(time.perf_counter() - start)
+        WRITE_BEHIND_ROWS.labels(table=self.table.name, outcome="written").inc(len(batch))
+        return len(batch)
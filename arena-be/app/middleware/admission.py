@@ -0,0 +1,185 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Tuple
+
+from prometheus_client import Counter, Gauge
+from starlette.responses import JSONResponse
+
+from app.middleware.rate_limit import parse_costs
+from config import get_settings
+
+settings = get_settings()
+
+# priority classes, highest first; critical requests are never queued or shed
+PRIORITIES = {"critical": 0, "normal": 1, "low": 2}
+CRITICAL = PRIORITIES["critical"]
+NAMES = {v: k for k, v in PRIORITIES.items()}
+
+ADMISSION_INFLIGHT = Gauge(
+    "admission_inflight",
+    "Admitted requests still running",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for a slot",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Requests answered 503 by admission control",
+    ["priority", "reason"],  # queue_full | timeout
+)
+
+
+class Ticket(NamedTuple):
+    admitted: bool
+    priority: int
+    path: str
+    waited: float  # seconds spent queued
+
+
+class AdmissionController:
+    """Per-worker concurrency limits with bounded, prioritized wait queues.
+
+    A request may start when its route is under its own limit (if it has one)
+    and the worker is under `max_inflight`. Otherwise it waits in its class
+    queue for at most `queue_timeout` seconds. A full queue or an expired wait
+    sheds the request with a 503. Freed slots go to the highest-priority
+    waiter that can run, FIFO within a class. Critical routes (health,
+    metrics, long-lived streams) bypass all of this. `max_inflight <= 0`
+    disables admission control.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int,
+        queue_size: int,
+        queue_timeout: float,
+        route_limits: Dict[str, int],
+        priorities: Dict[str, int],
+    ):
+        self.max_inflight = max_inflight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.route_limits = route_limits
+        self.priorities = priorities
+        self.inflight = 0
+        self._route_inflight: Dict[str, int] = {path: 0 for path in route_limits}
+        # per class: waiters in arrival order; entries whose wait ended are skipped lazily
+        self._queues: List[Deque[Tuple["asyncio.Future[None]", str]]] = [
+            deque() for _ in PRIORITIES
+        ]
+        self._queued = [0] * len(PRIORITIES)
+
+    def priority(self, path: str) -> int:
+        return self.priorities.get(path, PRIORITIES["normal"])
+
+    def queued(self, priority: int) -> int:
+        return self._queued[priority]
+
+    async def acquire(self, path: str) -> Ticket:
+        priority = self.priority(path)
+        if priority == CRITICAL or self.max_inflight <= 0:
+            return Ticket(True, CRITICAL, path, 0.0)
+        if self._can_run(path):
+            self._take(priority, path)
+            return Ticket(True, priority, path, 0.0)
+        if self._queued[priority] >= self.queue_size:
+            ADMISSION_SHED.labels(priority=NAMES[priority], reason="queue_full").inc()
+            return Ticket(False, priority, path, 0.0)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._queues[priority].append((fut, path))
+        self._set_queued(priority, 1)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout)
+        except asyncio.TimeoutError:
+            ADMISSION_SHED.labels(priority=NAMES[priority], reason="timeout").inc()
+            return Ticket(False, priority, path, time.perf_counter() - start)
+        except asyncio.CancelledError:  # client went away while queued
+            if fut.done() and not fut.cancelled():
+                self.release(Ticket(True, priority, path, 0.0))  # granted in the meantime
+            raise
+        finally:
+            if not fut.done() or fut.cancelled():
+                self._set_queued(priority, -1)
+        return Ticket(True, priority, path, time.perf_counter() - start)
+
+    def release(self, ticket: Ticket) -> None:
+        if not ticket.admitted or ticket.priority == CRITICAL or self.max_inflight <= 0:
+            return
+        self.inflight -= 1
+        if ticket.path in self._route_inflight:
+            self._route_inflight[ticket.path] -= 1
+        ADMISSION_INFLIGHT.labels(priority=NAMES[ticket.priority]).dec()
+        self._dispatch()
+
+    def _can_run(self, path: str) -> bool:
+        if self.inflight >= self.max_inflight:
+            return False
+        limit = self.route_limits.get(path)
+        return limit is None or self._route_inflight[path] < limit
+
+    def _take(self, priority: int, path: str) -> None:
+        self.inflight += 1
+        if path in self._route_inflight:
+            self._route_inflight[path] += 1
+        ADMISSION_INFLIGHT.labels(priority=NAMES[priority]).inc()
+
+    def _set_queued(self, priority: int, delta: int) -> None:
+        self._queued[priority] += delta
+        ADMISSION_QUEUED.labels(priority=NAMES[priority]).set(self._queued[priority])
+
+    def _dispatch(self) -> None:
+        # slots are taken here, before the waiter wakes, so no arrival can steal them
+        for priority, waiters in enumerate(self._queues):
+            blocked: Deque[Tuple["asyncio.Future[None]", str]] = deque()
+            while waiters and self.inflight < self.max_inflight:
+                fut, path = waiters.popleft()
+                if fut.done():  # timed out or cancelled
+                    continue
+                if not self._can_run(path):  # its route is full; others in the class may run
+                    blocked.append((fut, path))
+                    continue
+                self._take(priority, path)
+                self._set_queued(priority, -1)
+                fut.set_result(None)
+            blocked.extend(waiters)
+            self._queues[priority] = blocked
+
+
+def shed_response() -> JSONResponse:
+    retry_after = max(1, math.ceil(settings.admission_retry_after))
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, retry later", "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def parse_priorities(spec: str) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for item in spec.split(","):
+        path, _, name = item.strip().partition("=")
+        if path and name:
+            out[path.strip()] = PRIORITIES[name.strip()]
+    return out
+
+
+def build_admission() -> AdmissionController:
+    return AdmissionController(
+        settings.admission_max_inflight,
+        settings.admission_queue_size,
+        settings.admission_queue_timeout,
+        parse_costs(settings.admission_route_limits),
+        parse_priorities(settings.admission_priorities),
+    )
+
+
+admission = build_admission()
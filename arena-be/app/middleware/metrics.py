@@ -1,7 +1,3 @@
-import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
 from prometheus_client import Counter, Histogram
 
 REQUEST_COUNTER = Counter(
@@ -18,20 +14,13 @@ REQUEST_DURATION = Histogram(
 )
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start = time.perf_counter()
-        response: Response = await call_next(request)
-        elapsed = time.perf_counter() - start
+def observe(method: str, path: str, status: int, elapsed: float) -> None:
+    status_label = str(status)
+    REQUEST_COUNTER.labels(method=method, path=path, status=status_label).inc()
+    REQUEST_DURATION.labels(method=method, path=path, status=status_label).observe(elapsed)
 
-        method = request.method
-        # limit path cardinality by using route.path if available
-        try:
-            path = request.scope.get("route").path  # type: ignore[assignment]
-        except Exception:
-            path = request.url.path
-        status = str(response.status_code)
 
-        REQUEST_COUNTER.labels(method=method, path=path, status=status).inc()
-        REQUEST_DURATION.labels(method=method, path=path, status=status).observe(elapsed)
-        return response
+def route_path(scope) -> str:
+    # limit path cardinality by using route.path; unrouted paths (404s, scanners) share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
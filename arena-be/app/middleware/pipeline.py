@@ -0,0 +1,101 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware import metrics
+from app.middleware.admission import admission as default_admission
+from app.middleware.admission import shed_response
+from app.middleware.rate_limit import (
+    ROUTE_COSTS,
+    SCOPE_KEY,
+    rejection,
+)
+from app.middleware.rate_limit import (
+    limiter as default_limiter,
+)
+from app.middleware.request_id import HEADER_NAME, request_id_ctx, request_id_from_headers
+from app.utils.logger import logger
+from app.utils.timing import Timings, timings_ctx
+from config import get_settings
+
+settings = get_settings()
+
+
+class RequestPipelineMiddleware:
+    """Request id, rate limiting, admission control, metrics and stage timings in one ASGI layer.
+
+    Replaces three stacked BaseHTTPMiddleware classes: no extra task or body
+    stream per request, and streaming responses pass straight through. Headers
+    are added by rewriting the `http.response.start` message. Spans recorded
+    while handling the request (`app.utils.timing.span`) go into the
+    `Server-Timing` header and, past `slow_request_threshold`, a log line.
+    Requests past the admission limits wait in a bounded queue (reported as the
+    `queue` stage) or are shed with a 503, see `app.middleware.admission`.
+    """
+
+    def __init__(self, app: ASGIApp, limiter=None, admission=None):
+        self.app = app
+        self.limiter = limiter if limiter is not None else default_limiter
+        self.admission = admission if admission is not None else default_admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        rid = request_id_from_headers(scope["headers"])
+        token = request_id_ctx.set(rid)
+        timings_token = timings_ctx.set(timings)
+        status = 500
+        streaming = False  # server-sent events are long-lived by design, never "slow"
+        limiter = self.limiter
+
+        client = scope.get("client")
+        key, cost = client[0] if client else "unknown", ROUTE_COSTS.get(scope["path"], 1)
+        decision = await limiter.check(key, cost)
+        if decision.allowed:
+            scope[SCOPE_KEY] = (limiter, key, cost)  # see rate_limit.charge_more
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                streaming = headers.get("content-type", "").startswith("text/event-stream")
+                headers.append(HEADER_NAME, rid)
+                if decision.allowed:
+                    headers.append("X-RateLimit-Limit", str(limiter.limit))
+                    headers.append("X-RateLimit-Remaining", str(decision.remaining))
+                if settings.server_timing:
+                    headers.append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            if not decision.allowed:
+                await rejection(decision)(scope, receive, send_wrapper)
+            else:
+                ticket = await self.admission.acquire(scope["path"])
+                if ticket.waited:
+                    timings.add("queue", ticket.waited)
+                try:
+                    if ticket.admitted:
+                        await self.app(scope, receive, send_wrapper)
+                    else:
+                        await shed_response()(scope, receive, send_wrapper)
+                finally:
+                    self.admission.release(ticket)
+        finally:
+            elapsed = timings.elapsed()
+            path = metrics.route_path(scope)
+            if 0 < settings.slow_request_threshold <= elapsed and not streaming:
+                logger.warning(
+                    f"Slow request {scope['method']} {path}: {elapsed * 1e3:.0f} ms",
+                    extra={
+                        "status": status,
+                        "duration_ms": round(elapsed * 1e3, 1),
+                        "stages": timings.breakdown(),
+                    },
+                )
+            timings_ctx.reset(timings_token)
+            request_id_ctx.reset(token)
+            metrics.observe(scope["method"], path, status, elapsed)
@@ -1,41 +1,173 @@
+import math
 import time
-from typing import Dict, Tuple
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from typing import Any, Dict, NamedTuple, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import Scope
+
+from app.utils.logger import logger
 from config import get_settings
 
 settings = get_settings()
 
-# Simple per-IP sliding window limiter stored in-memory
-# key -> (window_start_epoch, count)
-_store: Dict[str, Tuple[float, int]] = {}
 WINDOW_SEC = 60
+# scope entry set by the pipeline: (limiter, client key, tokens already charged)
+SCOPE_KEY = "rate_limit"
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class GCRALimiter:
+    """Per-client token bucket using the generic cell rate algorithm.
+
+    State is a single float per client: the theoretical arrival time (TAT) of the
+    next request. A client whose TAT is in the past has a full bucket, so its key
+    carries no information and is dropped by the periodic sweep.
+    """
+
+    def __init__(self, rate_per_min: int, burst: int = 0, sweep_interval: float = WINDOW_SEC):
+        self.limit = max(1, rate_per_min)
+        self.interval = WINDOW_SEC / self.limit  # seconds per token
+        self.burst = max(1, burst or self.limit)
+        self.tolerance = self.interval * self.burst
+        self.sweep_interval = sweep_interval
+        self._tat: Dict[str, float] = {}
+        self._last_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    async def check(self, key: str, cost: int = 1) -> Decision:
+        return self.check_sync(key, cost)
+
+    def check_sync(self, key: str, cost: int = 1, now: Optional[float] = None) -> Decision:
+        if now is None:
+            now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + self.interval * cost
+        allow_at = new_tat - self.tolerance
+        if now < allow_at:
+            return Decision(False, 0, allow_at - now)
+        self._tat[key] = new_tat
+        return Decision(True, int((now - allow_at) / self.interval), 0.0)
+
+    def _sweep(self, now: float) -> None:
+        self._last_sweep = now
+        stale = [k for k, tat in self._tat.items() if tat <= now]
+        for k in stale:
+            del self._tat[k]
+
+
+# Same algorithm evaluated atomically server-side; the key expires once the
+# bucket is full again, so the shared store needs no sweeping.
+_GCRA_LUA = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval * cost
+local allow_at = new_tat - tolerance
+if now < allow_at then
+  return {0, 0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / interval), 0}
+"""
+
+
+class SharedGCRALimiter:
+    """GCRA backed by Redis so the limit holds across every worker."""
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        window = int(now // WINDOW_SEC)
-        key = f"{client_ip}:{window}"
-
-        # rotate previous window cleanup (best-effort)
-        prev_key = f"{client_ip}:{window-1}"
-        _store.pop(prev_key, None)
-
-        count = _store.get(key, (now, 0))[1] + 1
-        _store[key] = (now, count)
-
-        limit = max(1, settings.rate_limit_rpm)
-        if count > limit:
-            retry_after = WINDOW_SEC - int(now % WINDOW_SEC)
-            return JSONResponse(
-                status_code=429,
-                content={"detail": "Rate limit exceeded", "retry_after": retry_after},
-                headers={"Retry-After": str(retry_after)},
+    def __init__(self, client: Any, rate_per_min: int, burst: int = 0, prefix: str = "rl:"):
+        self.client = client
+        self.limit = max(1, rate_per_min)
+        self.interval_ms = WINDOW_SEC * 1000 / self.limit
+        self.burst = max(1, burst or self.limit)
+        self.tolerance_ms = self.interval_ms * self.burst
+        self.prefix = prefix
+        self._script = client.register_script(_GCRA_LUA)
+
+    async def check(self, key: str, cost: int = 1) -> Decision:
+        try:
+            allowed, remaining, wait_ms = await self._script(
+                keys=[self.prefix + key], args=[self.interval_ms, self.tolerance_ms, cost]
+            )
+        except Exception as e:
+            # fail open: a limiter outage must not take the API down with it
+            logger.warning(f"Shared rate limiter unavailable: {e}")
+            return Decision(True, self.limit, 0.0)
+        return Decision(bool(allowed), int(remaining), int(wait_ms) / 1000)
+
+
+def parse_costs(spec: str) -> Dict[str, int]:
+    costs: Dict[str, int] = {}
+    for item in spec.split(","):
+        path, _, cost = item.strip().partition("=")
+        if path and cost:
+            costs[path.strip()] = max(1, int(cost))
+    return costs
+
+
+def build_limiter():
+    if settings.rate_limit_backend == "shared":
+        from app.utils.cache import shared_backend
+
+        backend = shared_backend()
+        if backend is not None:
+            return SharedGCRALimiter(
+                backend.client, settings.rate_limit_rpm, settings.rate_limit_burst
             )
+        logger.warning("RATE_LIMIT_BACKEND=shared but CACHE_BACKEND_URL unset – using memory")
+    return GCRALimiter(settings.rate_limit_rpm, settings.rate_limit_burst)
+
+
+limiter = build_limiter()
+ROUTE_COSTS = parse_costs(settings.rate_limit_costs)
+
+
+def max_units(path: str) -> int:
+    """Most units (e.g. batch items) one request to `path` can buy: a full burst."""
+    return max(1, limiter.burst // ROUTE_COSTS.get(path, 1))
+
+
+async def charge_more(scope: Scope, cost: int) -> Optional[JSONResponse]:
+    """Charge `cost` more tokens to the client the pipeline let through.
+
+    For routes whose price depends on the request body (per batch item).
+    Returns the response to send instead when the charge is refused.
+    """
+    charged = scope.get(SCOPE_KEY)
+    if charged is None or cost <= 0:
+        return None
+    limiter, key, paid = charged
+    if paid + cost > limiter.burst:  # could never be allowed, however long the client waits
+        return JSONResponse(
+            status_code=413,
+            content={
+                "detail": f"Request costs {paid + cost} rate-limit tokens, "
+                f"more than the burst of {limiter.burst}; split it"
+            },
+        )
+    decision = await limiter.check(key, cost)
+    if not decision.allowed:
+        return rejection(decision)
+    scope[SCOPE_KEY] = (limiter, key, paid + cost)
+    return None
+
 
-        response: Response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(limit)
-        response.headers["X-RateLimit-Remaining"] = str(max(0, limit - count))
-        return response
+def rejection(decision: Decision) -> JSONResponse:
+    retry_after = max(1, math.ceil(decision.retry_after))
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Rate limit exceeded", "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
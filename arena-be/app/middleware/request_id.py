@@ -1,24 +1,17 @@
+import contextvars
 import uuid
 from typing import Optional
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-import contextvars
 
 # Context variable to store request id per request context
 request_id_ctx: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
 
+HEADER_NAME = "X-Request-ID"
+_HEADER_KEY = HEADER_NAME.lower().encode()
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    HEADER_NAME = "X-Request-ID"
 
-    async def dispatch(self, request: Request, call_next):
-        incoming = request.headers.get(self.HEADER_NAME)
-        rid = incoming or str(uuid.uuid4())
-        token = request_id_ctx.set(rid)
-        try:
-            response: Response = await call_next(request)
-        finally:
-            request_id_ctx.reset(token)
-        response.headers[self.HEADER_NAME] = rid
-        return response
+def request_id_from_headers(headers) -> str:
+    """Incoming X-Request-ID from raw ASGI headers, or a fresh one."""
+    for name, value in headers:
+        if name == _HEADER_KEY:
+            return value.decode("latin-1")
+    return str(uuid.uuid4())
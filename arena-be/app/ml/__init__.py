@@ -0,0 +1 @@
+"""Forecast model artifacts: offline training (`train.py`) and the serving registry."""
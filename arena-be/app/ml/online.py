@@ -0,0 +1,64 @@
+from typing import Optional
+
+import numpy as np
+
+DAY = 86400.0
+
+
+class RecursiveLeastSquares:
+    """Online linear trend `price ~ level + slope * days`, fitted by RLS.
+
+    Each observation is an O(1) rank-one update of a 2x2 system; old ticks
+    fade with the forgetting factor (memory of roughly 1 / (1 - forgetting)
+    ticks), so the fit follows the market without refitting on history.
+
+    A trend fitted on minutes of ticks says little about next week, so
+    `predict` does not extrapolate it naively: the slope is shrunk toward zero
+    by its own variance (a slope within noise of zero contributes almost
+    nothing), and it is projected at most as far ahead as the data it was
+    fitted on reaches back.
+    """
+
+    def __init__(self, forgetting: float = 0.9999, delta: float = 1e6):
+        self.forgetting = forgetting
+        self.theta = np.zeros(2)  # level at t0, slope per day
+        self.P = np.eye(2) * delta  # inverse information; large = uninformed prior
+        self.count = 0
+        self.noise = 0.0  # running variance of one-step residuals
+        self._t0: Optional[float] = None
+        self._last_t = 0.0
+
+    def update(self, t: float, price: float) -> None:
+        if self._t0 is None:
+            self._t0 = t
+            self.theta[0] = price
+        x = np.array([1.0, (t - self._t0) / DAY])
+        px = self.P @ x
+        gain = px / (self.forgetting + x @ px)
+        resid = float(price - x @ self.theta)
+        self.theta += gain * resid
+        self.P = (self.P - np.outer(gain, px)) / self.forgetting
+        if self.count:
+            self.noise = self.forgetting * self.noise + (1 - self.forgetting) * resid * resid
+        self.count += 1
+        self._last_t = t
+
+    def window(self) -> float:
+        """Days of data the fit effectively remembers."""
+        if self._t0 is None or self.count < 2:
+            return 0.0
+        span = (self._last_t - self._t0) / DAY
+        return min(span, span / (self.count - 1) / (1 - self.forgetting))
+
+    def slope(self) -> float:
+        """Trend per day, shrunk toward zero by its variance."""
+        slope = float(self.theta[1])
+        var = float(self.P[1, 1]) * self.noise
+        return slope * slope * slope / (slope * slope + var) if slope else 0.0
+
+    def predict(self, days_ahead: float) -> float:
+        """Price `days_ahead` days after the latest observation."""
+        if self._t0 is None:
+            raise ValueError("no observations yet")
+        level = float(self.theta[0] + self.theta[1] * (self._last_t - self._t0) / DAY)
+        return level + self.slope() * min(days_ahead, self.window())
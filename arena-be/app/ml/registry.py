@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.utils.logger import logger
+from config import get_settings
+
+settings = get_settings()
+
+CURRENT = "CURRENT"  # file naming the active version
+FORECAST_FILE = "forecast.npy"
+META_FILE = "meta.json"
+
+
+class ModelArtifact(NamedTuple):
+    version: str
+    forecast: np.ndarray  # forecast[h] = price h days ahead, h = 0..max_horizon
+    meta: dict
+
+
+class ModelRegistry:
+    """Versioned forecast artifacts under `Settings.model_path`.
+
+    Each version is a directory holding the precomputed forecast table as a
+    plain `.npy` (memory-mapped on load) plus `meta.json`; `CURRENT` names the
+    active one and is replaced atomically, so every worker picks up a new
+    version on its next check (at most every `ml_reload_interval` seconds)
+    without a restart. Nothing is loaded until the first `get()`.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        check_interval: Optional[float] = None,
+        fallback: Optional[Callable[[], ModelArtifact]] = None,
+    ):
+        self.root = root or settings.model_path
+        self.check_interval = (
+            settings.ml_reload_interval if check_interval is None else check_interval
+        )
+        self.fallback = fallback
+        self._active: Optional[ModelArtifact] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> ModelArtifact:
+        active = self._active
+        if active is None or time.monotonic() - self._checked_at >= self.check_interval:
+            active = self._refresh()
+        return active
+
+    def save(self, forecast: np.ndarray, meta: dict, activate: bool = True) -> str:
+        version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        path = os.path.join(self.root, version)
+        os.makedirs(path)
+        np.save(os.path.join(path, FORECAST_FILE), np.ascontiguousarray(forecast, dtype=np.float64))
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(dict(meta, version=version), f)
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """Point `CURRENT` at `version` (also how to roll back)."""
+        if not os.path.isdir(os.path.join(self.root, version)):
+            raise ValueError(f"unknown model version {version}")
+        tmp = os.path.join(self.root, f".{CURRENT}.{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(self.root, CURRENT))
+        self._checked_at = 0.0  # this process swaps on its next get()
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            d for d in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, d, META_FILE))
+        )
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, CURRENT), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, version: str) -> ModelArtifact:
+        path = os.path.join(self.root, version)
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        forecast = np.load(os.path.join(path, FORECAST_FILE), mmap_mode="r")
+        return ModelArtifact(version, forecast, meta)
+
+    def _refresh(self) -> ModelArtifact:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            version = self.current_version()
+            active = self._active
+            if version is not None and (active is None or active.version != version):
+                try:
+                    active = self.load(version)
+                    logger.info(f"ML model {version} loaded")
+                except Exception as e:
+                    logger.error(f"ML model {version} failed to load: {e}")
+            if active is None:
+                if self.fallback is None:
+                    raise RuntimeError(f"no model artifact under {self.root}")
+                logger.warning(f"No model artifact under {self.root} – using the built-in fallback")
+                active = self.fallback()
+            self._active = active
+            return active
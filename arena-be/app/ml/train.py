@@ -0,0 +1,66 @@
+"""Offline training for the price forecaster.
+
+Run from arena-be/:  python -m app.ml.train [--seed N] [--no-activate]
+Fits the model, precomputes the forecast for every horizon up to
+`ml_max_horizon` days and saves it as a new registry version.
+"""
+import argparse
+from typing import Tuple
+
+import numpy as np
+
+from config import get_settings
+
+from .registry import ModelArtifact, ModelRegistry
+
+settings = get_settings()
+
+HISTORY_DAYS = 100
+
+
+def synthetic_history(seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    # 100-day synthetic trend
+    rng = np.random.default_rng(seed)
+    days = np.arange(HISTORY_DAYS)
+    return days, 2200 + 4 * days + rng.normal(0, 50, HISTORY_DAYS)
+
+
+def train(seed: int = 0, max_horizon: int = 0) -> Tuple[np.ndarray, dict]:
+    """Forecast table (index = days ahead of the last observation) and metadata."""
+    from sklearn.linear_model import LinearRegression  # offline only; serving needs numpy
+
+    max_horizon = max_horizon or settings.ml_max_horizon
+    days, prices = synthetic_history(seed)
+    model = LinearRegression().fit(days.reshape(-1, 1), prices)
+    future = days[-1] + 1 + np.arange(max_horizon + 1)  # predict_future_price's day 100 + h
+    forecast = model.predict(future.reshape(-1, 1))
+    meta = {
+        "model": "LinearRegression",
+        "seed": seed,
+        "coef": float(model.coef_[0]),
+        "intercept": float(model.intercept_),
+        "max_horizon": max_horizon,
+    }
+    return forecast, meta
+
+
+def fallback_artifact() -> ModelArtifact:
+    # deterministic, so every worker without an artifact still serves the same model
+    forecast, meta = train()
+    return ModelArtifact("builtin", forecast, meta)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--model-path", default=settings.model_path)
+    ap.add_argument("--no-activate", action="store_true", help="save without switching to it")
+    args = ap.parse_args()
+    registry = ModelRegistry(root=args.model_path)
+    forecast, meta = train(args.seed)
+    version = registry.save(forecast, meta, activate=not args.no_activate)
+    print(f"saved model {version} to {args.model_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
-from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.middleware.rate_limit import max_units
+
 
 class PredictionRequest(BaseModel):
     user_address: str = Field(..., pattern=r"^0x[a-fA-F0-9]{40}$")
@@ -11,9 +15,50 @@ class PredictionResponse(BaseModel):
     ai_prediction: float
     ai_reasoning: str
     transaction_hash: str
+    # pending until broadcast; see GET /tx/{transaction_hash}
+    transaction_status: str = "simulated"
     market_data: dict
     timestamp: datetime
 
+# candle resolutions for /price/history, in seconds
+RESOLUTIONS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+# batches are charged per item, so one may hold no more items than a full burst buys
+MAX_BATCH_SIZE = min(500, max_units("/api/v1/predict/batch"))
+
+class BatchPredictionRequest(BaseModel):
+    # validated per item (as PredictionRequest) so one bad entry doesn't reject the batch
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class BatchItemResult(BaseModel):
+    index: int
+    ok: bool
+    result: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
+class TxStatusOut(BaseModel):
+    transaction_hash: str
+    status: str  # pending | sent | confirmed | reverted | failed
+
+class ChainPredictionOut(BaseModel):
+    user_address: str
+    value: float  # unscaled (contract stores price * 100)
+    block_number: int
+    transaction_hash: str
+    timestamp: datetime
+
 class PriceOut(BaseModel):
     asset: str
     current_price: float
@@ -21,6 +66,19 @@ class PriceOut(BaseModel):
     market_cap: float
     timestamp: datetime
 
+class Candle(BaseModel):
+    t: int  # bucket start, unix seconds
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int
+
+class PriceHistoryOut(BaseModel):
+    asset: str
+    resolution: str
+    candles: List[Candle]
+
 class LeaderboardRow(BaseModel):
     rank: int
     user_address: str
@@ -32,6 +90,11 @@ class LeaderboardOut(BaseModel):
     entries: List[LeaderboardRow]
     total_players: int
     updated_at: datetime
+    next_cursor: Optional[str] = None
+
+
+class RankOut(LeaderboardRow):
+    total_players: int
 
 
 class UserCreate(BaseModel):
@@ -1,19 +1,36 @@
-"""Service singletons exposed for convenient imports.
+"""Service singletons, imported (and so constructed) on first use.
 
 Allows:
-    from app.services import price, ml, gemini, blockchain, leaderboard
+    from app.services import price, ml, gemini, blockchain, leaderboard, prediction, indexer,
+    scoring, stream
+
+Each name loads only its own module (and what that module imports), so importing
+the app does not pull in web3, the Gemini SDK or the DB layer. The lifespan
+builds all of them off the event loop via `app.services.container`.
 """
+import importlib
+from typing import Any
+
+# name -> submodule defining it; the order is the build order used at startup
+SERVICES = {
+    "price": "price_service",
+    "ml": "ml_service",
+    "gemini": "gemini_service",
+    "blockchain": "blockchain_service",
+    "leaderboard": "leaderboard_service",
+    "prediction": "prediction_service",
+    "scoring": "scoring_service",
+    "indexer": "indexer_service",
+    "stream": "stream_service",
+}
+
+__all__ = list(SERVICES)
 
-from .price_service import price  # noqa: F401
-from .ml_service import ml  # noqa: F401
-from .gemini_service import gemini  # noqa: F401
-from .blockchain_service import blockchain  # noqa: F401
-from .leaderboard_service import leaderboard  # noqa: F401
 
-__all__ = [
-    "price",
-    "ml",
-    "gemini",
-    "blockchain",
-    "leaderboard",
-]
+def __getattr__(name: str) -> Any:
+    module = SERVICES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip this hook
+    return value
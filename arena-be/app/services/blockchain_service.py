@@ -1,20 +1,433 @@
-import hashlib, time
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.utils.executor import run_blocking
+from app.utils.logger import logger
+from app.utils.timing import span
 from config import get_settings
-from web3 import Web3
 
 settings = get_settings()
-w3 = Web3(Web3.HTTPProvider(settings.blockdag_rpc_url))
+
+ABI_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "abi", "PredictionArena.json"
+)
+PLACEHOLDER_KEY = "0xYourPrivateKeyHere"
+# contract values are scaled integers (price * 100)
+VALUE_SCALE = 100
+GAS_HEADROOM = 1.2
+STATUS_HISTORY = 10_000
+
+# local statuses after which the round's AI-bot entry is attempted again
+RETRY_STATUSES = ("failed", "reverted")
+
+CHAIN_TXS = Counter(
+    "chain_transactions_total",
+    "Outbound contract transactions",
+    ["outcome"],  # signed | sent | retried | failed | skipped | simulated
+)
+CHAIN_BATCH_SIZE = Histogram(
+    "chain_broadcast_batch_size",
+    "Signed transactions broadcast per batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+
+
+def load_abi() -> list:
+    path = settings.contract_abi_path or ABI_PATH
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    # accept both the export-abi.js shape ({"abi": [...]}) and a bare list
+    return data["abi"] if isinstance(data, dict) else data
+
+
+class NonceManager:
+    """Allocates nonces locally so many transactions can be in flight at once.
+
+    Seeded from the node's pending transaction count on first use; after that
+    allocation is a counter bump with no RPC. `reset()` forces a resync; only
+    call it when no signed transaction is still waiting to be broadcast, or
+    its nonce would be handed out again.
+    """
+
+    def __init__(self, w3: Any, address: str):
+        self.w3 = w3
+        self.address = address
+        self._next: Optional[int] = None
+
+    async def allocate(self, n: int = 1) -> range:
+        if self._next is None:
+            seeded = await self.w3.eth.get_transaction_count(self.address, "pending")
+            # another allocation may have seeded while we awaited
+            if self._next is None:
+                self._next = seeded
+        start = self._next
+        self._next = start + n
+        return range(start, start + n)
+
+    def release(self, nonce: int) -> None:
+        """Give back `nonce` if it was never used and nothing was allocated after it."""
+        if self._next == nonce + 1:
+            self._next = nonce
+
+    def rewind(self, nonce: int) -> None:
+        """Hand out `nonce` next (every queued tx from it on was dropped)."""
+        self._next = nonce
+
+    def reset(self) -> None:
+        self._next = None
+
+
+class TTLValue:
+    """Single cached value with an expiry (gas estimates, gas price, chain id)."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: Any = None
+        self._expiry = 0.0
+
+    def get(self) -> Any:
+        return self._value if time.monotonic() < self._expiry else None
+
+    def set(self, value: Any) -> Any:
+        self._value = value
+        self._expiry = time.monotonic() + self.ttl
+        return value
+
 
 class BlockchainService:
-    def store_prediction(self, user: str, user_pred: float, ai_pred: float) -> str:
-        # if no real key/contract, simulate
-        if not settings.private_key or settings.private_key == "0xYourPrivateKeyHere":
-            return self._simulate_tx(user, user_pred, ai_pred)
-        # real tx would go here – omitted for brevity but fully implementable
-        return self._simulate_tx(user, user_pred, ai_pred)
+    """Submits predictions to PredictionArena via AsyncWeb3.
+
+    The contract takes one AI-bot entry per round and reverts any later one
+    (`AlreadySubmitted`), so the bot's prediction is signed once per round (off
+    the event loop, with a locally allocated nonce) and every later request
+    gets that transaction's hash. Signed payloads go to an outbound queue that
+    a sender task broadcasts in batches. Chain errors never fail a request:
+    it gets a local hash whose status says why nothing was sent. Without a
+    private key, hashes are simulated.
+    """
+
+    def __init__(self, w3: Any = None, private_key: str = "", contract_address: str = ""):
+        self._w3 = w3
+        self.private_key = private_key or settings.private_key
+        self.contract_address = contract_address or settings.contract_address
+        self._account: Any = None
+        self._contract: Any = None
+        self._nonces: Optional[NonceManager] = None
+        self._gas: Dict[str, TTLValue] = {}
+        self._gas_price = TTLValue(settings.chain_gas_price_ttl)
+        self._chain_id: Optional[int] = settings.chain_id or None
+        # (nonce, tx hash, raw tx, failed broadcast attempts)
+        self._outbound: List[Tuple[int, str, bytes, int]] = []
+        self._status: "OrderedDict[str, str]" = OrderedDict()
+        self._sender: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._batching = True
+        # this round's AI-bot submission: our tx, or an entry found on-chain
+        self._round_tx: Optional[str] = None
+        self._round_entry = False
+        self._submitting: "Optional[asyncio.Future[str]]" = None
+        self._retry_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.private_key) and self.private_key != PLACEHOLDER_KEY
+
+    @property
+    def w3(self) -> Any:
+        if self._w3 is None:
+            from web3 import AsyncWeb3  # heavy import, only needed once signing is on
+
+            from .rpc_provider import ResilientHTTPProvider
+
+            self._w3 = AsyncWeb3(
+                ResilientHTTPProvider(
+                    settings.blockdag_rpc_url,
+                    request_kwargs={"timeout": settings.chain_rpc_timeout},
+                )
+            )
+        return self._w3
+
+    @property
+    def contract(self) -> Any:
+        if self._contract is None:
+            self._contract = self.w3.eth.contract(
+                address=self.w3.to_checksum_address(self.contract_address), abi=load_abi()
+            )
+        return self._contract
+
+    @property
+    def account(self) -> Any:
+        if self._account is None:
+            from eth_account import Account
+
+            self._account = Account.from_key(self.private_key)
+        return self._account
+
+    @property
+    def nonces(self) -> NonceManager:
+        if self._nonces is None:
+            self._nonces = NonceManager(self.w3, self.account.address)
+        return self._nonces
+
+    # ---- public API ----
+
+    async def store_prediction(self, user: str, user_pred: float, ai_pred: float) -> str:
+        return (await self.store_predictions([(user, user_pred, ai_pred)]))[0]
+
+    async def store_predictions(self, items: Sequence[Tuple[str, float, float]]) -> List[str]:
+        """Make sure the AI bot's prediction is recorded this round; one tx hash per item.
+
+        The backend signs with its own key, so it can only call the AI-bot entry
+        point; user predictions are submitted by the users' own wallets. Items
+        share the round's single AI-bot transaction.
+        """
+        if not self.enabled:
+            CHAIN_TXS.labels(outcome="simulated").inc(len(items))
+            return [self._simulate_tx(*item) for item in items]
+        if not items:
+            return []
+        return [await self._ai_submission(items[0][2])] * len(items)
+
+    def unsent(self, status: str) -> str:
+        """Local hash for a request whose AI-bot tx was skipped or failed, to look up later."""
+        if status == "skipped":
+            CHAIN_TXS.labels(outcome="skipped").inc()
+        tx_hash = "0x" + os.urandom(32).hex()
+        self._set_status(tx_hash, status)
+        return tx_hash
+
+    def status(self, tx_hash: str) -> Optional[str]:
+        return self._status.get(tx_hash)
+
+    async def receipt_status(self, tx_hash: str) -> Optional[str]:
+        """Local status, upgraded to confirmed/reverted once a receipt exists."""
+        status = self._status.get(tx_hash)
+        if status != "sent":
+            return status
+        try:
+            receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+        except Exception:
+            return status  # not mined yet
+        status = "confirmed" if receipt["status"] == 1 else "reverted"
+        self._set_status(tx_hash, status)
+        return status
+
+    async def start(self) -> None:
+        if self.enabled and (self._sender is None or self._sender.done()):
+            self._wakeup = asyncio.Event()
+            self._sender = asyncio.create_task(self._send_loop())
+
+    async def stop(self) -> None:
+        if self._sender is not None:
+            self._sender.cancel()
+            try:
+                await self._sender
+            except asyncio.CancelledError:
+                pass
+            self._sender = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        while self._outbound:
+            if not await self._broadcast_batch():
+                break  # failed txs are back in the queue: retry on the next tick, in nonce order
+
+    # ---- internals ----
+
+    async def _ai_submission(self, ai_pred: float) -> str:
+        if self._round_tx is not None and self._status.get(self._round_tx) not in RETRY_STATUSES:
+            return self._round_tx
+        if self._round_entry:
+            return self.unsent("skipped")
+        if time.monotonic() < self._retry_at:
+            return self.unsent("failed")
+        if self._submitting is None or self._submitting.done():
+            # shared by concurrent requests and shielded from their deadlines, so a
+            # cancelled caller can't leave a nonce allocated but never signed
+            self._submitting = asyncio.ensure_future(self._submit_ai(ai_pred))
+        return await asyncio.shield(self._submitting)
+
+    async def _submit_ai(self, ai_pred: float) -> str:
+        call = ("submitAIBotPrediction", [int(round(ai_pred * VALUE_SCALE))])
+        try:
+            with span("chain.prepare"):
+                entry = await self.contract.functions.predictions(self.account.address).call()
+                if entry[2]:  # exists: submitted earlier (another worker, a restart)
+                    self._round_entry = True
+                    return self.unsent("skipped")
+                gas = await self._gas_limit(*call)
+                gas_price, chain_id = await self._gas_price_value(), await self._chain_id_value()
+                (nonce,) = await self.nonces.allocate(1)
+        except Exception as e:
+            # e.g. estimate_gas reverting (deadline passed, bot not configured)
+            logger.warning(f"AI-bot submission not prepared: {e}")
+            self._retry_at = time.monotonic() + settings.chain_submit_retry_interval
+            CHAIN_TXS.labels(outcome="failed").inc()
+            return self.unsent("failed")
+        tx = {
+            "to": self.contract.address,
+            "data": self.contract.encode_abi(call[0], args=call[1]),
+            "value": 0,
+            "gas": gas,
+            "gasPrice": gas_price,
+            "nonce": nonce,
+            "chainId": chain_id,
+        }
+        try:
+            with span("chain.sign"):
+                [(tx_hash, raw)] = await run_blocking(self._sign_all, [tx])
+        except Exception as e:
+            self.nonces.release(nonce)
+            logger.error(f"AI-bot submission not signed: {e}")
+            CHAIN_TXS.labels(outcome="failed").inc()
+            return self.unsent("failed")
+        self._outbound.append((nonce, tx_hash, raw, 0))
+        self._set_status(tx_hash, "pending")
+        self._round_tx = tx_hash
+        CHAIN_TXS.labels(outcome="signed").inc()
+        self._kick()
+        return tx_hash
+
+    def _sign_all(self, txs: List[dict]) -> List[Tuple[str, bytes]]:
+        out = []
+        for tx in txs:
+            s = self.account.sign_transaction(tx)
+            out.append(("0x" + bytes(s.hash).hex(), bytes(s.raw_transaction)))
+        return out
+
+    async def _gas_limit(self, fn: str, args: list) -> int:
+        cached = self._gas.setdefault(fn, TTLValue(settings.chain_gas_cache_ttl))
+        gas = cached.get()
+        if gas is None:
+            est = await getattr(self.contract.functions, fn)(*args).estimate_gas(
+                {"from": self.account.address}
+            )
+            gas = cached.set(int(est * GAS_HEADROOM))
+        return gas
+
+    async def _gas_price_value(self) -> int:
+        price = self._gas_price.get()
+        if price is None:
+            price = self._gas_price.set(await self.w3.eth.gas_price)
+        return price
+
+    async def _chain_id_value(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+        return self._chain_id
+
+    def _set_status(self, tx_hash: str, status: str) -> None:
+        self._status[tx_hash] = status
+        self._status.move_to_end(tx_hash)
+        while len(self._status) > STATUS_HISTORY:
+            self._status.popitem(last=False)
+
+    def _kick(self) -> None:
+        if self._wakeup is not None and self._sender is not None and not self._sender.done():
+            self._wakeup.set()
+        else:
+            # no sender task (scripts, tests): broadcast from a one-off task
+            asyncio.ensure_future(self._broadcast_quietly())
+
+    async def _send_loop(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.chain_batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._broadcast_quietly()
+
+    async def _broadcast_quietly(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Chain broadcast error: {e}")
+
+    async def _broadcast_batch(self) -> bool:
+        """Send the lowest-nonce batch; False if any tx has to be retried or was dropped."""
+        # lowest nonces first so the node never sees a gap it has to hold
+        self._outbound.sort(key=lambda item: item[0])
+        batch = self._outbound[: settings.chain_batch_size]
+        del self._outbound[: len(batch)]
+        if not batch:
+            return True
+        CHAIN_BATCH_SIZE.observe(len(batch))
+        results = await self._send_raw_batch([raw for _, _, raw, _ in batch])
+        ok = True
+        give_up: Optional[int] = None
+        for (nonce, tx_hash, raw, attempts), result in zip(batch, results):
+            if not isinstance(result, Exception):
+                self._set_status(tx_hash, "sent")
+                CHAIN_TXS.labels(outcome="sent").inc()
+                continue
+            ok = False
+            if attempts + 1 < settings.chain_broadcast_attempts:
+                # same nonce, same raw tx: later nonces stay valid
+                self._outbound.append((nonce, tx_hash, raw, attempts + 1))
+                CHAIN_TXS.labels(outcome="retried").inc()
+                logger.warning(f"Broadcast failed for {tx_hash}, will retry: {result}")
+            else:
+                logger.error(f"Broadcast failed for {tx_hash}: {result}")
+                self._set_status(tx_hash, "failed")
+                CHAIN_TXS.labels(outcome="failed").inc()
+                give_up = nonce if give_up is None else min(give_up, nonce)
+        if give_up is not None:
+            self._drop_behind(give_up)
+        return ok
+
+    def _drop_behind(self, nonce: int) -> None:
+        # a nonce given up on leaves a gap the node would hold later txs for: drop
+        # everything queued behind it too and reuse the nonce for the next tx. Resync
+        # with the node only once nothing signed is queued, or a queued tx's nonce
+        # could be handed out again.
+        for _, tx_hash, _, _ in [item for item in self._outbound if item[0] > nonce]:
+            self._set_status(tx_hash, "failed")
+            CHAIN_TXS.labels(outcome="failed").inc()
+        self._outbound = [item for item in self._outbound if item[0] < nonce]
+        if self._outbound:
+            self.nonces.rewind(nonce)
+        else:
+            self.nonces.reset()
+
+    async def _send_raw_batch(self, raws: List[bytes]) -> List[Any]:
+        """One JSON-RPC batch when the provider supports it, else in nonce order."""
+        if self._batching:
+            # straight to the provider: `w3.batch_requests()` marks the shared provider
+            # as batching for the whole round trip, capturing concurrent calls into it
+            try:
+                with span("chain.broadcast"):
+                    responses = await self.w3.provider.make_batch_request(
+                        [("eth_sendRawTransaction", ["0x" + raw.hex()]) for raw in raws]
+                    )
+                return [
+                    r["result"] if "error" not in r else ValueError(r["error"]) for r in responses
+                ]
+            except NotImplementedError:
+                logger.info("RPC provider does not support batching – sending one by one")
+                self._batching = False
+            except Exception as e:
+                return [e] * len(raws)
+        results: List[Any] = []
+        for raw in raws:
+            try:
+                with span("chain.broadcast"):
+                    results.append(await self.w3.eth.send_raw_transaction(raw))
+            except Exception as e:
+                results.append(e)
+        return results
 
     def _simulate_tx(self, user: str, user_pred: float, ai_pred: float) -> str:
         h = hashlib.sha256(f"{user}{user_pred}{ai_pred}{time.time()}".encode()).hexdigest()
         return f"0x{h}"
 
+
 blockchain = BlockchainService()
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence
+
+from app import services
+from app.utils.executor import run_blocking
+from app.utils.logger import logger
+
+# services with background tasks, started in this order and stopped in STOP_ORDER
+STARTED = ("price", "prediction", "blockchain", "indexer")
+STOP_ORDER = ("price", "indexer", "prediction", "blockchain")
+
+
+class ServiceContainer:
+    """Builds the service singletons during the lifespan without delaying the server.
+
+    `start()` returns at once, so the worker answers `/health` while a task
+    imports and constructs every service in the blocking pool (one thread: the
+    import lock serializes module loading anyway), ensures the DB tables and
+    starts the background loops. `/ready` reports `ready` only after that.
+    Anything touched earlier (a request, a test) is simply built on first use.
+    """
+
+    def __init__(
+        self, names: Sequence[str] = tuple(services.SERVICES), started: Sequence[str] = STARTED
+    ):
+        self.names = tuple(names)
+        self.started = tuple(started)
+        self.state = "idle"  # idle | starting | ready | failed
+        self.error = ""
+        self.build_seconds: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running: List[str] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self.state = "starting"
+            self._task = asyncio.create_task(self._start())
+
+    async def wait_ready(self) -> bool:
+        if self._task is not None:
+            await asyncio.shield(self._task)
+        return self.ready
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for name in STOP_ORDER:
+            if name in self._running:
+                await getattr(services, name).stop()
+        self._running = []
+        from app.db.session import engine
+        from app.utils.http import close_session
+
+        await close_session()
+        await engine.dispose()
+        self.state = "idle"
+
+    def _build(self) -> None:
+        for name in self.names:
+            start = time.perf_counter()
+            getattr(services, name)
+            self.build_seconds[name] = round(time.perf_counter() - start, 4)
+
+    async def _start(self) -> None:
+        start = time.perf_counter()
+        try:
+            await run_blocking(self._build)
+            await self._create_tables()
+            for name in self.started:
+                await getattr(services, name).start()
+                self._running.append(name)
+        except Exception as e:
+            self.state, self.error = "failed", str(e)
+            logger.error(f"Service startup failed: {e}")
+            return
+        self.state = "ready"
+        logger.info(
+            f"Services ready in {time.perf_counter() - start:.2f}s",
+            extra={"build_seconds": self.build_seconds},
+        )
+
+    async def _create_tables(self) -> None:
+        from app.db.models import Base
+        from app.db.session import engine
+
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            logger.info("DB tables ensured via metadata.create_all")
+        except Exception as e:
+            logger.error(f"DB init error: {e}")
+
+
+container = ServiceContainer()
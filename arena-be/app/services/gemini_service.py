@@ -1,13 +1,37 @@
-import google.generativeai as genai
-from config import get_settings
-from app.utils.logger import logger
+import math
 import random
+from typing import Tuple
+
+from app.utils.cache import Cache, MemoryBackend, shared_backend
+from app.utils.executor import run_blocking
+from app.utils.logger import logger
+from app.utils.resilience import CircuitOpen, upstream
+from app.utils.timing import span
+from config import get_settings
 
 settings = get_settings()
 
+ReasoningKey = Tuple[int, int, int]
+
+
+def _log_bucket(value: float, pct: float) -> int:
+    # relative buckets: 2500 and 2505 share a key, 2500 and 2600 do not
+    return round(math.log(max(value, 1e-9)) / math.log1p(pct / 100))
+
+
 class GeminiService:
     def __init__(self):
+        # keyed on quantized inputs; shared across workers when a shared backend is set
+        self._cache = Cache(
+            "gemini_reasoning",
+            shared_backend()
+            or MemoryBackend(maxsize=settings.gemini_cache_size, name="gemini_reasoning"),
+            ttl=settings.gemini_cache_ttl,
+        )
+        self._upstream = upstream("gemini", settings.predict_llm_timeout)
         if settings.gemini_api_key:
+            import google.generativeai as genai  # ~0.7s to import; skipped in demo mode
+
             genai.configure(api_key=settings.gemini_api_key)
             self.model = genai.GenerativeModel(settings.gemini_model)
             logger.info("Gemini LLM connected")
@@ -16,18 +40,39 @@ class GeminiService:
             logger.warning("Gemini key missing – running in demo mode")
 
     async def analyze_market_sentiment(self, market: dict, ml_pred: float) -> str:
+        if self.model:
+            try:
+                return await self._cache.get_or_compute(
+                    self._cache_key(market, ml_pred), lambda: self._generate(market, ml_pred)
+                )
+            except CircuitOpen:
+                pass  # known outage: fall back at once
+            except Exception as e:
+                logger.error(f"Gemini error: {e!r}")
+        return self._fallback_reasoning(market, ml_pred)
+
+    def _cache_key(self, market: dict, ml_pred: float) -> ReasoningKey:
+        return (
+            _log_bucket(float(market["current_price"]), settings.gemini_price_bucket_pct),
+            round(float(market["price_change_24h"]) / settings.gemini_change_bucket_pct),
+            _log_bucket(float(ml_pred), settings.gemini_price_bucket_pct),
+        )
+
+    async def _generate(self, market: dict, ml_pred: float) -> str:
         prompt = f"""
 ETH current: ${market['current_price']:.2f} (24h Δ {market['price_change_24h']:+.2f}%)
 ML 7-day forecast: ${ml_pred:.2f}
 
 Give 2-3 concise sentences of professional market reasoning for this forecast.
 """
-        if self.model:
-            try:
-                return self.model.generate_content(prompt).text.strip()
-            except Exception as e:
-                logger.error(f"Gemini error: {e}")
-        return self._fallback_reasoning(market, ml_pred)
+
+        async def generate():
+            # the SDK call is synchronous; keep it off the event loop
+            with span("gemini"):
+                return await run_blocking(self.model.generate_content, prompt)
+
+        resp = await self._upstream.call(generate)  # not hedged: every call is billed
+        return resp.text.strip()
 
     def _fallback_reasoning(self, market: dict, ml_pred: float) -> str:
         reasons = [
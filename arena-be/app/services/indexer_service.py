@@ -0,0 +1,242 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from eth_abi import decode as abi_decode
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from prometheus_client import Counter, Gauge
+from sqlalchemy import delete, select
+
+from app.db.bulk import upsert
+from app.db.models import ChainEvent, IndexerCheckpoint
+from app.db.session import AsyncSessionLocal, engine
+from app.utils.logger import logger
+from app.utils.resilience import CircuitOpen
+from app.utils.timing import span
+from config import get_settings
+
+from .blockchain_service import blockchain, load_abi
+from .scoring_service import scoring
+
+settings = get_settings()
+
+INDEXED_EVENTS = ("PredictionStored", "Resolved")
+ZERO_ADDRESS = "0x" + "0" * 40
+
+INDEXER_LOGS = Counter("indexer_logs_total", "Logs decoded and stored", ["event"])
+INDEXER_BLOCK = Gauge(
+    "indexer_checkpoint_block", "Last fully indexed block", multiprocess_mode="livemax"
+)
+INDEXER_WINDOW = Gauge(
+    "indexer_window_blocks", "Current eth_getLogs block range", multiprocess_mode="livemin"
+)
+
+
+class EventSpec(NamedTuple):
+    name: str
+    indexed: List[Tuple[str, str]]  # (name, type) decoded from topics[1:]
+    data: List[Tuple[str, str]]  # (name, type) decoded from the data blob
+
+
+def event_specs(abi: list) -> Dict[bytes, EventSpec]:
+    """topic0 -> decoding plan for every event we index."""
+    specs = {}
+    for item in abi:
+        if item.get("type") != "event" or item["name"] not in INDEXED_EVENTS:
+            continue
+        inputs = item["inputs"]
+        specs[bytes(event_abi_to_log_topic(item))] = EventSpec(
+            item["name"],
+            [(i["name"], i["type"]) for i in inputs if i["indexed"]],
+            [(i["name"], i["type"]) for i in inputs if not i["indexed"]],
+        )
+    return specs
+
+
+def _hex(value: Any) -> str:
+    if isinstance(value, str):
+        return value if value.startswith("0x") else "0x" + value
+    return "0x" + bytes(value).hex()
+
+
+class EventIndexer:
+    """Mirrors PredictionArena logs into `chain_events`.
+
+    Scans with eth_getLogs from the stored checkpoint up to `head - confirmations`,
+    so blocks that may still reorg are never indexed. The block range adapts:
+    it halves when the node rejects a query (too many results, range limits,
+    timeouts) and doubles after each success, up to `indexer_max_window`. Each
+    window's rows and the new checkpoint are committed in one transaction, so a
+    restart resumes where the last commit ended and re-scanning is idempotent.
+    If the checkpoint block's hash no longer matches the chain, the indexer
+    rewinds `confirmations` blocks and drops the rows above it.
+    """
+
+    def __init__(
+        self,
+        w3: Any = None,
+        contract_address: str = "",
+        name: str = "prediction_arena",
+        confirmations: Optional[int] = None,
+        start_block: Optional[int] = None,
+    ):
+        self._w3 = w3
+        self.contract_address = contract_address or settings.contract_address
+        self.name = name
+        self.confirmations = (
+            settings.indexer_confirmations if confirmations is None else confirmations
+        )
+        self.start_block = settings.indexer_start_block if start_block is None else start_block
+        self.window = settings.indexer_max_window
+        self._specs = event_specs(load_abi())
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.indexer_enabled and self.contract_address.lower() != ZERO_ADDRESS
+
+    @property
+    def w3(self) -> Any:
+        # share the blockchain service's provider (and its connection pool)
+        return self._w3 if self._w3 is not None else blockchain.w3
+
+    async def start(self) -> None:
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def sync(self) -> int:
+        """Index every confirmed block past the checkpoint; returns logs stored."""
+        safe_head = await self.w3.eth.block_number - self.confirmations
+        start = await self._resume_block()
+        stored = 0
+        while start <= safe_head:
+            end = min(safe_head, start + self.window - 1)
+            try:
+                with span("indexer.get_logs"):
+                    logs = await self.w3.eth.get_logs(
+                        {
+                            "address": to_checksum_address(self.contract_address),
+                            "fromBlock": start,
+                            "toBlock": end,
+                            "topics": [[_hex(t) for t in self._specs]],
+                        }
+                    )
+            except CircuitOpen:
+                raise  # the node is down, not the range too wide
+            except Exception as e:
+                if self.window <= settings.indexer_min_window:
+                    raise
+                self.window = max(settings.indexer_min_window, (end - start + 1) // 2)
+                INDEXER_WINDOW.set(self.window)
+                logger.warning(f"eth_getLogs {start}-{end} failed ({e}); window -> {self.window}")
+                continue
+            rows = self.decode(logs)
+            end_block = await self.w3.eth.get_block(end)
+            await self._commit(rows, end, _hex(end_block["hash"]))
+            stored += len(rows)
+            if end - start + 1 == self.window:  # only grow a window that was the limit
+                self.window = min(settings.indexer_max_window, self.window * 2)
+            start = end + 1
+            INDEXER_WINDOW.set(self.window)
+        return stored
+
+    def decode(self, logs: List[Any]) -> List[dict]:
+        rows = []
+        for log in logs:
+            topics = log["topics"]
+            spec = self._specs.get(bytes(topics[0]))
+            if spec is None:
+                continue
+            values = dict(zip([n for n, _ in spec.data], abi_decode(
+                [t for _, t in spec.data], bytes(log["data"])
+            )))
+            for (n, t), topic in zip(spec.indexed, topics[1:]):
+                values[n] = abi_decode([t], bytes(topic))[0]
+            user = values.get("user")
+            rows.append(
+                {
+                    "block_number": log["blockNumber"],
+                    "block_hash": _hex(log["blockHash"]),
+                    "transaction_hash": _hex(log["transactionHash"]),
+                    "log_index": log["logIndex"],
+                    "event": spec.name,
+                    "user_address": to_checksum_address(user) if user else None,
+                    "value": values.get("value", values.get("actualValue")),
+                    "event_timestamp": values["timestamp"],
+                }
+            )
+            INDEXER_LOGS.labels(event=spec.name).inc()
+        return rows
+
+    async def checkpoint(self) -> Optional[IndexerCheckpoint]:
+        async with AsyncSessionLocal() as db:
+            return await db.get(IndexerCheckpoint, self.name)
+
+    async def predictions_for(self, user_address: str) -> List[ChainEvent]:
+        q = (
+            select(ChainEvent)
+            .where(
+                ChainEvent.event == "PredictionStored",
+                ChainEvent.user_address == to_checksum_address(user_address),
+            )
+            .order_by(ChainEvent.block_number, ChainEvent.log_index)
+        )
+        async with AsyncSessionLocal() as db:
+            return list((await db.scalars(q)).all())
+
+    async def _resume_block(self) -> int:
+        cp = await self.checkpoint()
+        if cp is None:
+            return self.start_block
+        block = await self.w3.eth.get_block(cp.block_number)
+        if _hex(block["hash"]) == cp.block_hash:
+            return cp.block_number + 1
+        # reorg deeper than the confirmation depth: rewind and re-scan
+        rewind = max(self.start_block, cp.block_number - max(self.confirmations, 1))
+        logger.warning(f"Reorg below checkpoint {cp.block_number}; rewinding to {rewind}")
+        async with engine.begin() as conn:
+            await conn.execute(delete(ChainEvent).where(ChainEvent.block_number >= rewind))
+            await conn.execute(delete(IndexerCheckpoint).where(IndexerCheckpoint.name == self.name))
+        return rewind
+
+    async def _commit(self, rows: List[dict], block_number: int, block_hash: str) -> None:
+        async with engine.begin() as conn:
+            await upsert(conn, ChainEvent.__table__, rows, ["transaction_hash", "log_index"])
+            await upsert(
+                conn,
+                IndexerCheckpoint.__table__,
+                [
+                    {
+                        "name": self.name,
+                        "block_number": block_number,
+                        "block_hash": block_hash,
+                        "updated_at": datetime.utcnow(),
+                    }
+                ],
+                ["name"],
+                update=["block_number", "block_hash", "updated_at"],
+            )
+        INDEXER_BLOCK.set(block_number)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                stored = await self.sync()
+                if stored:
+                    logger.info(f"Indexed {stored} PredictionArena events")
+                    await scoring.resolve_pending()
+            except Exception as e:
+                logger.error(f"Indexer error: {e}")
+            await asyncio.sleep(settings.indexer_poll_interval)
+
+
+indexer = EventIndexer()
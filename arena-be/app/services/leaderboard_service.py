@@ -1,65 +1,195 @@
+import asyncio
 import random
-from datetime import datetime
-from app.utils.logger import logger
-from app.db.session import SessionLocal
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from app.db.bulk import upsert
 from app.db.models import LeaderboardEntry
+from app.db.session import AsyncSessionLocal, engine
+from app.schemas import LeaderboardOut
+from app.utils.cache import Cache, MemoryBackend
+from app.utils.logger import logger
+from app.utils.responses import serialize
+from app.utils.timing import span
+from config import get_settings
+
+from .ranking import RankedEntry, RankingIndex, decode_cursor, encode_cursor
+
+settings = get_settings()
+
+TOP_N = 50
+# reloads re-read rows stamped this long before the newest one seen, so a write
+# whose transaction committed after a later-stamped one is not missed
+RELOAD_OVERLAP = timedelta(seconds=30)
 
 
 class LeaderboardService:
-    async def get_leaderboard(self):
-        # query top leaderboard entries by accuracy_score desc, then total_predictions desc
-        with SessionLocal() as db:
-            q = (
-                db.query(LeaderboardEntry)
-                .order_by(LeaderboardEntry.accuracy_score.desc(), LeaderboardEntry.total_predictions.desc())
-                .limit(50)
-            )
-            rows = q.all()
+    """Leaderboard reads served from an in-memory `RankingIndex`.
 
-            # seed demo data if empty
-            if not rows:
-                self._seed(db)
-                rows = (
-                    db.query(LeaderboardEntry)
-                    .order_by(LeaderboardEntry.accuracy_score.desc(), LeaderboardEntry.total_predictions.desc())
-                    .limit(50)
-                    .all()
-                )
-
-            entries = []
-            for rank, r in enumerate(rows, start=1):
-                entries.append(
-                    {
-                        "rank": rank,
-                        "user_address": r.user_address,
-                        "accuracy_score": round(float(r.accuracy_score), 3),
-                        "total_predictions": int(r.total_predictions),
-                        "avg_error": round(float(r.avg_error), 2),
-                    }
-                )
+    The index is loaded once from the DB (scanning the rank index) and then kept
+    current by `apply()` whenever scores change in this worker. A periodic
+    background reload picks up changes written by other workers: it reads only
+    rows updated since the last one it saw and notifies listeners only if the
+    index actually changed.
+    """
+
+    def __init__(self):
+        self.index = RankingIndex()
+        self.updated_at = datetime.utcnow()
+        self._loaded_at: Optional[float] = None
+        self._seen: Optional[datetime] = None  # newest `updated_at` read from the DB
+        self._loading: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[], None]] = []
+        self.version = 0  # bumped on every index change; keys the encoded pages
+        self._pages = Cache(
+            "leaderboard_pages",
+            MemoryBackend(maxsize=256, name="leaderboard_pages"),
+            ttl=settings.leaderboard_reload_interval,
+            jitter=0,
+        )
 
+    async def get_leaderboard(self, limit: int = TOP_N, cursor: Optional[str] = None):
+        await self._ensure_loaded()
+        after = decode_cursor(cursor) if cursor else None
+        page = self.index.page(limit, after)
+        entries = [self._row(rank, e) for rank, e in page]
+        next_cursor = None
+        if len(page) == limit and page[-1][0] < len(self.index):
+            next_cursor = encode_cursor(page[-1][1].key)
         return {
             "entries": entries,
-            "total_players": len(entries),
-            "updated_at": datetime.utcnow(),
+            "total_players": len(self.index),
+            "updated_at": self.updated_at,
+            "next_cursor": next_cursor,
         }
 
-    def _seed(self, db):
+    async def get_leaderboard_json(self, limit: int = TOP_N, cursor: Optional[str] = None) -> bytes:
+        """Encoded page, cached until the index changes."""
+        await self._ensure_loaded()
+
+        async def compute() -> bytes:
+            return serialize(LeaderboardOut, await self.get_leaderboard(limit, cursor))
+
+        return await self._pages.get_or_compute((self.version, limit, cursor), compute)
+
+    async def get_rank(self, user_address: str) -> Optional[dict]:
+        await self._ensure_loaded()
+        entry = self.index.get(user_address)
+        rank = self.index.rank(user_address)
+        if entry is None or rank is None:
+            return None
+        row = self._row(rank, entry)
+        row["total_players"] = len(self.index)
+        return row
+
+    def apply(self, entries: Iterable[RankedEntry]) -> None:
+        """Fold score changes already committed to the DB into the index."""
+        self.index.upsert_many(entries)
+        self.updated_at = datetime.utcnow()
+        self._notify()
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        """Call `listener()` whenever the index changed (apply or reload)."""
+        self._listeners.append(listener)
+
+    def top_rows(self, limit: int = TOP_N) -> List[dict]:
+        return [self._row(rank, e) for rank, e in self.index.page(limit)]
+
+    def _notify(self) -> None:
+        self.version += 1
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Leaderboard listener error: {e}")
+
+    def _row(self, rank: int, e: RankedEntry) -> dict:
+        return {
+            "rank": rank,
+            "user_address": e.user_address,
+            "accuracy_score": round(float(e.accuracy_score), 3),
+            "total_predictions": int(e.total_predictions),
+            "avg_error": round(float(e.avg_error), 2),
+        }
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            await asyncio.shield(self._reload())
+        elif time.monotonic() - self._loaded_at >= settings.leaderboard_reload_interval:
+            self._reload()  # stale-while-revalidate
+
+    def _reload(self) -> "asyncio.Task[None]":
+        task = self._loading
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._load())
+            self._loading = task
+        return task
+
+    async def _load(self) -> None:
+        full = self._loaded_at is None
+        q = select(
+            LeaderboardEntry.user_address,
+            LeaderboardEntry.accuracy_score,
+            LeaderboardEntry.total_predictions,
+            LeaderboardEntry.avg_error,
+            LeaderboardEntry.updated_at,
+        )
+        if full:
+            q = q.order_by(
+                LeaderboardEntry.accuracy_score.desc(),
+                LeaderboardEntry.total_predictions.desc(),
+                LeaderboardEntry.user_address,
+            )
+        elif self._seen is not None:
+            q = q.where(LeaderboardEntry.updated_at >= self._seen - RELOAD_OVERLAP)
+        with span("db.leaderboard"):
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(q)).all()
+            # seed demo data if empty
+            if full and not rows:
+                await self._seed()
+                async with AsyncSessionLocal() as db:
+                    rows = (await db.execute(q)).all()
+        self._loaded_at = time.monotonic()
+        stamps = [r[4] for r in rows if r[4] is not None]
+        if self._seen is not None:
+            stamps.append(self._seen)
+        self._seen = max(stamps, default=None)
+        entries = [RankedEntry(r[0], float(r[1]), int(r[2]), float(r[3])) for r in rows]
+        if full:
+            self.index.load(entries)
+            logger.info(f"Leaderboard index loaded: {len(self.index)} players")
+        else:
+            entries = [e for e in entries if self.index.get(e.user_address) != e]
+            if not entries:
+                return
+            self.index.upsert_many(entries)
+        self.updated_at = datetime.utcnow()
+        self._notify()
+
+    async def _seed(self) -> None:
+        # ON CONFLICT DO NOTHING: every worker's first load may find the table empty
         addresses = [
             "0x74232704659A37D66D6a334eF3E087eF6c139414",
             "0x8ba1f109551bD432803012645Ac136ddd64DBA72",
             "0xAb5801a7D398351b8bE11C439e05C5B3259aeC9B",
         ]
-        for i, addr in enumerate(addresses, 1):
-            db.add(
-                LeaderboardEntry(
-                    user_address=addr,
-                    accuracy_score=0.95 - (i - 1) * 0.1,
-                    total_predictions=random.randint(5, 30),
-                    avg_error=100 + i * 20,
-                )
-            )
-        db.commit()
-
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_address": addr,
+                "accuracy_score": 0.95 - (i - 1) * 0.1,
+                "total_predictions": random.randint(5, 30),
+                "avg_error": 100 + i * 20,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i, addr in enumerate(addresses, 1)
+        ]
+        async with engine.begin() as conn:
+            await upsert(conn, LeaderboardEntry.__table__, rows, ["user_address"])
 
 leaderboard = LeaderboardService()
@@ -1,25 +1,52 @@
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from app.utils.logger import logger
 import random
+import time
+from typing import Optional
+
+from app.ml.online import RecursiveLeastSquares
+from app.ml.registry import ModelRegistry
+from app.ml.train import fallback_artifact
+from config import get_settings
+
+from .price_service import price
+
+settings = get_settings()
+
 
 class MLService:
-    def __init__(self):
-        self.model = LinearRegression()
-        self._train()
+    """Price forecasts: an online trend fed by live ticks, or the offline model.
 
-    def _train(self):
-        # 100-day synthetic trend
-        X = np.arange(100).reshape(-1, 1)
-        y = 2200 + 4 * np.arange(100) + np.random.normal(0, 50, 100)
-        self.model.fit(X, y)
-        logger.info("ML model trained")
+    In `online` mode every live price tick from `PriceService` updates a
+    recursive-least-squares trend in O(1); once it has seen
+    `ml_online_min_ticks` ticks, forecasts come from it. Until then (and in
+    `table` mode) a forecast is a lookup in the active model's precomputed
+    table (`python -m app.ml.train`); without a saved artifact the
+    deterministic built-in model is used, so all workers still agree.
+    """
+
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.registry = registry or ModelRegistry(fallback=fallback_artifact)
+        self.online = RecursiveLeastSquares(settings.ml_online_forgetting)
+
+    @property
+    def version(self) -> str:
+        return "online" if self._online_ready() else self.registry.get().version
+
+    def observe(self, snapshot: dict) -> None:
+        self.online.update(time.time(), float(snapshot["current_price"]))
 
     async def predict_future_price(self, days_ahead: int = 7) -> float:
-        future_day = np.array([[100 + days_ahead]])
-        pred = self.model.predict(future_day)[0]
+        if self._online_ready():
+            return max(100.0, round(self.online.predict(days_ahead), 2))
+        forecast = self.registry.get().forecast
+        if not 0 <= days_ahead < len(forecast):
+            raise ValueError(f"horizon must be 0..{len(forecast) - 1} days")
+        pred = float(forecast[days_ahead])
         # add realistic noise
         pred += random.uniform(-100, 100)
-        return max(100.0, round(float(pred), 2))
+        return max(100.0, round(pred, 2))
+
+    def _online_ready(self) -> bool:
+        return settings.ml_mode == "online" and self.online.count >= settings.ml_online_min_ticks
 
 ml = MLService()
+price.subscribe(ml.observe)
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime
+from typing import List, Tuple
+
+from pydantic import ValidationError
+
+from app.db.models import Prediction
+from app.db.write_behind import WriteBehindQueue
+from app.schemas import PredictionRequest, PredictionResponse
+from app.utils.logger import logger
+from app.utils.timing import span
+from config import get_settings
+
+from .blockchain_service import blockchain
+from .gemini_service import gemini
+from .ml_service import ml
+from .price_service import price
+
+settings = get_settings()
+
+FORECAST_DAYS = 7
+
+
+class PredictionService:
+    """Orchestrates the /predict pipeline.
+
+    Stages run as a small DAG: market data and the ML forecast are independent,
+    reasoning and the on-chain write both only need the stage-one outputs.
+    Every stage has its own deadline; the price and LLM stages degrade to their
+    fallbacks on timeout, the forecast stage fails the request. The chain stage
+    never does: a slow or failed AI-bot submission only shows in the status.
+    The finished record is handed to a write-behind queue, so the request never
+    waits on a DB commit.
+    """
+
+    def __init__(self):
+        self.writer = WriteBehindQueue(
+            Prediction.__table__,
+            batch_size=settings.prediction_flush_size,
+            flush_interval=settings.prediction_flush_interval,
+            max_pending=settings.prediction_queue_max,
+        )
+
+    async def start(self) -> None:
+        await self.writer.start()
+
+    async def stop(self) -> None:
+        await self.writer.stop()
+
+    async def predict(self, req: PredictionRequest) -> PredictionResponse:
+        market, ai_pred = await asyncio.gather(self._market(), self._forecast())
+        reasoning, tx_hash = await asyncio.gather(
+            self._reasoning(market, ai_pred),
+            self._store(req, ai_pred),
+        )
+        return self._finish(req, market, ai_pred, reasoning, tx_hash)
+
+    async def predict_batch(self, items: List[dict]) -> dict:
+        """Many predictions sharing one market snapshot, forecast and reasoning call.
+
+        Items are validated one by one and an invalid item only fails its own
+        entry. The whole batch shares the round's single AI-bot submission, so
+        a chain problem shows in every item's `transaction_status` but fails
+        none of them. Failures of the shared stages fail the whole batch, as
+        they would fail a single /predict.
+        """
+        results: List[dict] = [{} for _ in items]
+        valid: List[Tuple[int, PredictionRequest]] = []
+        for i, raw in enumerate(items):
+            try:
+                valid.append((i, PredictionRequest.model_validate(raw)))
+            except ValidationError as e:
+                errors = [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+                results[i] = {"index": i, "ok": False, "error": "; ".join(errors)}
+        if valid:
+            reqs = [req for _, req in valid]
+            market, ai_pred = await asyncio.gather(self._market(), self._forecast())
+            reasoning, hashes = await asyncio.gather(
+                self._reasoning(market, ai_pred),
+                self._store_many(reqs, ai_pred),
+            )
+            for n, (i, req) in enumerate(valid):
+                response = self._finish(req, market, ai_pred, reasoning, hashes[n])
+                results[i] = {"index": i, "ok": True, "result": response}
+        failed = sum(1 for r in results if not r["ok"])
+        return {"results": results, "succeeded": len(results) - failed, "failed": failed}
+
+    async def _market(self) -> dict:
+        try:
+            with span("market"):
+                return await asyncio.wait_for(
+                    price.get_eth_price(), settings.predict_price_timeout
+                )
+        except asyncio.TimeoutError:
+            logger.warning("Price stage timed out – simulating")
+            return price._simulate()
+
+    async def _forecast(self) -> float:
+        with span("forecast"):
+            return await asyncio.wait_for(
+                ml.predict_future_price(days_ahead=FORECAST_DAYS), settings.predict_ml_timeout
+            )
+
+    async def _reasoning(self, market: dict, ai_pred: float) -> str:
+        try:
+            with span("reasoning"):
+                return await asyncio.wait_for(
+                    gemini.analyze_market_sentiment(market, ai_pred), settings.predict_llm_timeout
+                )
+        except asyncio.TimeoutError:
+            logger.warning("LLM stage timed out – using fallback reasoning")
+            return gemini._fallback_reasoning(market, ai_pred)
+
+    async def _store(self, req: PredictionRequest, ai_pred: float) -> str:
+        return (await self._store_many([req], ai_pred))[0]
+
+    async def _store_many(self, reqs: List[PredictionRequest], ai_pred: float) -> List[str]:
+        # at most one AI-bot tx per round, signed and queued; broadcasting happens in the
+        # background. A chain problem leaves the requests a local hash with its status.
+        try:
+            with span("chain"):
+                return await asyncio.wait_for(
+                    blockchain.store_predictions(
+                        [(req.user_address, req.prediction_value, ai_pred) for req in reqs]
+                    ),
+                    settings.predict_chain_timeout,
+                )
+        except asyncio.TimeoutError:
+            logger.warning("Chain stage timed out – submission continues in the background")
+            status = "timeout"
+        except Exception as e:
+            logger.error(f"Chain stage failed: {e}")
+            status = "failed"
+        return [blockchain.unsent(status)] * len(reqs)
+
+    def _finish(
+        self, req: PredictionRequest, market: dict, ai_pred: float, reasoning: str, tx_hash: str
+    ) -> PredictionResponse:
+        with span("db"):  # write-behind: a buffer append, the INSERT happens later
+            self.writer.enqueue(
+                {
+                    "user_address": req.user_address,
+                    "user_prediction": req.prediction_value,
+                    "ai_prediction": ai_pred,
+                    "ai_reasoning": reasoning,
+                    "transaction_hash": tx_hash,
+                    "market_price": float(market["current_price"]),
+                    "created_at": datetime.utcnow(),
+                }
+            )
+        return PredictionResponse(
+            user_prediction=req.prediction_value,
+            ai_prediction=ai_pred,
+            ai_reasoning=reasoning,
+            transaction_hash=tx_hash,
+            transaction_status=blockchain.status(tx_hash) or "simulated",
+            market_data=market,
+            timestamp=market["timestamp"],
+        )
+
+
+prediction = PredictionService()
@@ -0,0 +1,124 @@
+import fcntl
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from app.schemas import RESOLUTIONS  # noqa: F401  (re-exported)
+from app.utils.logger import logger
+
+TICK = np.dtype([("ts", "<f8"), ("price", "<f8")])
+
+
+class PriceHistory:
+    """Fixed-capacity ring buffer of (timestamp, price) ticks.
+
+    Memory is `capacity * 16` bytes whatever the uptime (400k ticks, about three
+    months at the 20s refresh, is ~6 MB). With `path`, the buffer is a
+    memory-mapped file written in place, so ticks survive restarts; the write
+    position is recovered from the newest timestamp on open.
+
+    Every worker records its own ticks, so each needs a file of its own: the
+    first of `path`, `path.1`, `path.2`, ... not locked by a live process is
+    claimed (flock, released when the process exits). A restarted worker thus
+    reclaims a previous worker's file. The file is opened on first use, after
+    any fork, so a preloading server cannot hand one lock to all its workers.
+    """
+
+    def __init__(self, capacity: int, path: str = ""):
+        self.capacity = max(1, capacity)
+        self.path = path
+        self.version = 0  # bumped per append; cache keys include it
+        self._buf: Optional[np.ndarray] = None
+        self._lock: Optional[int] = None
+        self._count = 0
+        self._head = 0
+
+    def __len__(self) -> int:
+        self._ready()
+        return self._count
+
+    def append(self, ts: float, price: float) -> None:
+        buf = self._ready()
+        buf[self._head] = (ts, price)
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.version += 1
+
+    def window(self, since: float = 0.0) -> np.ndarray:
+        """Ticks with `ts >= since`, oldest first (a copy of just that range)."""
+        buf = self._ready()
+        if self._count < self.capacity:
+            segments = [buf[: self._count]]
+        else:
+            segments = [buf[self._head:], buf[: self._head]]
+        # each segment is sorted by ts, so the cut is a binary search
+        parts = [s[np.searchsorted(s["ts"], since):] for s in segments]
+        return np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+
+    def ohlc(self, resolution: int, since: float = 0.0) -> List[dict]:
+        """Open/high/low/close per `resolution`-second bucket, in one vectorized pass."""
+        ticks = self.window(since)
+        if not len(ticks):
+            return []
+        prices = ticks["price"]
+        buckets = (ticks["ts"] // resolution).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.append(starts[1:], len(ticks)) - 1
+        return [
+            {"t": b * resolution, "open": o, "high": h, "low": lo, "close": c, "ticks": n}
+            for b, o, h, lo, c, n in zip(
+                buckets[starts].tolist(),
+                prices[starts].tolist(),
+                np.maximum.reduceat(prices, starts).tolist(),
+                np.minimum.reduceat(prices, starts).tolist(),
+                prices[ends].tolist(),
+                (ends - starts + 1).tolist(),
+            )
+        ]
+
+    def flush(self) -> None:
+        if isinstance(self._buf, np.memmap):
+            self._buf.flush()
+
+    def close(self) -> None:
+        """Flush and give up the file; the next use claims one again."""
+        self.flush()
+        self._buf = None
+        if self._lock is not None:
+            os.close(self._lock)  # releases the flock
+            self._lock = None
+
+    def _ready(self) -> np.ndarray:
+        if self._buf is not None:
+            return self._buf
+        if not self.path:
+            self._buf = np.zeros(self.capacity, dtype=TICK)
+            return self._buf
+        self._buf = self._open(self._claim(self.path))
+        ts = self._buf["ts"]
+        self._count = int(np.count_nonzero(ts))
+        self._head = (int(np.argmax(ts)) + 1) % self.capacity if self._count else 0
+        return self._buf
+
+    def _claim(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        slot = 0
+        while True:
+            candidate = f"{path}.{slot}" if slot else path
+            fd = os.open(f"{candidate}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:  # held by another worker
+                os.close(fd)
+                slot += 1
+                continue
+            self._lock = fd
+            return candidate
+
+    def _open(self, path: str) -> np.ndarray:
+        size = self.capacity * TICK.itemsize
+        exists = os.path.exists(path) and os.path.getsize(path) == size
+        if os.path.exists(path) and not exists:
+            logger.warning(f"Price history {path} has a different capacity – starting fresh")
+        return np.memmap(path, dtype=TICK, mode="r+" if exists else "w+", shape=(self.capacity,))
@@ -1,29 +1,153 @@
-import aiohttp, random, time
+import asyncio
+import random
+import time
 from datetime import datetime
-from app.utils.cache import cache
+from typing import Callable, List, Optional, Tuple
+
+from app.schemas import PriceOut
+from app.utils.cache import Cache, MemoryBackend
+from app.utils.http import get_session
 from app.utils.logger import logger
+from app.utils.resilience import CircuitOpen, upstream
+from app.utils.responses import serialize
+from app.utils.timing import span
+from config import get_settings
+
+from .price_history import RESOLUTIONS, PriceHistory
+
+settings = get_settings()
 
 CACHE_TTL = 30
 
+
 class PriceService:
-    @cache(CACHE_TTL)
+    """Price feed that serves the latest in-memory snapshot.
+
+    When started from the app lifespan, a background task refreshes the snapshot
+    every `price_refresh_interval` seconds, before it goes stale. Without the task
+    (scripts, tests) a stale snapshot is still served while one revalidation runs
+    in the background; only the very first call waits on the upstream.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._refresher: Optional[asyncio.Task] = None
+        self._revalidation: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[dict], None]] = []
+        self._snapshot_json: Optional[Tuple[dict, bytes]] = None  # (snapshot, encoded)
+        self.history = PriceHistory(settings.price_history_capacity, settings.price_history_path)
+        # keyed on the history version, so entries go stale exactly when a tick lands
+        self._candles = Cache(
+            "price_history", MemoryBackend(maxsize=64, name="price_history"), ttl=300, jitter=0
+        )
+        self.subscribe(self._record)
+        self._upstream = upstream("coingecko", settings.http_timeout)
+
     async def get_eth_price(self) -> dict:
-        url = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=usd&include_24hr_change=true&include_market_cap=true"
+        snap = self._snapshot
+        if snap is None:
+            return await asyncio.shield(self._revalidate())
+        if time.monotonic() - self._fetched_at >= CACHE_TTL:
+            self._revalidate()
+        return snap
+
+    async def get_eth_price_json(self) -> bytes:
+        """`get_eth_price()` as encoded JSON, encoded once per snapshot."""
+        snap = await self.get_eth_price()
+        cached = self._snapshot_json
+        if cached is None or cached[0] is not snap:
+            cached = (snap, serialize(PriceOut, snap))
+            self._snapshot_json = cached
+        return cached[1]
+
+    async def start(self) -> None:
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        for task in (self._refresher, self._revalidation):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._refresher = None
+        self._revalidation = None
+        self.history.flush()
+
+    async def get_history(self, resolution: str, limit: int) -> dict:
+        step = RESOLUTIONS[resolution]
+        version = self.history.version
+
+        async def compute() -> List[dict]:
+            newest = (time.time() // step) * step
+            return self.history.ohlc(step, since=newest - (limit - 1) * step)
+
+        candles = await self._candles.get_or_compute((resolution, limit, version), compute)
+        return {"asset": "ETH", "resolution": resolution, "candles": candles}
+
+    def subscribe(self, listener: Callable[[dict], None]) -> None:
+        """Call `listener(snapshot)` on every live (non-simulated) price tick."""
+        self._listeners.append(listener)
+
+    async def refresh(self) -> dict:
+        # the refresher loop and a revalidation can fetch concurrently, so whether a
+        # snapshot is live travels with it rather than through shared state
+        snap, live = await self._fetch()
+        self._snapshot = snap
+        self._fetched_at = time.monotonic()
+        if live:
+            for listener in self._listeners:
+                try:
+                    listener(snap)
+                except Exception as e:
+                    logger.error(f"Price listener error: {e}")
+        return snap
+
+    def _record(self, snap: dict) -> None:
+        self.history.append(time.time(), float(snap["current_price"]))
+
+    def _revalidate(self) -> "asyncio.Task[dict]":
+        # single-flight: concurrent misses share one upstream request
+        task = self._revalidation
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self.refresh())
+            self._revalidation = task
+        return task
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Price refresh error: {e}")
+            await asyncio.sleep(settings.price_refresh_interval)
+
+    async def _fetch(self) -> Tuple[dict, bool]:
+        """A snapshot, and whether it is live (False: simulated)."""
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as s:
-                async with s.get(url) as r:
-                    r.raise_for_status()
-                    data = (await r.json())["ethereum"]
-                    return {
-                        "asset": "ETH",
-                        "current_price": data["usd"],
-                        "price_change_24h": data["usd_24h_change"],
-                        "market_cap": data["usd_market_cap"],
-                        "timestamp": datetime.utcnow(),
-                    }
+            data = await self._upstream.call(self._request, hedge=True)
+            snap = {
+                "asset": "ETH",
+                "current_price": data["usd"],
+                "price_change_24h": data["usd_24h_change"],
+                "market_cap": data["usd_market_cap"],
+                "timestamp": datetime.utcnow(),
+            }
+            return snap, True
+        except CircuitOpen:
+            pass  # known outage: simulate at once, the breaker already logged it
         except Exception as e:
-            logger.warning(f"Coingecko fail: {e} – simulating")
-            return self._simulate()
+            logger.warning(f"Coingecko fail: {e!r} – simulating")
+        return self._simulate(), False
+
+    async def _request(self) -> dict:
+        with span("coingecko"):
+            async with get_session().get(settings.coingecko_url) as r:
+                r.raise_for_status()
+                return (await r.json())["ethereum"]
 
     def _simulate(self) -> dict:
         base = 2500
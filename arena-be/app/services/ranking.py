@@ -0,0 +1,105 @@
+import base64
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Sort key: accuracy desc, total_predictions desc, address asc (tiebreak keeps order total)
+RankKey = Tuple[float, int, str]
+
+
+class RankedEntry(NamedTuple):
+    user_address: str
+    accuracy_score: float
+    total_predictions: int
+    avg_error: float
+
+    @property
+    def key(self) -> RankKey:
+        return (-self.accuracy_score, -self.total_predictions, self.user_address)
+
+
+class RankingIndex:
+    """In-memory leaderboard kept sorted under incremental updates.
+
+    Rank lookups and page starts are a bisect over the sorted keys (O(log n));
+    an update moves one key. Pages are addressed by keyset cursors, so reading
+    page k costs the same as reading page 1.
+    """
+
+    def __init__(self):
+        self._keys: List[RankKey] = []
+        self._entries: Dict[str, RankedEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._entries
+
+    def load(self, entries: Iterable[RankedEntry]) -> None:
+        fresh: Dict[str, RankedEntry] = {}
+        for e in entries:
+            # several rows per address: keep the best-ranked one
+            cur = fresh.get(e.user_address)
+            if cur is None or e.key < cur.key:
+                fresh[e.user_address] = e
+        self._entries = fresh
+        self._keys = sorted(e.key for e in fresh.values())
+
+    def upsert(self, entry: RankedEntry) -> None:
+        old = self._entries.get(entry.user_address)
+        if old is not None:
+            if old == entry:
+                return
+            del self._keys[bisect_left(self._keys, old.key)]
+        self._entries[entry.user_address] = entry
+        insort(self._keys, entry.key)
+
+    def upsert_many(self, entries: Iterable[RankedEntry]) -> None:
+        batch = list(entries)
+        if len(batch) * 64 < len(self._entries):
+            for e in batch:
+                self.upsert(e)
+            return
+        # a large batch (e.g. a resolved round): one re-sort beats moving keys one by one
+        self._entries.update((e.user_address, e) for e in batch)
+        self._keys = sorted(e.key for e in self._entries.values())
+
+    def remove(self, address: str) -> None:
+        old = self._entries.pop(address, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, old.key)]
+
+    def get(self, address: str) -> Optional[RankedEntry]:
+        return self._entries.get(address)
+
+    def rank(self, address: str) -> Optional[int]:
+        entry = self._entries.get(address)
+        if entry is None:
+            return None
+        return bisect_left(self._keys, entry.key) + 1
+
+    def page(self, limit: int, after: Optional[RankKey] = None) -> List[Tuple[int, RankedEntry]]:
+        """(rank, entry) pairs for the `limit` entries following the `after` key."""
+        start = bisect_right(self._keys, after) if after is not None else 0
+        return [
+            (rank, self._entries[key[2]])
+            for rank, key in enumerate(self._keys[start:start + limit], start=start + 1)
+        ]
+
+    def top(self, limit: int) -> List[RankedEntry]:
+        return [self._entries[key[2]] for key in self._keys[:limit]]
+
+
+def encode_cursor(key: RankKey) -> str:
+    raw = f"{key[0]!r}|{key[1]}|{key[2]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> RankKey:
+    """Inverse of `encode_cursor`; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        acc, total, address = raw.split("|")
+        return (float(acc), int(total), address)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
@@ -0,0 +1,50 @@
+"""Web3 HTTP provider that sends every JSON-RPC call through the `rpc` upstream.
+
+Only transport failures and deadlines count against the breaker: JSON-RPC
+error responses (reverts, an over-wide eth_getLogs range) come back as normal
+responses and web3 raises them afterwards. Deadlines adapt per method, since
+eth_getLogs over thousands of blocks is slower than eth_blockNumber.
+"""
+import functools
+from typing import Any, List, Tuple
+
+from web3 import AsyncHTTPProvider
+
+from app.utils.resilience import upstream
+from config import get_settings
+
+settings = get_settings()
+
+# reads that are safe to send twice, so a slow one may be hedged
+IDEMPOTENT = frozenset(
+    {
+        "eth_blockNumber",
+        "eth_call",
+        "eth_chainId",
+        "eth_estimateGas",
+        "eth_gasPrice",
+        "eth_getBlockByHash",
+        "eth_getBlockByNumber",
+        "eth_getLogs",
+        "eth_getTransactionCount",
+        "eth_getTransactionReceipt",
+    }
+)
+
+
+class ResilientHTTPProvider(AsyncHTTPProvider):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.upstream = upstream("rpc", settings.chain_rpc_timeout)
+
+    async def make_request(self, method: Any, params: Any) -> Any:
+        return await self.upstream.call(
+            functools.partial(super().make_request, method, params),
+            op=str(method),
+            hedge=method in IDEMPOTENT,
+        )
+
+    async def make_batch_request(self, batch_requests: List[Tuple[Any, Any]]) -> Any:
+        return await self.upstream.call(
+            functools.partial(super().make_batch_request, batch_requests), op="batch"
+        )
@@ -0,0 +1,187 @@
+from datetime import datetime
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+from prometheus_client import Counter, Histogram
+from sqlalchemy import select
+
+from app.db.bulk import upsert
+from app.db.models import ChainEvent, LeaderboardEntry, Prediction, ScoredRound
+from app.db.session import AsyncSessionLocal, engine
+from app.utils.logger import logger
+
+from .blockchain_service import VALUE_SCALE
+from .leaderboard_service import leaderboard
+from .ranking import RankedEntry
+
+SCORED = Counter("scoring_participants_total", "Participants folded into the leaderboard")
+SCORING_SECONDS = Histogram(
+    "scoring_round_seconds",
+    "Time to score and persist one resolved round",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class RoundScores(NamedTuple):
+    addresses: np.ndarray  # unique, sorted
+    predictions: np.ndarray  # per address in this round
+    avg_error: np.ndarray
+    accuracy: np.ndarray
+
+
+def score_round(addresses: Sequence[str], predicted: ArrayLike, actual: float) -> RoundScores:
+    """Absolute error and accuracy for every prediction, grouped per address.
+
+    Accuracy of one prediction is `1 - |error| / |actual|`, clipped to [0, 1].
+    """
+    pred = np.asarray(predicted, dtype=np.float64)
+    addrs, inverse = np.unique(np.asarray(addresses, dtype=str), return_inverse=True)
+    err = np.abs(pred - actual)
+    if actual:
+        acc = np.clip(1.0 - err / abs(actual), 0.0, 1.0)
+    else:
+        acc = (err == 0).astype(np.float64)
+    count = np.bincount(inverse, minlength=len(addrs))
+    return RoundScores(
+        addrs,
+        count,
+        np.bincount(inverse, weights=err, minlength=len(addrs)) / count,
+        np.bincount(inverse, weights=acc, minlength=len(addrs)) / count,
+    )
+
+
+def _running_totals(excluded) -> dict:
+    # fold this round into the stored aggregates; every RHS sees the old row
+    lb = LeaderboardEntry.__table__.c
+    total = lb.total_predictions + excluded.total_predictions
+
+    def mean(col: str):
+        return (lb[col] * lb.total_predictions + excluded[col] * excluded.total_predictions) / total
+
+    return {
+        "total_predictions": total,
+        "avg_error": mean("avg_error"),
+        "accuracy_score": mean("accuracy_score"),
+        "updated_at": excluded.updated_at,
+    }
+
+
+class ScoringService:
+    """Scores resolved rounds in bulk instead of one `absError()` call per address.
+
+    Errors and accuracies are computed for the whole round in one NumPy pass and
+    merged into `leaderboard` with a single upsert that updates the running
+    averages in SQL, so past rounds are never re-read. Each round id is claimed
+    in `scored_rounds` in the same transaction, which makes re-scoring a no-op.
+    """
+
+    async def resolve_round(
+        self, round_id: str, addresses: Sequence[str], predicted: ArrayLike, actual: float
+    ) -> int:
+        """Fold one round into the leaderboard; returns participants (0 if already scored)."""
+        with SCORING_SECONDS.time():
+            scores = score_round(addresses, predicted, actual)
+            now = datetime.utcnow()
+            rows = [
+                {
+                    "user_address": a,
+                    "total_predictions": n,
+                    "avg_error": e,
+                    "accuracy_score": c,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for a, n, e, c in zip(
+                    scores.addresses.tolist(),
+                    scores.predictions.tolist(),
+                    scores.avg_error.tolist(),
+                    scores.accuracy.tolist(),
+                )
+            ]
+            lb = LeaderboardEntry.__table__.c
+            async with engine.begin() as conn:
+                claimed = await upsert(
+                    conn,
+                    ScoredRound.__table__,
+                    [
+                        {
+                            "round_id": round_id,
+                            "actual_value": actual,
+                            "participants": len(rows),
+                            "scored_at": now,
+                        }
+                    ],
+                    ["round_id"],
+                    returning=[ScoredRound.__table__.c.round_id],
+                )
+                if not claimed:
+                    return 0
+                updated = await upsert(
+                    conn,
+                    LeaderboardEntry.__table__,
+                    rows,
+                    ["user_address"],
+                    update=_running_totals,
+                    returning=[
+                        lb.user_address, lb.accuracy_score, lb.total_predictions, lb.avg_error
+                    ],
+                )
+        leaderboard.apply(RankedEntry(r[0], r[1], r[2], r[3]) for r in updated)
+        SCORED.inc(len(rows))
+        logger.info(f"Scored round {round_id}: {len(rows)} participants")
+        return len(rows)
+
+    async def resolve_pending(self) -> int:
+        """Score every indexed `Resolved` event that has not been scored yet.
+
+        A round's predictions are the `PredictionStored` events after the previous
+        resolution, up to and including the resolving block.
+        """
+        async with AsyncSessionLocal() as db:
+            resolutions = (
+                await db.execute(
+                    select(ChainEvent.transaction_hash, ChainEvent.block_number, ChainEvent.value)
+                    .where(ChainEvent.event == "Resolved")
+                    .order_by(ChainEvent.block_number)
+                )
+            ).all()
+            done = set((await db.scalars(select(ScoredRound.round_id))).all())
+        scored, previous = 0, -1
+        for tx_hash, block, value in resolutions:
+            if tx_hash not in done:
+                rows = await self._rows(
+                    select(ChainEvent.user_address, ChainEvent.value).where(
+                        ChainEvent.event == "PredictionStored",
+                        ChainEvent.block_number > previous,
+                        ChainEvent.block_number <= block,
+                    )
+                )
+                scored += await self.resolve_round(
+                    tx_hash,
+                    [r[0] for r in rows],
+                    np.fromiter((r[1] for r in rows), np.float64, len(rows)) / VALUE_SCALE,
+                    value / VALUE_SCALE,
+                )
+            previous = block
+        return scored
+
+    async def resolve_predictions(
+        self, round_id: str, actual: float, start: datetime, end: datetime
+    ) -> int:
+        """Score off-chain /predict submissions made in [start, end) against `actual`."""
+        rows = await self._rows(
+            select(Prediction.user_address, Prediction.user_prediction).where(
+                Prediction.created_at >= start, Prediction.created_at < end
+            )
+        )
+        return await self.resolve_round(
+            round_id, [r[0] for r in rows], [r[1] for r in rows], actual
+        )
+
+    async def _rows(self, q) -> List:
+        async with AsyncSessionLocal() as db:
+            return list((await db.execute(q)).all())
+
+
+scoring = ScoringService()
@@ -0,0 +1,94 @@
+from typing import AsyncIterator, Dict, Iterable, List
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.utils.broadcast import RESYNC, Broadcaster, Message, encode
+from config import get_settings
+
+from .leaderboard_service import TOP_N, leaderboard
+from .price_service import price
+
+settings = get_settings()
+
+TOPICS = ("price", "leaderboard")
+
+
+class StreamService:
+    """Server push for price ticks and the top of the leaderboard.
+
+    Updates are computed once per change and fanned out as pre-serialized
+    messages. Leaderboard updates are diffs of the top `TOP_N` rows against what
+    was last published (`upserts` with their new rank, `removed` addresses); a
+    client starts from the snapshot sent on connect and again after a resync.
+    """
+
+    def __init__(self):
+        self.broadcaster = Broadcaster(settings.stream_queue_size)
+        self._top: Dict[str, dict] = {}  # address -> row as last published
+        price.subscribe(self._on_price)
+        leaderboard.subscribe(self._on_leaderboard)
+
+    async def snapshot(self, topics: Iterable[str]) -> List[Message]:
+        out = []
+        if "price" in topics:
+            out.append(encode("price", "price", await price.get_eth_price()))
+        if "leaderboard" in topics:
+            board = await leaderboard.get_leaderboard(TOP_N)
+            board.pop("next_cursor", None)
+            out.append(encode("leaderboard", "leaderboard.snapshot", board))
+        return out
+
+    async def sse(self, topics: List[str]) -> AsyncIterator[bytes]:
+        sub = self.broadcaster.subscribe(topics)
+        try:
+            for msg in await self.snapshot(topics):
+                yield msg.sse
+            while True:
+                msg = await sub.get(settings.stream_heartbeat)
+                if msg is None:
+                    yield b": ping\n\n"  # keeps proxies from closing an idle stream
+                elif msg is RESYNC:
+                    for snap in await self.snapshot(topics):
+                        yield snap.sse
+                else:
+                    yield msg.sse
+        finally:
+            sub.close()
+
+    async def websocket(self, ws: WebSocket, topics: List[str]) -> None:
+        await ws.accept()
+        sub = self.broadcaster.subscribe(topics)
+        try:
+            for msg in await self.snapshot(topics):
+                await ws.send_text(msg.json)
+            while True:
+                msg = await sub.get(settings.stream_heartbeat)
+                if msg is None:
+                    await ws.send_text('{"type":"ping"}')
+                elif msg is RESYNC:
+                    for snap in await self.snapshot(topics):
+                        await ws.send_text(snap.json)
+                else:
+                    await ws.send_text(msg.json)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            sub.close()
+
+    def _on_price(self, snap: dict) -> None:
+        self.broadcaster.publish("price", "price", snap)
+
+    def _on_leaderboard(self) -> None:
+        rows = {r["user_address"]: r for r in leaderboard.top_rows(TOP_N)}
+        upserts = [r for a, r in rows.items() if self._top.get(a) != r]
+        removed = [a for a in self._top if a not in rows]
+        self._top = rows
+        if upserts or removed:
+            self.broadcaster.publish(
+                "leaderboard",
+                "leaderboard.diff",
+                {"upserts": upserts, "removed": removed, "total_players": len(leaderboard.index)},
+            )
+
+
+stream = StreamService()
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Set
+
+from prometheus_client import Counter, Gauge
+
+BROADCAST_SUBSCRIBERS = Gauge(
+    "broadcast_subscribers", "Connected stream subscribers", multiprocess_mode="livesum"
+)
+BROADCAST_MESSAGES = Counter(
+    "broadcast_messages_total",
+    "Messages handed to subscriber queues",
+    ["topic", "outcome"],  # queued | overflow
+)
+
+
+class Message(NamedTuple):
+    topic: str
+    type: str
+    json: str  # {"type": ..., "data": ...}, serialized once per publish
+    sse: bytes  # the same payload framed as a server-sent event
+
+
+# Queued to a subscriber that overflowed: it should drop its state and take a snapshot
+RESYNC = Message("", "resync", "", b"")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode(topic: str, type_: str, data: Any) -> Message:
+    body = json.dumps({"type": type_, "data": data}, default=_default, separators=(",", ":"))
+    return Message(topic, type_, body, f"event: {type_}\ndata: {body}\n\n".encode())
+
+
+class Subscription:
+    def __init__(self, broadcaster: "Broadcaster", topics: Set[str], maxsize: int):
+        self.broadcaster = broadcaster
+        self.topics = topics
+        self.queue: "asyncio.Queue[Message]" = asyncio.Queue(maxsize)
+        self.loop = asyncio.get_running_loop()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """Next message, or None when nothing arrived within `timeout`."""
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """Fan-out of pre-serialized messages to many subscribers.
+
+    A message is encoded once and the same bytes are queued for every
+    subscriber of its topic. Each subscriber has a bounded queue; one that
+    falls `maxsize` messages behind has its backlog dropped and gets a single
+    `RESYNC` marker instead, so a slow client costs O(maxsize) memory and
+    never blocks publishers or other clients.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._subs: Dict[str, Set[Subscription]] = {}
+
+    def __len__(self) -> int:
+        return len({s for subs in self._subs.values() for s in subs})
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        sub = Subscription(self, set(topics), self.maxsize)
+        for topic in sub.topics:
+            self._subs.setdefault(topic, set()).add(sub)
+        BROADCAST_SUBSCRIBERS.set(len(self))
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        for topic in sub.topics:
+            self._subs.get(topic, set()).discard(sub)
+        BROADCAST_SUBSCRIBERS.set(len(self))
+
+    def publish(self, topic: str, type_: str, data: Any) -> int:
+        """Encode once and queue for every subscriber of `topic`; returns how many."""
+        subs = self._subs.get(topic)
+        if not subs:
+            return 0
+        msg = encode(topic, type_, data)
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        overflow = 0
+        for sub in list(subs):
+            if sub.loop.is_closed():
+                self.unsubscribe(sub)
+            elif sub.loop is current:
+                overflow += not self._deliver(sub, msg)
+            else:
+                # subscriber served from another thread's loop (e.g. a test client)
+                sub.loop.call_soon_threadsafe(self._deliver, sub, msg)
+        BROADCAST_MESSAGES.labels(topic=topic, outcome="queued").inc(len(subs) - overflow)
+        if overflow:
+            BROADCAST_MESSAGES.labels(topic=topic, outcome="overflow").inc(overflow)
+        return len(subs)
+
+    @staticmethod
+    def _deliver(sub: Subscription, msg: Message) -> bool:
+        try:
+            sub.queue.put_nowait(msg)
+            return True
+        except asyncio.QueueFull:
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            sub.queue.put_nowait(RESYNC)
+            return False
@@ -1,31 +1,430 @@
-import time, functools
-from typing import Callable
-
-class TimedCache:
-    def __init__(self):
-        self._store = {}
-    def get(self, key: str):
-        if key in self._store:
-            value, expiry = self._store[key]
-            if time.time() < expiry:
-                return value
-            del self._store[key]
-        return None
-    def set(self, key: str, value, ttl: int):
-        self._store[key] = (value, time.time() + ttl)
-
-_cache = TimedCache()
-
-def cache(ttl: int):
+import asyncio
+import functools
+import hashlib
+import inspect
+import itertools
+import pickle  # nosec B403 - only our own values round-trip through the shared backend
+import random
+import re
+import time
+import uuid
+import weakref
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar, Union
+
+from prometheus_client import Counter, Gauge
+
+from app.utils.logger import logger
+from app.utils.metrics_store import exporter
+from config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups",
+    ["cache", "result"],  # hit | miss | coalesced
+)
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio",
+    "Share of get_or_compute lookups served from the cache (coalesced count as hits)",
+    ["cache"],
+    multiprocess_mode="liveall",  # one series per worker: ratios do not add up
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "Cache evictions",
+    ["cache", "reason"],  # capacity | expired
+)
+
+# Sentinel for "not in cache" so a cached None is still a hit
+MISSING: Any = object()
+
+# Stored entries carry their kind so failures can be negatively cached
+_VALUE = "v"
+_ERROR = "e"
+Entry = Tuple[str, Any]
+
+
+class CacheBackend:
+    """Storage interface used by `Cache`; all methods are async so shared backends fit."""
+
+    name = "backend"
+
+    async def get(self, key: Hashable) -> Any:
+        raise NotImplementedError
+
+    async def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        """Drop every entry, or only those keyed `(namespace, ...)` by one `Cache`."""
+        raise NotImplementedError
+
+
+def _in_namespace(key: Hashable, namespace: str) -> bool:
+    return isinstance(key, tuple) and bool(key) and key[0] == namespace
+
+
+class MemoryBackend(CacheBackend):
+    """Bounded in-process store with LRU or LFU eviction.
+
+    Both policies are O(1) per operation. Expired entries are dropped on read
+    and by an incremental sweep on writes, so dead keys don't pin memory.
+    """
+
+    SWEEP_EVERY = 64
+
+    def __init__(self, maxsize: int = 1024, policy: str = "lru", name: str = "memory"):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"unknown eviction policy: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.name = name
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        # LFU bookkeeping: key -> frequency, frequency -> keys in LRU order
+        self._freq: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = defaultdict(OrderedDict)
+        self._min_freq = 0
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: Hashable) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return MISSING
+        value, expiry = item
+        if time.monotonic() >= expiry:
+            self._remove(key)
+            CACHE_EVICTIONS.labels(cache=self.name, reason="expired").inc()
+            return MISSING
+        self._touch(key)
+        return value
+
+    async def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self._sweep()
+        if key in self._data:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._touch(key)
+            return
+        if len(self._data) >= self.maxsize:
+            self._evict()
+        self._data[key] = (value, time.monotonic() + ttl)
+        if self.policy == "lfu":
+            self._freq[key] = 1
+            self._buckets[1][key] = None
+            self._min_freq = 1
+
+    async def delete(self, key: Hashable) -> None:
+        if key in self._data:
+            self._remove(key)
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is not None:
+            for key in [k for k in self._data if _in_namespace(k, namespace)]:
+                self._remove(key)
+            return
+        self._data.clear()
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+    def _touch(self, key: Hashable) -> None:
+        if self.policy == "lru":
+            self._data.move_to_end(key)
+            return
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets[freq + 1][key] = None
+
+    def _evict(self) -> None:
+        if self.policy == "lru":
+            key = next(iter(self._data))
+        else:
+            key = next(iter(self._buckets[self._min_freq]))
+        self._remove(key)
+        CACHE_EVICTIONS.labels(cache=self.name, reason="capacity").inc()
+
+    def _remove(self, key: Hashable) -> None:
+        del self._data[key]
+        if self.policy == "lfu":
+            freq = self._freq.pop(key)
+            bucket = self._buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[freq]
+                if self._min_freq == freq:
+                    self._min_freq = min(self._buckets, default=0)
+
+    def _sweep(self) -> None:
+        # bounded scan from the cold end keeps writes O(1) amortised
+        now = time.monotonic()
+        for key in list(itertools.islice(self._data, self.SWEEP_EVERY)):
+            if now >= self._data[key][1]:
+                self._remove(key)
+                CACHE_EVICTIONS.labels(cache=self.name, reason="expired").inc()
+
+
+class RedisBackend(CacheBackend):
+    """Shared store for multi-worker deployments (Redis or any RESP-compatible server)."""
+
+    def __init__(
+        self, url: str = "", client: Any = None, prefix: str = "cache:", name: str = "redis"
+    ):
+        if client is None:
+            import redis.asyncio as aioredis  # optional; only needed when a shared backend is set
+
+            client = aioredis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.name = name
+
+    def _key(self, key: Hashable) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        if isinstance(key, tuple) and key and isinstance(key[0], str):
+            # (cache name, key) from `Cache`: keep the name readable so clear() can scope to it
+            return f"{self.prefix}{key[0]}:{digest}"
+        return self.prefix + digest
+
+    async def get(self, key: Hashable) -> Any:
+        raw = await self.client.get(self._key(key))
+        if raw is None:
+            return MISSING
+        return pickle.loads(raw)  # nosec B301 - written by set() below
+
+    async def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        await self.client.set(self._key(key), pickle.dumps(value), px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: Hashable) -> None:
+        await self.client.delete(self._key(key))
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        match = self.prefix + "*"
+        if namespace is not None:
+            match = self.prefix + re.sub(r"([*?\[\]\\])", r"\\\1", namespace) + ":*"
+        async for k in self.client.scan_iter(match=match):
+            await self.client.delete(k)
+
+
+_shared: Optional[RedisBackend] = None
+
+
+def shared_backend() -> Optional[RedisBackend]:
+    """Backend shared by all workers, if `CACHE_BACKEND_URL` is configured."""
+    global _shared
+    if _shared is None and settings.cache_backend_url:
+        _shared = RedisBackend(settings.cache_backend_url)
+    return _shared
+
+
+class Cache:
+    """Async read-through cache with single-flight, negative caching and jittered TTLs.
+
+    Concurrent misses for one key share a single computation, which runs as its
+    own task so a caller hitting its deadline does not abort it for the others.
+    Exceptions are cached for `negative_ttl` seconds when set; otherwise they
+    propagate and the next call retries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: Optional[CacheBackend] = None,
+        ttl: float = 60,
+        negative_ttl: Optional[float] = None,
+        jitter: float = 0.1,
+    ):
+        self.name = name
+        self.backend = backend or MemoryBackend(name=name)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.jitter = jitter
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._lookups = 0
+        self._misses = 0
+        exporter.set_function(CACHE_HIT_RATIO.labels(cache=name), self.hit_ratio)
+
+    def hit_ratio(self) -> float:
+        return 1 - self._misses / self._lookups if self._lookups else 0.0
+
+    def _jittered(self, ttl: float) -> float:
+        # spread expiries so keys filled together don't all miss together
+        return ttl * (1 + random.uniform(-self.jitter, self.jitter)) if self.jitter else ttl
+
+    async def get(self, key: Hashable) -> Any:
+        entry = await self._lookup(key)
+        if entry is MISSING:
+            return MISSING
+        kind, payload = entry
+        if kind == _ERROR:
+            raise payload
+        return payload
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl > 0:  # ttl=0: not worth storing
+            await self.backend.set((self.name, key), (_VALUE, value), self._jittered(ttl))
+
+    async def delete(self, key: Hashable) -> None:
+        await self.backend.delete((self.name, key))
+
+    async def clear(self) -> None:
+        # only this cache's entries: other caches may share the backend
+        await self.backend.clear(self.name)
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[T]], ttl: Optional[float] = None
+    ) -> T:
+        self._lookups += 1
+        entry = await self._lookup(key)
+        if entry is not MISSING:
+            CACHE_REQUESTS.labels(cache=self.name, result="hit").inc()
+            kind, payload = entry
+            if kind == _ERROR:
+                raise payload
+            return payload
+
+        fut = self._inflight.get(key)
+        if fut is not None and fut.get_loop() is asyncio.get_running_loop():
+            CACHE_REQUESTS.labels(cache=self.name, result="coalesced").inc()
+            return await asyncio.shield(fut)
+
+        CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+        self._misses += 1
+        fut = asyncio.ensure_future(self._fill(key, compute, ttl))
+        self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._settle(key, f))
+        return await asyncio.shield(fut)
+
+    async def _lookup(self, key: Hashable) -> Any:
+        try:
+            # namespaced so caches can share one backend
+            return await self.backend.get((self.name, key))
+        except Exception as e:
+            # a shared backend outage degrades to "always miss", never to an error
+            logger.warning(f"Cache {self.name} read failed: {e}")
+            return MISSING
+
+    async def _store(self, key: Hashable, entry: Entry, ttl: float) -> None:
+        if ttl <= 0:  # only coalesce concurrent computations
+            return
+        try:
+            await self.backend.set((self.name, key), entry, self._jittered(ttl))
+        except Exception as e:
+            logger.warning(f"Cache {self.name} write failed: {e}")
+
+    async def _fill(
+        self, key: Hashable, compute: Callable[[], Awaitable[T]], ttl: Optional[float]
+    ) -> T:
+        try:
+            value = await compute()
+        except Exception as e:
+            if self.negative_ttl:
+                await self._store(key, (_ERROR, e), self.negative_ttl)
+            raise
+        await self._store(key, (_VALUE, value), self.ttl if ttl is None else ttl)
+        return value
+
+    def _settle(self, key: Hashable, fut: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved when every waiter gave up
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+_instance_tokens: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
+
+def _owner(obj: Any) -> Hashable:
+    """Key part for a method's `self`/`cls`.
+
+    Classes key by name. Instances key by their `cache_namespace` attribute if
+    they set one (to share entries between equivalent instances or workers),
+    else by a random token that, unlike `id()`, is never reused.
+    """
+    if isinstance(obj, type):
+        return (obj.__module__, obj.__qualname__)
+    namespace = getattr(obj, "cache_namespace", None)
+    if namespace is not None:
+        return namespace
+    try:
+        token = _instance_tokens.get(obj)
+        if token is None:
+            token = _instance_tokens[obj] = uuid.uuid4().hex
+        return token
+    except TypeError:  # unhashable or not weak-referenceable: best effort
+        return id(obj)
+
+
+def make_key(func: Callable, args: tuple, kwargs: dict, is_method: bool = False) -> Hashable:
+    """Hashable key from the call; a method's `self`/`cls` is keyed by `_owner`, not its repr."""
+    if is_method and args:
+        args = (_owner(args[0]),) + args[1:]
+    return (func.__module__, func.__qualname__, _freeze(args), _freeze(kwargs))
+
+
+def cache(
+    ttl: float,
+    *,
+    name: Optional[str] = None,
+    maxsize: int = 1024,
+    policy: str = "lru",
+    negative_ttl: Optional[float] = None,
+    jitter: float = 0.1,
+    backend: Union[str, CacheBackend] = "memory",
+):
+    """Cache an async function's results.
+
+    `backend` is "memory", "shared" (the configured multi-worker backend, falling
+    back to memory when none is set) or a `CacheBackend` instance. The `Cache`
+    is exposed as `wrapper.cache` for invalidation.
+    """
+
     def decorator(func: Callable):
+        cache_name = name or func.__qualname__
+        store: Optional[CacheBackend]
+        if isinstance(backend, CacheBackend):
+            store = backend
+        elif backend == "shared":
+            store = shared_backend()
+        else:
+            store = None
+        store = store or MemoryBackend(maxsize=maxsize, policy=policy, name=cache_name)
+        c = Cache(cache_name, store, ttl=ttl, negative_ttl=negative_ttl, jitter=jitter)
+        params = list(inspect.signature(func).parameters)
+        is_method = bool(params) and params[0] in ("self", "cls")
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            key = str((func.__name__, args, kwargs))
-            hit = _cache.get(key)
-            if hit is not None:
-                return hit
-            result = await func(*args, **kwargs)
-            _cache.set(key, result, ttl)
-            return result
+            key = make_key(func, args, kwargs, is_method=is_method)
+            return await c.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = c  # type: ignore[attr-defined]
         return wrapper
+
     return decorator
@@ -0,0 +1,55 @@
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Shared pool for blocking SDK calls (Gemini, Web3, ...) so they never run on the event loop.
+_pool = ThreadPoolExecutor(
+    max_workers=max(1, settings.blocking_pool_size), thread_name_prefix="blocking"
+)
+# One semaphore per event loop: callers queue on the loop instead of piling up in the pool.
+_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _limits.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(max(1, settings.blocking_pool_size))
+        _limits[loop] = sem
+    return sem
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable in the bounded pool and await its result.
+
+    The permit is held until the call itself finishes: a caller cancelled by its
+    deadline stops waiting, but the thread keeps running and keeps its slot.
+    """
+    sem = _limit()
+    await sem.acquire()
+    loop = asyncio.get_running_loop()
+    try:
+        fut = _pool.submit(functools.partial(func, *args, **kwargs))
+    except BaseException:
+        sem.release()
+        raise
+
+    def release(_: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(sem.release)
+        except RuntimeError:  # loop already closed, and its semaphore with it
+            pass
+
+    fut.add_done_callback(release)
+    return await asyncio.wrap_future(fut, loop=loop)
+
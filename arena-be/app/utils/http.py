@@ -0,0 +1,33 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from config import get_settings
+
+settings = get_settings()
+
+# One pooled session per worker; keeps TCP+TLS connections to upstreams alive.
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    # a session is bound to the loop it was created on (tests spin up a loop per request)
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.http_pool_size, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=settings.http_timeout),
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_session() -> None:
+    global _session, _session_loop
+    if _session is not None and not _session.closed and _session_loop is asyncio.get_running_loop():
+        await _session.close()
+    _session = None
+    _session_loop = None
@@ -1,6 +1,24 @@
+import atexit
+import copy
 import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Tuple
+
+from prometheus_client import Counter
 from pythonjsonlogger import jsonlogger
+
 from app.middleware.request_id import request_id_ctx
+from config import get_settings
+
+settings = get_settings()
+
+LOG_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records not written",
+    ["reason"],  # sampled | queue_full
+)
 
 logger = logging.getLogger("prediction-league")
 logger.setLevel(logging.INFO)
@@ -13,7 +31,7 @@ formatter = jsonlogger.JsonFormatter(
     )
 )
 handler.setFormatter(formatter)
-logger.handlers = [handler]
+
 
 class RequestIdFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
@@ -24,4 +42,87 @@ class RequestIdFilter(logging.Filter):
         setattr(record, "request_id", rid)
         return True
 
+
+class SamplingFilter(logging.Filter):
+    """Lets through at most `burst` records per call site (file:line) per `window` seconds.
+
+    The first record of a call site after a suppressed stretch carries
+    `suppressed` (records dropped since the last one written); drops are also
+    counted in `log_records_dropped_total{reason="sampled"}`. CRITICAL is never
+    sampled. Concurrent threads can only skew the counts slightly.
+    """
+
+    def __init__(self, burst: int, window: float):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        # (pathname, lineno) -> [window start, records in window, suppressed]
+        self._sites: Dict[Tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno >= logging.CRITICAL:
+            return True
+        now = time.monotonic()
+        site = self._sites.get((record.pathname, record.lineno))
+        if site is None:
+            self._sites[(record.pathname, record.lineno)] = [now, 1, 0]
+            return True
+        if now - site[0] >= self.window:
+            site[0], site[1] = now, 0
+        if site[1] >= self.burst:
+            site[2] += 1
+            LOG_DROPPED.labels(reason="sampled").inc()
+            return False
+        site[1] += 1
+        if site[2]:
+            record.suppressed, site[2] = site[2], 0
+        return True
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to the listener thread; when the queue is full they are dropped."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge args and render the traceback here (they may not survive the thread hop),
+        # but leave the JSON formatting to the listener
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = formatter.formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.labels(reason="queue_full").inc()
+
+
+def stop_listener(listener: QueueListener, q: "queue.Queue", timeout: float = 5.0) -> None:
+    """Stop `listener` after it has written everything queued so far.
+
+    The stop sentinel goes in behind the queued records, so wait (bounded) for
+    room rather than losing it to a full queue.
+    """
+    deadline = time.monotonic() + timeout
+    while q.full() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        listener.stop()
+    except queue.Full:
+        pass
+
+
+logger.addFilter(SamplingFilter(settings.log_sample_burst, settings.log_sample_window))
 logger.addFilter(RequestIdFilter())
+
+if settings.log_queue_size > 0:
+    # formatting and the stderr write happen on a thread, not on the event loop
+    _queue: "queue.Queue[logging.LogRecord]" = queue.Queue(settings.log_queue_size)
+    listener = QueueListener(_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_listener, listener, _queue)
+    logger.handlers = [BoundedQueueHandler(_queue)]
+else:
+    logger.handlers = [handler]
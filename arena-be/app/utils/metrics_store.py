@@ -0,0 +1,184 @@
+"""Prometheus exposition for one worker or many.
+
+With `PROMETHEUS_MULTIPROC_DIR` set in the environment before the app starts
+(prometheus_client picks its value store at import), every worker writes its
+samples to mmap files in that directory and `/metrics` merges them, so any
+worker answers for all of them. Point it at an empty directory per deployment.
+
+Files of exited workers are folded into one `<type>_archive.db` per metric
+type (live-mode gauges are dropped), either on graceful shutdown or by the
+next scrape that finds their pid gone, so a scrape reads one file per live
+worker plus the archives however often workers were restarted. The merged
+output is cached for `metrics_cache_ttl` seconds and built off the event loop.
+"""
+import asyncio
+import contextlib
+import fcntl
+import glob
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from prometheus_client import CollectorRegistry, Gauge, generate_latest, multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+
+from app.utils.executor import run_blocking
+from app.utils.logger import logger
+from config import get_settings
+
+settings = get_settings()
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+# per-pid files whose values must survive the worker (summed into the archive)
+ARCHIVED = ("counter", "histogram", "summary")
+
+
+@contextlib.contextmanager
+def _locked(path: str, shared: bool = False) -> Iterator[None]:
+    # scrapes read under a shared lock so they never see a worker both archived and live
+    with open(os.path.join(path, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _pids(path: str) -> Set[int]:
+    pids = set()
+    for f in glob.glob(os.path.join(path, "*.db")):
+        pid = os.path.basename(f)[:-3].rsplit("_", 1)[-1]
+        if pid.isdigit():
+            pids.add(int(pid))
+    return pids
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def archive(path: str, pids: Sequence[int]) -> None:
+    """Fold the files of exited workers `pids` into the archives and delete them."""
+    with _locked(path):
+        for typ in ARCHIVED:
+            files = [os.path.join(path, f"{typ}_{pid}.db") for pid in pids]
+            files = [f for f in files if os.path.exists(f)]
+            if not files:
+                continue
+            target = os.path.join(path, f"{typ}_archive.db")
+            totals: Dict[str, float] = {}
+            for f in ([target] if os.path.exists(target) else []) + files:
+                for key, value, _, _ in MmapedDict.read_all_values_from_file(f):
+                    totals[key] = totals.get(key, 0.0) + value
+            tmp = target + ".tmp"  # not *.db, so scrapes never read it half-written
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            out = MmapedDict(tmp)
+            try:
+                for key, value in totals.items():
+                    out.write_value(key, value, 0.0)
+            finally:
+                out.close()
+            os.replace(tmp, target)
+            for f in files:
+                os.remove(f)
+        for pid in pids:
+            multiprocess.mark_process_dead(pid, path)
+
+
+def mark_process_dead(pid: int, path: str = MULTIPROC_DIR) -> None:
+    """Worker-exit hook, e.g. from gunicorn's `child_exit`; a no-op in single-process mode."""
+    if path:
+        archive(path, [pid])
+
+
+def collect(path: str) -> bytes:
+    """Merged exposition of every worker writing to `path`, archiving exited ones first."""
+    dead = [pid for pid in _pids(path) if not _alive(pid)]
+    if dead:
+        archive(path, dead)
+        logger.info(f"Archived metrics of exited workers {sorted(dead)}")
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path)
+    with _locked(path, shared=True):
+        return generate_latest(registry)
+
+
+class MetricsExporter:
+    """Serves `/metrics` and keeps callback gauges current in multiprocess mode."""
+
+    def __init__(self, path: str = MULTIPROC_DIR):
+        self.path = path
+        self._sampled: List[Tuple[Gauge, Callable[[], float]]] = []
+        self._body: Optional[bytes] = None
+        self._expires = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def multiprocess(self) -> bool:
+        return bool(self.path)
+
+    def set_function(self, gauge: Gauge, fn: Callable[[], float]) -> None:
+        """`Gauge.set_function` that also works across workers.
+
+        File-backed gauges cannot call back at scrape time (another worker may
+        answer), so in multiprocess mode `fn` is sampled into the gauge every
+        `metrics_sample_interval` seconds and before this worker renders.
+        """
+        if self.multiprocess:
+            self._sampled.append((gauge, fn))
+        else:
+            gauge.set_function(fn)
+
+    def sample(self) -> None:
+        for gauge, fn in self._sampled:
+            try:
+                gauge.set(fn())
+            except Exception as e:
+                logger.warning(f"Metric sampling failed: {e}")
+
+    async def render(self) -> bytes:
+        if not self.multiprocess:
+            return generate_latest()
+        if self._body is not None and time.monotonic() < self._expires:
+            return self._body
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:  # concurrent scrapes share one merge
+            if self._body is None or time.monotonic() >= self._expires:
+                self.sample()
+                self._body = await run_blocking(collect, self.path)
+                self._expires = time.monotonic() + settings.metrics_cache_ttl
+        return self._body
+
+    async def start(self) -> None:
+        if self.multiprocess and self._sampled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.multiprocess:
+            await run_blocking(mark_process_dead, os.getpid(), self.path)
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(settings.metrics_sample_interval)
+
+
+exporter = MetricsExporter()
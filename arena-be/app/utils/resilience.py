@@ -0,0 +1,236 @@
+"""Circuit breakers, adaptive deadlines and hedged reads for external dependencies.
+
+Each upstream (CoinGecko, Gemini, the BlockDAG RPC node) is one `Upstream`,
+shared by every caller in the worker. It keeps:
+
+- a circuit breaker: `breaker_failure_threshold` consecutive failures or
+  timeouts open it, and calls then raise `CircuitOpen` at once, so callers take
+  their fallback in microseconds instead of waiting out a deadline. After
+  `breaker_reset_timeout` seconds one trial call is let through (half-open);
+  its outcome closes or re-opens the breaker.
+- a deadline per operation: the observed `adaptive_timeout_percentile` latency
+  times `adaptive_timeout_multiplier`, clamped to [`adaptive_timeout_min`, the
+  upstream's configured timeout]. Until enough calls have been seen, it is the
+  configured timeout.
+- optional hedging for idempotent reads: if the call has not finished
+  within the `hedge_percentile` latency, a second identical call is started
+  and whichever succeeds first wins.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+from app.utils.logger import logger
+from app.utils.timing import upstream_error
+from config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Upstream circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ["upstream"],
+    multiprocess_mode="livemax",
+)
+BREAKER_REJECTED = Counter(
+    "circuit_breaker_rejected_total", "Calls failed fast by an open breaker", ["upstream"]
+)
+UPSTREAM_DEADLINE = Gauge(
+    "upstream_deadline_seconds",
+    "Current adaptive deadline per upstream operation",
+    ["upstream", "op"],
+    multiprocess_mode="livemax",
+)
+UPSTREAM_HEDGES = Counter(
+    "upstream_hedges_total",
+    "Second attempts started for slow idempotent reads",
+    ["upstream", "winner"],  # primary | hedge | none (both failed)
+)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, upstream: str):
+        super().__init__(f"{upstream} circuit open")
+        self.upstream = upstream
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        BREAKER_STATE.labels(upstream=name).set(0)
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._set(HALF_OPEN)
+        if self._probing:  # half-open: one trial call at a time
+            return False
+        self._probing = True
+        return True
+
+    def success(self) -> None:
+        self._probing = False
+        self.failures = 0
+        if self.state != CLOSED:
+            self._set(CLOSED)
+            logger.info(f"{self.name} circuit closed")
+
+    def failure(self) -> None:
+        self._probing = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            if self.state != OPEN:
+                self._set(OPEN)
+                logger.warning(
+                    f"{self.name} circuit open after {self.failures} failures; "
+                    f"retrying in {self.reset_timeout:.0f}s"
+                )
+
+    def release(self) -> None:
+        """The admitted call was cancelled by its caller: no verdict on the upstream."""
+        self._probing = False
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        BREAKER_STATE.labels(upstream=self.name).set(_STATE_VALUE[state])
+
+
+class LatencyWindow:
+    """The last `size` call durations (timeouts at their deadline); sorted every 16 samples."""
+
+    MIN_SAMPLES = 20
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._sorted: List[float] = []
+        self._stale = 0
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._stale += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.MIN_SAMPLES:
+            return None
+        if self._stale >= 16 or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._stale = 0
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class Upstream:
+    def __init__(self, name: str, max_timeout: float):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.breaker = CircuitBreaker(
+            name, settings.breaker_failure_threshold, settings.breaker_reset_timeout
+        )
+        self._latency: Dict[str, LatencyWindow] = {}
+
+    def latency(self, op: str = "") -> LatencyWindow:
+        window = self._latency.get(op)
+        if window is None:
+            window = self._latency[op] = LatencyWindow(settings.upstream_latency_window)
+        return window
+
+    def deadline(self, op: str = "") -> float:
+        p = self.latency(op).percentile(settings.adaptive_timeout_percentile)
+        if p is None:
+            return self.max_timeout
+        adaptive = max(settings.adaptive_timeout_min, p * settings.adaptive_timeout_multiplier)
+        return min(self.max_timeout, adaptive)
+
+    async def call(
+        self, fn: Callable[[], Awaitable[T]], op: str = "", hedge: bool = False
+    ) -> T:
+        """Run `fn()` under the breaker and the adaptive deadline of `op`.
+
+        `hedge=True` marks the call safe to send twice. Raises `CircuitOpen` without
+        calling `fn` while the breaker is open, `asyncio.TimeoutError` past the deadline.
+        """
+        if not self.breaker.allow():
+            BREAKER_REJECTED.labels(upstream=self.name).inc()
+            raise CircuitOpen(self.name)
+        deadline = self.deadline(op)
+        UPSTREAM_DEADLINE.labels(upstream=self.name, op=op).set(deadline)
+        start = time.perf_counter()
+        try:
+            if hedge and settings.upstream_hedging:
+                result = await asyncio.wait_for(self._hedged(fn, op), deadline)
+            else:
+                result = await asyncio.wait_for(fn(), deadline)
+        except asyncio.TimeoutError:
+            # counts as a slow sample too, so a slowed-down upstream raises its own deadline
+            self.latency(op).observe(deadline)
+            upstream_error(self.name, "timeout")
+            self.breaker.failure()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception:
+            upstream_error(self.name)
+            self.breaker.failure()
+            raise
+        self.latency(op).observe(time.perf_counter() - start)
+        self.breaker.success()
+        return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[T]], op: str) -> T:
+        delay = self.latency(op).percentile(settings.hedge_percentile)
+        primary = asyncio.ensure_future(fn())
+        if delay is None:
+            return await primary
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            tasks.append(asyncio.ensure_future(fn()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "primary" if task is primary else "hedge"
+                        UPSTREAM_HEDGES.labels(upstream=self.name, winner=winner).inc()
+                        return task.result()
+            UPSTREAM_HEDGES.labels(upstream=self.name, winner="none").inc()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+upstreams: Dict[str, Upstream] = {}
+
+
+def upstream(name: str, max_timeout: float) -> Upstream:
+    """The worker's shared `Upstream` for `name`, created on first use."""
+    u = upstreams.get(name)
+    if u is None:
+        u = upstreams[name] = Upstream(name, max_timeout)
+    return u
@@ -0,0 +1,22 @@
+from typing import Any, Type
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=OPTIONS)
+
+
+def serialize(model: Type[BaseModel], data: Any) -> bytes:
+    """Validate `data` against `model` once and encode it; callers cache the bytes."""
+    return dumps(model.model_validate(data).model_dump())
+
+
+class PreparedJSONResponse(Response):
+    """Body is already-encoded JSON, so FastAPI skips `response_model` validation."""
+
+    media_type = "application/json"
@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import Counter, Histogram
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Duration of one stage of request handling or a background job",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total",
+    "Failed calls to external dependencies",
+    ["upstream", "kind"],  # error | timeout
+)
+
+
+class Timings:
+    """Stage durations of one request, summed per stage name.
+
+    Stages that run concurrently each report their own duration, so the sum of
+    stages can exceed the request total.
+    """
+
+    __slots__ = ("start", "stages")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value, durations in milliseconds."""
+        parts = [f"{name};dur={s * 1e3:.1f}" for name, s in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed() * 1e3:.1f}")
+        return ", ".join(parts)
+
+    def breakdown(self) -> Dict[str, float]:
+        return {name: round(s * 1e3, 1) for name, s in self.stages.items()}
+
+
+# set per request by the pipeline middleware; copied into tasks the request spawns
+timings_ctx: ContextVar[Optional[Timings]] = ContextVar("timings", default=None)
+
+
+def upstream_error(upstream: str, kind: str = "error") -> None:
+    UPSTREAM_ERRORS.labels(upstream=upstream, kind=kind).inc()
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block into `stage_duration_seconds{stage}` and the current request's timings.
+
+    Only timing: upstream failures are counted once, where the call is made
+    (`app.utils.resilience.Upstream.call`), not by every span around it.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        timings = timings_ctx.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
@@ -0,0 +1,120 @@
+"""Cheap-endpoint latency during a /predict flood, with and without admission control.
+
+Run from arena-be/:  python -m benchmarks.bench_admission [--flood 200] [--probes 50]
+
+An in-process app behind `RequestPipelineMiddleware` serves `/predict`, which
+alternates ~1 ms of CPU with awaits (like the real pipeline), and `/price`.
+`--flood` concurrent /predict clients keep it saturated while `/price` is probed
+one request at a time. Per mode it prints /price p50/p99, the p50 of served
+/predict calls, the peak number of /predict handlers running at once (what
+holds memory) and the /predict status counts, as one JSON object.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.middleware.admission import PRIORITIES, AdmissionController
+from app.middleware.pipeline import RequestPipelineMiddleware
+from app.middleware.rate_limit import GCRALimiter
+
+
+def build_app(admission: AdmissionController, running: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/predict")
+    async def predict():
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        for _ in range(5):
+            end = time.perf_counter() + 0.0002
+            while time.perf_counter() < end:  # model / signing work
+                pass
+            await asyncio.sleep(0.01)  # upstream round trip
+        running["now"] -= 1
+        return {"ok": True}
+
+    @app.get("/price")
+    async def price():
+        return {"price": 2500.0}
+
+    app.add_middleware(
+        RequestPipelineMiddleware, limiter=GCRALimiter(rate_per_min=10**9), admission=admission
+    )
+    return app
+
+
+async def measure(
+    admission: AdmissionController, flood: int, probes: int, backoff: float
+) -> dict:
+    running = {"now": 0, "peak": 0}
+    transport = httpx.ASGITransport(app=build_app(admission, running))
+    statuses: dict = {}
+    served: list = []
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def flooder():
+            while not stop.is_set():
+                start = time.perf_counter()
+                r = await client.post("/predict")
+                if r.status_code == 200:
+                    served.append(time.perf_counter() - start)
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+                if r.status_code == 503:  # a client honouring Retry-After, scaled down
+                    await asyncio.sleep(backoff)
+
+        tasks = [asyncio.ensure_future(flooder()) for _ in range(flood)]
+        await asyncio.sleep(0.2)
+        samples = []
+        for _ in range(probes):
+            start = time.perf_counter()
+            await client.get("/price")
+            samples.append(time.perf_counter() - start)
+        stop.set()
+        await asyncio.gather(*tasks)
+    samples.sort()
+    served.sort()
+    return {
+        "price_p50_ms": round(samples[len(samples) // 2] * 1e3, 2),
+        "price_p99_ms": round(samples[int(len(samples) * 0.99)] * 1e3, 2),
+        "predict_p50_ms": round(served[len(served) // 2] * 1e3, 2),
+        "predict_peak_running": running["peak"],
+        "predict_status": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+async def run(args) -> dict:
+    low = PRIORITIES["low"]
+    limited = AdmissionController(
+        max_inflight=256,
+        queue_size=args.queue,
+        queue_timeout=0.5,
+        route_limits={"/predict": args.limit},
+        priorities={"/predict": low},
+    )
+    unlimited = AdmissionController(0, 0, 0.0, {}, {})
+    backoff = args.backoff_ms / 1e3
+    return {
+        "benchmark": "admission",
+        "flood": args.flood,
+        "unlimited": await measure(unlimited, args.flood, args.probes, backoff),
+        "admission": await measure(limited, args.flood, args.probes, backoff),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--flood", type=int, default=200)
+    ap.add_argument("--probes", type=int, default=50)
+    ap.add_argument("--backoff-ms", type=float, default=50.0)
+    ap.add_argument("--limit", type=int, default=32)
+    ap.add_argument("--queue", type=int, default=64)
+    print(json.dumps(asyncio.run(run(ap.parse_args()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Fan-out cost of one published update.
+
+Run from arena-be/:  python -m benchmarks.bench_broadcast [--subscribers N] [--messages N]
+Prints one JSON object: publish time per message and per subscriber, with the
+payload encoded once per message.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.utils.broadcast import Broadcaster
+
+
+async def run(subscribers: int, messages: int) -> dict:
+    hub = Broadcaster(maxsize=messages + 1)
+    subs = [hub.subscribe(["leaderboard"]) for _ in range(subscribers)]
+    payload = {
+        "upserts": [
+            {"rank": i, "user_address": f"0x{i:040x}", "accuracy_score": 0.9,
+             "total_predictions": 10, "avg_error": 12.5}
+            for i in range(1, 6)
+        ],
+        "removed": [],
+        "total_players": 1000,
+    }
+    start = time.perf_counter()
+    for _ in range(messages):
+        hub.publish("leaderboard", "leaderboard.diff", payload)
+    elapsed = time.perf_counter() - start
+    assert all(s.queue.qsize() == messages for s in subs)
+    return {
+        "subscribers": subscribers,
+        "messages": messages,
+        "publish_ms": round(elapsed / messages * 1e3, 3),
+        "per_subscriber_us": round(elapsed / messages / subscribers * 1e6, 3),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--subscribers", type=int, default=5_000)
+    ap.add_argument("--messages", type=int, default=50)
+    args = ap.parse_args()
+    result = {"benchmark": "broadcast"}
+    result.update(asyncio.run(run(args.subscribers, args.messages)))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
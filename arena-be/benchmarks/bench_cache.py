@@ -0,0 +1,99 @@
+"""Per-operation cost of the read-through cache.
+
+Run from arena-be/:  python -m benchmarks.bench_cache [--keys N] [--ops N] [--maxsize N]
+Measures `Cache.get_or_compute` hits and misses over a Zipf-like key stream for
+each eviction policy, and a burst of concurrent misses on one key that
+single-flight should collapse into one computation. Prints one JSON object.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from app.utils.cache import Cache, MemoryBackend
+
+
+def _keys(n_keys: int, ops: int, seed: int = 42) -> list:
+    # a few hot keys and a long tail, like quantized reasoning / price lookups
+    rnd = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(n_keys)]
+    return rnd.choices(range(n_keys), weights=weights, k=ops)
+
+
+async def _value() -> int:
+    return 1
+
+
+def bench_policy(policy: str, keys: list, maxsize: int) -> dict:
+    cache = Cache("bench", MemoryBackend(maxsize=maxsize, policy=policy, name="bench"), ttl=3600)
+    misses = 0
+
+    async def compute() -> int:
+        nonlocal misses
+        misses += 1
+        return 1
+
+    async def run():
+        start = time.perf_counter_ns()
+        for k in keys:
+            await cache.get_or_compute(k, compute)
+        return (time.perf_counter_ns() - start) / len(keys)
+
+    ns = asyncio.run(run())
+    return {"get_or_compute_ns": round(ns, 1), "hit_ratio": round(1 - misses / len(keys), 4)}
+
+
+def bench_hit(ops: int) -> dict:
+    cache = Cache("bench", MemoryBackend(name="bench"), ttl=3600)
+
+    async def run():
+        await cache.get_or_compute("hot", _value)
+        start = time.perf_counter_ns()
+        for _ in range(ops):
+            await cache.get_or_compute("hot", _value)
+        return (time.perf_counter_ns() - start) / ops
+
+    return {"hit_ns": round(asyncio.run(run()), 1)}
+
+
+def bench_coalesced(callers: int) -> dict:
+    cache = Cache("bench", MemoryBackend(name="bench"), ttl=3600)
+    computed = 0
+
+    async def slow() -> int:
+        nonlocal computed
+        computed += 1
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def run():
+        start = time.perf_counter_ns()
+        await asyncio.gather(*(cache.get_or_compute("cold", slow) for _ in range(callers)))
+        return (time.perf_counter_ns() - start) / 1e6
+
+    wall_ms = asyncio.run(run())
+    return {"callers": callers, "computations": computed, "wall_ms": round(wall_ms, 2)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--keys", type=int, default=20_000)
+    ap.add_argument("--ops", type=int, default=200_000)
+    ap.add_argument("--maxsize", type=int, default=1024)
+    ap.add_argument("--callers", type=int, default=1_000)
+    args = ap.parse_args()
+
+    keys = _keys(args.keys, args.ops)
+    result = {
+        "benchmark": "cache",
+        "hit": bench_hit(args.ops),
+        "lru": bench_policy("lru", keys, args.maxsize),
+        "lfu": bench_policy("lfu", keys, args.maxsize),
+        "coalesced": bench_coalesced(args.callers),
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""End-to-end load test of the API against deterministic local stand-ins.
+
+Run from arena-be/:  python -m benchmarks.bench_load [--requests N] [--concurrency C] [--workers W]
+
+Starts `benchmarks.standin_app` under uvicorn with CoinGecko and the RPC node
+pointed at `standins.UpstreamStandIn`, Gemini replaced by `StandInModel` and a
+throwaway SQLite database seeded with `--players` users and leaderboard rows
+(or `--database-url`, which is only seeded when its users table is empty).
+Each scenario is driven over real sockets with `--concurrency` requests in
+flight; prints one JSON object with p50/p95/p99 latency and requests/sec per
+scenario, and resident memory per worker after the run (Linux only).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+from sqlalchemy import create_engine, insert, select
+
+from app.db.models import Base, LeaderboardEntry, User
+from benchmarks.standins import (
+    STANDIN_CHAIN_ID,
+    STANDIN_CONTRACT,
+    STANDIN_PRIVATE_KEY,
+    UpstreamStandIn,
+)
+
+ARENA_BE = Path(__file__).resolve().parents[1]
+SCENARIOS = ("price", "predict", "leaderboard", "users")
+WARMUP = 20
+
+Request = Tuple[str, str, dict]  # method, path, json body
+
+
+def _address(i: int) -> str:
+    return f"0x{i:040x}"
+
+
+def scenario(name: str, addresses: List[str]) -> Callable[[int], Request]:
+    def price(i):
+        return "GET", "/api/v1/price", {}
+
+    def predict(i):
+        body = {"user_address": addresses[i % len(addresses)], "prediction_value": 2400 + i % 200}
+        return "POST", "/api/v1/predict", body
+
+    def leaderboard(i):
+        return "GET", "/api/v1/leaderboard?limit=50", {}
+
+    def users(i):
+        return "GET", f"/api/v1/users/{addresses[i % len(addresses)]}", {}
+
+    return {"price": price, "predict": predict, "leaderboard": leaderboard, "users": users}[name]
+
+
+def seed_database(url: str, players: int, seed: int) -> List[str]:
+    """Create the tables and, if there are no users yet, `players` users with scores."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        addresses = list(conn.scalars(select(User.user_address).limit(players)))
+        if not addresses:
+            rnd = random.Random(seed)
+            addresses = [_address(i + 1) for i in range(players)]
+            conn.execute(
+                insert(User),
+                [{"user_address": a, "nickname": f"p{i}"} for i, a in enumerate(addresses)],
+            )
+            conn.execute(
+                insert(LeaderboardEntry),
+                [
+                    {
+                        "user_address": a,
+                        "accuracy_score": rnd.random(),
+                        "total_predictions": rnd.randint(1, 200),
+                        "avg_error": rnd.uniform(1, 300),
+                    }
+                    for a in addresses
+                ],
+            )
+    engine.dispose()
+    return addresses
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+async def drive(
+    client: httpx.AsyncClient, make: Callable[[int], Request], requests: int, concurrency: int
+) -> dict:
+    for i in range(WARMUP):
+        method, path, body = make(i)
+        await client.request(method, path, json=body or None)
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, body = make(i)
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, path, json=body or None)
+                errors += r.status_code >= 400
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / wall, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1e3, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1e3, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1e3, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1e3, 3),
+    }
+
+
+def _proc_status(pid: int) -> Dict[str, int]:
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                out[key] = int(value.split()[0])  # kB
+    return out
+
+
+def _children(pid: int) -> List[int]:
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                helper = b"resource_tracker" in f.read()
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid and not helper:
+            found.append(int(entry))
+    return sorted(found)
+
+
+def worker_memory(pid: int) -> List[dict]:
+    """Resident and peak memory of each uvicorn worker (the server itself with one)."""
+    if not os.path.isdir("/proc"):
+        return []
+    out = []
+    for p in _children(pid) or [pid]:
+        try:
+            status = _proc_status(p)
+        except OSError:
+            continue
+        out.append(
+            {
+                "pid": p,
+                "rss_mb": round(status.get("VmRSS", 0) / 1024, 1),
+                "peak_rss_mb": round(status.get("VmHWM", 0) / 1024, 1),
+            }
+        )
+    return out
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(client: httpx.AsyncClient, proc: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not become ready")
+
+
+def server_env(upstream: UpstreamStandIn, database_url: str, llm_latency: float) -> Dict[str, str]:
+    """Environment for the server process: every dependency pointed at a stand-in."""
+    path = [str(ARENA_BE), str(ARENA_BE.parent), os.environ.get("PYTHONPATH", "")]
+    return {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(p for p in path if p),
+        "DATABASE_URL": database_url,
+        "COINGECKO_URL": upstream.coingecko_url,
+        "BLOCKDAG_RPC_URL": upstream.rpc_url,
+        "PRIVATE_KEY": STANDIN_PRIVATE_KEY,
+        "CONTRACT_ADDRESS": STANDIN_CONTRACT,
+        "CHAIN_ID": str(STANDIN_CHAIN_ID),
+        "GEMINI_API_KEY": "",
+        "CACHE_BACKEND_URL": "",
+        "RATE_LIMIT_BACKEND": "memory",
+        "RATE_LIMIT_RPM": str(10**9),
+        "ENABLE_USER_REGISTRATION": "true",
+        "PRICE_HISTORY_PATH": "",
+        "BENCH_LLM_LATENCY": str(llm_latency / 1000),
+    }
+
+
+async def run(args) -> dict:
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    tmp = tempfile.mkdtemp(prefix="arena-bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    addresses = seed_database(database_url, args.players, args.seed)
+    upstream = UpstreamStandIn(seed=args.seed, latency=args.upstream_latency / 1000)
+    await upstream.start()
+    port = free_port()
+    log_path = os.path.join(tmp, "server.log")
+    log = open(log_path, "w")
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.standin_app:app",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(args.workers),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=ARENA_BE,
+        env=server_env(upstream, database_url, args.llm_latency),
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    result: dict = {
+        "benchmark": "load",
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "players": len(addresses),
+            "database": database_url.split(":", 1)[0],
+            "llm_latency_ms": args.llm_latency,
+            "upstream_latency_ms": args.upstream_latency,
+        },
+        "scenarios": {},
+    }
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30
+        ) as client:
+            await _wait_ready(client, proc, args.startup_timeout)
+            for name in names:
+                result["scenarios"][name] = await drive(
+                    client, scenario(name, addresses), args.requests, args.concurrency
+                )
+        result["workers"] = worker_memory(proc.pid)
+        result["upstream_calls"] = dict(upstream.calls)
+    except Exception:
+        log.flush()
+        with open(log_path) as f:
+            sys.stderr.write(f.read())
+        raise
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        log.close()
+        await upstream.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return result
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--requests", type=int, default=2_000, help="per scenario")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--players", type=int, default=10_000)
+    ap.add_argument("--database-url", default="", help="sync-style URL; default: temp SQLite")
+    ap.add_argument("--llm-latency", type=float, default=0.0, help="ms per Gemini call")
+    ap.add_argument("--upstream-latency", type=float, default=0.0, help="ms per CoinGecko/RPC call")
+    ap.add_argument("--startup-timeout", type=float, default=60.0)
+    ap.add_argument("--seed", type=int, default=42)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    add_arguments(ap)
+    args = ap.parse_args()
+    print(json.dumps(asyncio.run(run(args))))
+
+
+if __name__ == "__main__":
+    main()
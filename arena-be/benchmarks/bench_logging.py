@@ -0,0 +1,76 @@
+"""Caller-side cost of a log call: inline JSON handler vs the queued, sampled pipeline.
+
+Run from arena-be/:  python -m benchmarks.bench_logging [--ops N]
+
+`inline_us` formats and writes on the calling thread (the old setup),
+`queued_us` only hands the record to the writer thread, and `sampled_us` is a
+call site past its sampling budget (a failing upstream). Output goes to
+/dev/null. Prints one JSON object.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueListener
+
+from app.utils.logger import (
+    BoundedQueueHandler,
+    RequestIdFilter,
+    SamplingFilter,
+    formatter,
+    stop_listener,
+)
+
+
+def _logger(name: str, *filters: logging.Filter) -> logging.Logger:
+    log = logging.getLogger(f"bench.{name}")
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    for f in filters:
+        log.addFilter(f)
+    return log
+
+
+def _us_per_call(log: logging.Logger, ops: int, q: "queue.Queue") -> float:
+    while not q.empty():  # let the writer thread finish the previous run first
+        time.sleep(0.01)
+    start = time.perf_counter()
+    for i in range(ops):
+        log.warning(f"Coingecko fail: upstream returned 503 ({i})")
+    return round((time.perf_counter() - start) / ops * 1e6, 2)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ops", type=int, default=50_000)
+    args = ap.parse_args()
+
+    sink = logging.StreamHandler(open(os.devnull, "w"))
+    sink.setFormatter(formatter)
+
+    inline = _logger("inline", RequestIdFilter())
+    inline.addHandler(sink)
+
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(args.ops + 1)
+    listener = QueueListener(q, sink)
+    listener.start()
+    queued = _logger("queued", RequestIdFilter())
+    queued.addHandler(BoundedQueueHandler(q))
+    sampled = _logger("sampled", SamplingFilter(20, 60.0), RequestIdFilter())
+    sampled.addHandler(BoundedQueueHandler(q))
+
+    result = {
+        "benchmark": "logging",
+        "ops": args.ops,
+        "inline_us": _us_per_call(inline, args.ops, q),
+        "queued_us": _us_per_call(queued, args.ops, q),
+        "sampled_us": _us_per_call(sampled, args.ops, q),
+    }
+    stop_listener(listener, q)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
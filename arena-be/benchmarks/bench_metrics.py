@@ -0,0 +1,86 @@
+"""Cost of a multiprocess `/metrics` scrape as workers come and go.
+
+Run from arena-be/:  python -m benchmarks.bench_metrics [--workers 4] [--restarts 200]
+
+Fills a temporary PROMETHEUS_MULTIPROC_DIR with `--workers` live workers and
+`--restarts` exited ones, each holding `--series` counter and histogram
+series, and times the merge while exited workers' files are kept (plain
+prometheus_client) against after they are folded into the archives. Prints
+one JSON object.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+from app.utils import metrics_store
+
+BUCKETS = ("0.005", "0.05", "0.5", "5.0", "+Inf")
+
+
+def fill(path: str, pid: int, series: int) -> None:
+    counters = MmapedDict(os.path.join(path, f"counter_{pid}.db"))
+    histograms = MmapedDict(os.path.join(path, f"histogram_{pid}.db"))
+    for i in range(series):
+        labels = ["GET", f"/route/{i}", "200"]
+        names = ["method", "path", "status"]
+        key = mmap_key("requests_total", "requests_total", names, labels, "Requests")
+        counters.write_value(key, 1.0, 0.0)
+        for le in BUCKETS:
+            key = mmap_key(
+                "latency_seconds", "latency_seconds_bucket", names + ["le"], labels + [le], "Lat"
+            )
+            histograms.write_value(key, 1.0, 0.0)
+    counters.close()
+    histograms.close()
+
+
+def scrape_ms(path: str, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path)
+        generate_latest(registry)
+    return round((time.perf_counter() - start) / runs * 1e3, 2)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--restarts", type=int, default=200)
+    ap.add_argument("--series", type=int, default=500)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    path = tempfile.mkdtemp(prefix="arena-metrics-")
+    try:
+        # pids above the kernel's pid_max never belong to a running process
+        exited = [4_200_000 + i for i in range(args.restarts)]
+        for pid in [os.getpid() + i for i in range(args.workers)] + exited:
+            fill(path, pid, args.series)
+        kept = scrape_ms(path, args.runs)
+        start = time.perf_counter()
+        metrics_store.archive(path, exited)
+        archive_ms = round((time.perf_counter() - start) * 1e3, 1)
+        archived = scrape_ms(path, args.runs)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    print(json.dumps({
+        "benchmark": "metrics",
+        "workers": args.workers,
+        "restarts": args.restarts,
+        "series": args.series,
+        "scrape_kept_ms": kept,
+        "scrape_archived_ms": archived,
+        "archive_once_ms": archive_ms,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Middleware overhead on /health: legacy BaseHTTPMiddleware stack vs the pure-ASGI pipeline.
+
+Run from arena-be/:  python -m benchmarks.bench_middleware [--requests N] [--concurrency C]
+Both apps are driven in-process through httpx's ASGI transport, so the numbers
+are middleware + routing cost without a socket in the way. Prints one JSON object.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import metrics
+from app.middleware.pipeline import RequestPipelineMiddleware
+from app.middleware.rate_limit import GCRALimiter
+from app.middleware.request_id import request_id_ctx
+
+UNLIMITED = 10**9
+
+
+class LegacyRequestId(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        rid = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        token = request_id_ctx.set(rid)
+        try:
+            response = await call_next(request)
+        finally:
+            request_id_ctx.reset(token)
+        response.headers["X-Request-ID"] = rid
+        return response
+
+
+class LegacyRateLimit(BaseHTTPMiddleware):
+    store: dict = {}
+
+    async def dispatch(self, request, call_next):
+        now = time.time()
+        key = f"{request.client.host}:{int(now // 60)}"
+        count = self.store.get(key, (now, 0))[1] + 1
+        self.store[key] = (now, count)
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(UNLIMITED)
+        response.headers["X-RateLimit-Remaining"] = str(UNLIMITED - count)
+        return response
+
+
+class LegacyMetrics(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        elapsed = time.perf_counter() - start
+        path = metrics.route_path(request.scope)
+        metrics.observe(request.method, path, response.status_code, elapsed)
+        return response
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    if variant == "legacy":
+        app.add_middleware(LegacyRequestId)
+        app.add_middleware(LegacyRateLimit)
+        app.add_middleware(LegacyMetrics)
+    else:
+        app.add_middleware(RequestPipelineMiddleware, limiter=GCRALimiter(UNLIMITED))
+    return app
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # warm-up
+            await client.get("/health")
+
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.get("/health")
+                latencies.append(time.perf_counter() - t0)
+                assert r.status_code == 200, r.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": round(requests / wall, 1),
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 1),
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1] * 1e6, 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=5_000)
+    ap.add_argument("--concurrency", type=int, default=1)
+    args = ap.parse_args()
+
+    result: dict = {"benchmark": "middleware", "endpoint": "/health"}
+    for variant in ("legacy", "pipeline"):
+        result[variant] = asyncio.run(drive(build_app(variant), args.requests, args.concurrency))
+    result["speedup"] = round(result["pipeline"]["rps"] / result["legacy"]["rps"], 2)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
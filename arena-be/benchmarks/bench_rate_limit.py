@@ -0,0 +1,73 @@
+"""Per-request overhead of the rate limiter.
+
+Run from arena-be/:  python -m benchmarks.bench_rate_limit [--clients N] [--ops N]
+Prints one JSON object with ns/op for each variant.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import fakeredis
+
+from app.middleware.rate_limit import GCRALimiter, SharedGCRALimiter
+
+
+def _ns_per_op(fn, keys) -> float:
+    start = time.perf_counter_ns()
+    for k in keys:
+        fn(k)
+    return (time.perf_counter_ns() - start) / len(keys)
+
+
+def bench_memory(keys, clients: int) -> dict:
+    lim = GCRALimiter(rate_per_min=120)
+    sync_ns = _ns_per_op(lim.check_sync, keys)
+
+    async def run():
+        start = time.perf_counter_ns()
+        for k in keys:
+            await lim.check(k)
+        return (time.perf_counter_ns() - start) / len(keys)
+
+    return {
+        "check_sync_ns": round(sync_ns, 1),
+        "check_async_ns": round(asyncio.run(run()), 1),
+        "tracked_clients": len(lim),
+        "clients": clients,
+    }
+
+
+def bench_shared(keys) -> dict:
+    # fakeredis runs in-process, so this measures client + script overhead, not the network
+    async def run():
+        lim = SharedGCRALimiter(fakeredis.FakeAsyncRedis(), rate_per_min=120)
+        start = time.perf_counter_ns()
+        for k in keys:
+            await lim.check(k)
+        return (time.perf_counter_ns() - start) / len(keys)
+
+    return {"check_ns": round(asyncio.run(run()), 1)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=10_000)
+    ap.add_argument("--ops", type=int, default=200_000)
+    ap.add_argument("--shared-ops", type=int, default=2_000)
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    ids = [rnd.randrange(args.clients) for _ in range(args.ops)]
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in ids]
+    result = {
+        "benchmark": "rate_limit",
+        "memory": bench_memory(keys, args.clients),
+        "shared_fakeredis": bench_shared(keys[: args.shared_ops]),
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
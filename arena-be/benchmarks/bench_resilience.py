@@ -0,0 +1,87 @@
+"""Upstream outage and tail-latency behaviour of `app.utils.resilience`.
+
+Run from arena-be/:  python -m benchmarks.bench_resilience [--calls N]
+
+`outage`: an upstream that never answers. The first `breaker_failure_threshold`
+calls wait out the deadline (`--timeout` s here), then the breaker opens and
+calls fail fast (`open_call_us`). `tail`: an upstream where `--slow-share` of
+calls take `--slow-ms` and the rest ~1 ms, with and without hedging. Prints
+one JSON object.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from app.utils.resilience import CircuitOpen, Upstream
+
+
+async def outage(timeout: float, calls: int) -> dict:
+    u = Upstream("bench_outage", max_timeout=timeout)
+
+    async def hang():
+        await asyncio.sleep(3600)
+
+    waited = []
+    while u.breaker.state != "open":
+        start = time.perf_counter()
+        try:
+            await u.call(hang)
+        except asyncio.TimeoutError:
+            waited.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(calls):
+        try:
+            await u.call(hang)
+        except CircuitOpen:
+            pass
+    return {
+        "calls_before_open": len(waited),
+        "timed_out_call_ms": round(statistics.mean(waited) * 1e3, 1),
+        "open_call_us": round((time.perf_counter() - start) / calls * 1e6, 2),
+    }
+
+
+async def tail(calls: int, slow_share: float, slow_ms: float, hedge: bool) -> dict:
+    rnd = random.Random(42)
+    u = Upstream(f"bench_tail_{hedge}", max_timeout=5.0)
+
+    async def read():
+        await asyncio.sleep(slow_ms / 1e3 if rnd.random() < slow_share else 0.001)
+
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await u.call(read, hedge=hedge)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "p50_ms": round(samples[len(samples) // 2] * 1e3, 2),
+        "p99_ms": round(samples[int(len(samples) * 0.99)] * 1e3, 2),
+    }
+
+
+async def run(args) -> dict:
+    return {
+        "benchmark": "resilience",
+        "outage": await outage(args.timeout, args.calls * 10),
+        "tail": {
+            "plain": await tail(args.calls, args.slow_share, args.slow_ms, hedge=False),
+            "hedged": await tail(args.calls, args.slow_share, args.slow_ms, hedge=True),
+        },
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=1000)
+    ap.add_argument("--timeout", type=float, default=0.2)
+    ap.add_argument("--slow-share", type=float, default=0.03)
+    ap.add_argument("--slow-ms", type=float, default=100.0)
+    print(json.dumps(asyncio.run(run(ap.parse_args()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Resolving a large round with the bulk scoring engine.
+
+Run from arena-be/:  python -m benchmarks.bench_scoring [--participants N]
+Uses a throwaway SQLite file unless DATABASE_URL is set. Prints one JSON object
+with the NumPy pass and the end-to-end time (pass + upsert) for two rounds:
+the first inserts every address, the second updates running averages.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+import numpy as np  # noqa: E402
+
+from app.db.models import Base  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.services.scoring_service import ScoringService, score_round  # noqa: E402
+
+
+async def run(participants: int) -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    rnd = np.random.default_rng(42)
+    addresses = [f"0x{i:040x}" for i in range(participants)]
+    svc = ScoringService()
+    out = {}
+    for name in ("insert_round", "update_round"):
+        predicted = rnd.normal(2500, 150, participants)
+        start = time.perf_counter()
+        score_round(addresses, predicted, 2500.0)
+        numpy_s = time.perf_counter() - start
+        start = time.perf_counter()
+        await svc.resolve_round(f"bench-{name}", addresses, predicted, 2500.0)
+        out[name] = {
+            "numpy_s": round(numpy_s, 4),
+            "total_s": round(time.perf_counter() - start, 3),
+        }
+    await engine.dispose()
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--participants", type=int, default=100_000)
+    args = ap.parse_args()
+    result = {"benchmark": "scoring", "participants": args.participants}
+    result.update(asyncio.run(run(args.participants)))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
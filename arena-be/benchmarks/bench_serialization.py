@@ -0,0 +1,86 @@
+"""Per-request CPU of /price and /leaderboard: response_model path vs pre-encoded bytes.
+
+Run from arena-be/:  python -m benchmarks.bench_serialization [--requests N] [--limit N]
+"legacy" returns the service dicts through `response_model` and FastAPI's
+default JSON encoder (revalidated and re-encoded every request); "prepared" is
+the shipped router, which serves bytes encoded once per snapshot / index
+version. Both run in-process through httpx's ASGI transport with the same
+in-memory data. Prints one JSON object with CPU microseconds per request.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.api.routes import router
+from app.schemas import LeaderboardOut, PriceOut
+from app.services import leaderboard, price
+from app.services.ranking import RankedEntry
+
+
+def build_app(variant: str) -> FastAPI:
+    if variant == "prepared":
+        app = FastAPI(default_response_class=ORJSONResponse)
+        app.include_router(router, prefix="/api/v1")
+        return app
+    app = FastAPI()
+
+    @app.get("/api/v1/price", response_model=PriceOut)
+    async def get_price():
+        return await price.get_eth_price()
+
+    @app.get("/api/v1/leaderboard", response_model=LeaderboardOut)
+    async def get_leaderboard(limit: int = 50):
+        return await leaderboard.get_leaderboard(limit=limit)
+
+    return app
+
+
+def prime(players: int) -> None:
+    # serve from memory only: a fresh price snapshot and a loaded ranking index
+    price._snapshot = price._simulate()
+    price._fetched_at = time.monotonic() + 3600
+    leaderboard.index.load(
+        RankedEntry(f"0x{i:040x}", (i % 997) / 997, i % 50, 100.0 + i % 13) for i in range(players)
+    )
+    leaderboard._loaded_at = time.monotonic() + 3600
+
+
+async def drive(app: FastAPI, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # warm-up (fills the prepared caches)
+            assert (await client.get(path)).status_code == 200
+        start = time.process_time()
+        for _ in range(requests):
+            await client.get(path)
+        return (time.process_time() - start) / requests * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=3_000)
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--players", type=int, default=10_000)
+    args = ap.parse_args()
+    prime(args.players)
+
+    result: dict = {"benchmark": "serialization"}
+    paths = {"price": "/api/v1/price", "leaderboard": f"/api/v1/leaderboard?limit={args.limit}"}
+    for name, path in paths.items():
+        legacy = asyncio.run(drive(build_app("legacy"), path, args.requests))
+        prepared = asyncio.run(drive(build_app("prepared"), path, args.requests))
+        result[name] = {
+            "legacy_cpu_us": round(legacy, 1),
+            "prepared_cpu_us": round(prepared, 1),
+            "saved_us": round(legacy - prepared, 1),
+        }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
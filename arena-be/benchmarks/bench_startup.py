@@ -0,0 +1,123 @@
+"""Worker startup cost: import time of `main` and time to first response / readiness.
+
+Run from arena-be/:  python -m benchmarks.bench_startup [--runs N]
+
+`import_ms` is measured in fresh interpreters (median of `--runs`), together
+with which heavy packages that import pulled in. `first_response_ms` and
+`ready_ms` time a uvicorn worker from spawn until `/health` and `/ready`
+answer 200, against the same local stand-ins as `bench_load`. Prints one JSON
+object; `benchmarks.suite` includes it so the baseline gate tracks it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_load import ARENA_BE, free_port, server_env
+from benchmarks.standins import UpstreamStandIn
+
+HEAVY = ("google.generativeai", "web3", "sklearn", "sqlalchemy", "eth_abi", "aiohttp", "numpy")
+
+PROBE = f"""
+import json, sys, time
+t = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ARENA_BE, env=env, capture_output=True, text=True
+    )
+    if out.returncode:
+        raise RuntimeError(out.stderr)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+async def _poll(client: httpx.AsyncClient, path: str, proc: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            if (await client.get(path)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.005)
+    raise RuntimeError(f"{path} did not answer 200 within {timeout}s")
+
+
+async def measure_first_response(env: dict, timeout: float) -> dict:
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.standin_app:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=ARENA_BE,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            await _poll(client, "/health", proc, timeout)
+            first = time.perf_counter() - start
+            await _poll(client, "/ready", proc, timeout)
+            ready = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"first_response": first, "ready": ready}
+
+
+async def run(args) -> dict:
+    tmp = tempfile.mkdtemp(prefix="arena-startup-")
+    upstream = UpstreamStandIn()
+    await upstream.start()
+    try:
+        env = server_env(upstream, f"sqlite:///{os.path.join(tmp, 'startup.db')}", 0.0)
+        imports = [measure_import(env) for _ in range(args.runs)]
+        boots = [await measure_first_response(env, args.timeout) for _ in range(args.runs)]
+    finally:
+        await upstream.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    def median_ms(values) -> float:
+        return round(statistics.median(values) * 1e3, 1)
+
+    return {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "import_ms": median_ms(i["seconds"] for i in imports),
+        "heavy_modules_loaded": imports[-1]["loaded"],
+        "first_response_ms": median_ms(b["first_response"] for b in boots),
+        "ready_ms": median_ms(b["ready"] for b in boots),
+    }
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=60.0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    add_arguments(ap)
+    print(json.dumps(asyncio.run(run(ap.parse_args()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""The real app with the in-process stand-ins installed, for `benchmarks.bench_load`.
+
+Served as `uvicorn benchmarks.standin_app:app`, so every worker imports it.
+Network dependencies (CoinGecko, the RPC node, the database) are redirected
+through settings env vars by the driver; only the Gemini model, which has no
+URL to point elsewhere, is swapped here.
+"""
+import os
+
+from app.services import gemini
+from benchmarks.standins import StandInModel
+from main import app
+
+__all__ = ["app"]
+
+gemini.model = StandInModel(float(os.environ.get("BENCH_LLM_LATENCY", "0")))
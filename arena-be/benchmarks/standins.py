@@ -0,0 +1,201 @@
+"""Deterministic local stand-ins for the services the API talks to.
+
+`UpstreamStandIn` is one aiohttp server that plays CoinGecko (`GET /coingecko`)
+and the BlockDAG JSON-RPC node (`POST /rpc`); `StandInModel` replaces the
+Gemini SDK model inside each worker. Responses depend only on the seed and the
+call order, with optional fixed latencies, so runs are comparable.
+"""
+import asyncio
+import hashlib
+import math
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import rlp
+from aiohttp import web
+from eth_abi import encode
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+
+# throwaway signing key and contract address; only ever sent to the stand-in node
+STANDIN_PRIVATE_KEY = "0x" + hashlib.sha256(b"arena-bench").hexdigest()
+STANDIN_CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+STANDIN_CHAIN_ID = 31337
+
+
+def _selector(signature: str) -> str:
+    return "0x" + keccak(text=signature)[:4].hex()
+
+
+SUBMITS = {_selector("submitPrediction(int256)"), _selector("submitAIBotPrediction(int256)")}
+PREDICTIONS = _selector("predictions(address)")
+ALREADY_SUBMITTED = _selector("AlreadySubmitted()")
+
+
+class UpstreamStandIn:
+    """CoinGecko price feed (seeded random walk) and a minimal JSON-RPC node.
+
+    The node accepts and hashes raw transactions and reports a fixed gas price
+    and estimate. Like the contract, it keeps one prediction per sender: a
+    second submission fails `eth_estimateGas` with `AlreadySubmitted` (or, sent
+    anyway, gets a reverted receipt), and `predictions(address)` reports it.
+    It has no blocks or logs, which keeps the indexer idle.
+    """
+
+    def __init__(self, seed: int = 42, latency: float = 0.0):
+        self.latency = latency
+        self.calls = {"coingecko": 0, "rpc": 0}
+        self._rnd = random.Random(seed)
+        self._price = 2500.0
+        self._nonce = 0
+        self._entries: Dict[str, int] = {}  # sender -> submitted value
+        self._receipts: Dict[str, int] = {}  # tx hash -> status (1 ok, 0 reverted)
+        self._runner: Optional[web.AppRunner] = None
+        self.port = 0
+
+    @property
+    def coingecko_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/coingecko"
+
+    @property
+    def rpc_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/rpc"
+
+    async def start(self, port: int = 0) -> None:
+        app = web.Application()
+        app.router.add_get("/coingecko", self._coingecko)
+        app.router.add_post("/rpc", self._rpc)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _coingecko(self, request: web.Request) -> web.Response:
+        self.calls["coingecko"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._price *= math.exp(self._rnd.gauss(0, 0.001))
+        return web.json_response(
+            {
+                "ethereum": {
+                    "usd": round(self._price, 2),
+                    "usd_24h_change": round(self._rnd.uniform(-5, 5), 4),
+                    "usd_market_cap": round(self._price * 120_000_000),
+                }
+            }
+        )
+
+    async def _rpc(self, request: web.Request) -> web.Response:
+        self.calls["rpc"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([self._call(c) for c in body])
+        return web.json_response(self._call(body))
+
+    def _call(self, call: dict) -> dict:
+        method, params = call.get("method"), call.get("params") or []
+        out = {"jsonrpc": "2.0", "id": call.get("id")}
+        if method == "eth_chainId":
+            out["result"] = hex(STANDIN_CHAIN_ID)
+        elif method == "eth_getTransactionCount":
+            out["result"] = hex(self._nonce)
+        elif method == "eth_gasPrice":
+            out["result"] = hex(1_000_000_000)
+        elif method == "eth_estimateGas":
+            tx = params[0]
+            if tx.get("data", "")[:10] in SUBMITS and self._sender(tx) in self._entries:
+                out["error"] = {
+                    "code": 3,
+                    "message": "execution reverted",
+                    "data": ALREADY_SUBMITTED,
+                }
+            else:
+                out["result"] = hex(60_000)
+        elif method == "eth_call":
+            out["result"] = self._eth_call(params[0])
+        elif method == "eth_sendRawTransaction":
+            self._nonce += 1
+            tx_hash = "0x" + keccak(hexstr=params[0]).hex()
+            self._receipts[tx_hash] = self._apply(params[0])
+            out["result"] = tx_hash
+        elif method == "eth_blockNumber":
+            out["result"] = "0x0"
+        elif method == "eth_getLogs":
+            out["result"] = []
+        elif method == "eth_getTransactionReceipt":
+            out["result"] = self._receipt(params[0])
+        else:
+            out["error"] = {"code": -32601, "message": f"method not found: {method}"}
+        return out
+
+    @staticmethod
+    def _sender(tx: dict) -> str:
+        return to_checksum_address(tx.get("from") or "0x" + "00" * 20)
+
+    def _apply(self, raw: str) -> int:
+        """Run a signed legacy transaction against the stand-in contract; its status."""
+        # nonce, gasPrice, gas, to, value, data, v, r, s
+        fields = rlp.decode(bytes.fromhex(raw[2:]))
+        data = "0x" + bytes(fields[5]).hex()
+        if data[:10] not in SUBMITS:
+            return 1
+        sender = Account.recover_transaction(raw)
+        if sender in self._entries:
+            return 0  # AlreadySubmitted
+        self._entries[sender] = int.from_bytes(bytes.fromhex(data[10:74]), "big", signed=True)
+        return 1
+
+    def _eth_call(self, tx: dict) -> str:
+        data = tx.get("data") or tx.get("input") or ""
+        if data[:10] != PREDICTIONS:
+            return "0x"
+        user = to_checksum_address("0x" + data[-40:])
+        value = self._entries.get(user)
+        entry = (value or 0, 0, value is not None)  # value, timestamp, exists
+        return "0x" + encode(["int256", "uint256", "bool"], entry).hex()
+
+    def _receipt(self, tx_hash: str) -> Optional[dict]:
+        status = self._receipts.get(tx_hash)
+        if status is None:
+            return None
+        return {
+            "transactionHash": tx_hash,
+            "transactionIndex": "0x0",
+            "blockHash": "0x" + "00" * 32,
+            "blockNumber": "0x0",
+            "status": hex(status),
+            "gasUsed": hex(60_000 if status else 30_000),
+            "cumulativeGasUsed": hex(60_000),
+            "effectiveGasPrice": hex(1_000_000_000),
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "type": "0x0",
+        }
+
+
+class StandInModel:
+    """Drop-in for `genai.GenerativeModel`: fixed text per prompt after `latency` seconds.
+
+    `generate_content` is synchronous like the SDK's, so it still runs on the
+    blocking pool and the latency holds a pool thread as a real call would.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate_content(self, prompt: str) -> Any:
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        return SimpleNamespace(text=f"Stand-in reasoning {digest}: momentum is neutral.")
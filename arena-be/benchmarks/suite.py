@@ -0,0 +1,113 @@
+"""Load and startup tests plus cache, rate-limiter and middleware microbenchmarks, with a gate.
+
+Run from arena-be/:
+    python -m benchmarks.suite [bench_load options] [--baseline FILE] [--tolerance 0.25]
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+
+Prints one JSON object. With `--baseline`, every tracked metric is compared to
+the saved run: latencies, per-op times and memory (`*_ms`, `*_us`, `*_ns`,
+`*_mb`) may not grow, and `rps` may not drop, by more than `--tolerance`. Any
+regression is listed under `regressions` and the exit status is 1. Baselines
+are machine-specific; record them on the runner that checks them.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+from benchmarks import bench_cache, bench_load, bench_middleware, bench_rate_limit, bench_startup
+
+LOWER_IS_BETTER = ("_ms", "_us", "_ns", "_mb")
+HIGHER_IS_BETTER = ("rps",)
+
+
+def micro(ops: int) -> dict:
+    keys = bench_cache._keys(20_000, ops)
+    rnd = random.Random(42)
+    clients = [f"10.0.{i // 256}.{i % 256}" for i in (rnd.randrange(10_000) for _ in range(ops))]
+    return {
+        "cache": {
+            "hit": bench_cache.bench_hit(ops),
+            "lru": bench_cache.bench_policy("lru", keys, 1024),
+            "coalesced": bench_cache.bench_coalesced(1_000),
+        },
+        "rate_limit": bench_rate_limit.bench_memory(clients, 10_000),
+        "middleware": asyncio.run(
+            bench_middleware.drive(bench_middleware.build_app("pipeline"), ops // 20, 8)
+        ),
+    }
+
+
+def metrics(result: dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Dotted paths of every tracked numeric leaf (lists, e.g. per-pid rows, are skipped)."""
+    for key, value in result.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from metrics(value, path + ".")
+        elif isinstance(value, (int, float)) and key.endswith(LOWER_IS_BETTER + HIGHER_IS_BETTER):
+            yield path, float(value)
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[dict]:
+    base = dict(metrics(baseline))
+    out = []
+    for path, value in metrics(current):
+        before = base.get(path)
+        if not before:
+            continue
+        change = (value - before) / before
+        worse = -change if path.endswith(HIGHER_IS_BETTER) else change
+        if worse > tolerance:
+            out.append(
+                {"metric": path, "baseline": before, "current": value, "change": round(change, 3)}
+            )
+    return out
+
+
+def _memory_summary(workers: List[dict]) -> Dict[str, float]:
+    if not workers:
+        return {}
+    return {
+        "max_rss_mb": max(w["rss_mb"] for w in workers),
+        "max_peak_rss_mb": max(w["peak_rss_mb"] for w in workers),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    bench_load.add_arguments(ap)
+    bench_startup.add_arguments(ap)
+    ap.add_argument("--micro-ops", type=int, default=100_000)
+    ap.add_argument("--skip-load", action="store_true")
+    ap.add_argument("--skip-micro", action="store_true")
+    ap.add_argument("--skip-startup", action="store_true")
+    ap.add_argument("--baseline", default="", help="fail on regressions against this file")
+    ap.add_argument("--save-baseline", default="", help="write this run as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    result: dict = {"benchmark": "suite"}
+    if not args.skip_load:
+        load = asyncio.run(bench_load.run(args))
+        load["memory"] = _memory_summary(load.get("workers", []))
+        result["load"] = load
+    if not args.skip_startup:
+        result["startup"] = asyncio.run(bench_startup.run(args))
+    if not args.skip_micro:
+        result["micro"] = micro(args.micro_ops)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+    print(json.dumps(result))
+    if result.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
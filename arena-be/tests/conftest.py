@@ -0,0 +1,23 @@
+import asyncio
+import os
+import tempfile
+
+# Tests run against a throwaway SQLite file (aiosqlite) unless DATABASE_URL is set
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _tables():
+    from app.db.models import Base
+    from app.db.session import engine
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield
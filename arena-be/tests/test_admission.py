@@ -0,0 +1,111 @@
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from app.middleware.admission import PRIORITIES, AdmissionController
+from app.middleware.pipeline import RequestPipelineMiddleware
+from app.middleware.rate_limit import GCRALimiter
+
+LOW = PRIORITIES["low"]
+
+
+def controller(
+    max_inflight: int = 2,
+    queue_size: int = 2,
+    queue_timeout: float = 1.0,
+    route_limits: Optional[Dict[str, int]] = None,
+    priorities: Optional[Dict[str, int]] = None,
+) -> AdmissionController:
+    return AdmissionController(
+        max_inflight=max_inflight,
+        queue_size=queue_size,
+        queue_timeout=queue_timeout,
+        route_limits={"/predict": 1} if route_limits is None else route_limits,
+        priorities=(
+            {"/health": PRIORITIES["critical"], "/predict": LOW}
+            if priorities is None
+            else priorities
+        ),
+    )
+
+
+def test_route_limit_queue_and_shedding():
+    async def run():
+        ctl = controller(queue_size=1, queue_timeout=0.05)
+        first = await ctl.acquire("/predict")
+        waiting = asyncio.ensure_future(ctl.acquire("/predict"))  # route full: queued
+        await asyncio.sleep(0)
+        assert ctl.queued(LOW) == 1
+        full = await ctl.acquire("/predict")  # queue full: shed at once
+        price = await ctl.acquire("/price")  # other routes are unaffected
+        timed_out = await waiting
+        ctl.release(first)
+        return first, full, price, timed_out, ctl
+
+    first, full, price, timed_out, ctl = asyncio.run(run())
+    assert first.admitted and price.admitted
+    assert not full.admitted and full.waited == 0
+    assert not timed_out.admitted and timed_out.waited >= 0.05
+    assert ctl.queued(LOW) == 0 and ctl.inflight == 1
+
+
+def test_freed_slots_go_to_higher_priority_first():
+    async def run():
+        ctl = controller(max_inflight=1, route_limits={})
+        held = await ctl.acquire("/price")
+        low = asyncio.ensure_future(ctl.acquire("/predict"))
+        await asyncio.sleep(0)
+        normal = asyncio.ensure_future(ctl.acquire("/leaderboard"))
+        await asyncio.sleep(0)
+        health = await ctl.acquire("/health")  # critical: never waits
+        ctl.release(held)
+        await asyncio.sleep(0.01)
+        order = [low.done(), normal.done()]
+        ctl.release(await normal)
+        return health, order, await low
+
+    health, order, low = asyncio.run(run())
+    assert health.admitted
+    assert order == [False, True]
+    assert low.admitted and low.waited > 0
+
+
+def test_pipeline_sheds_with_503_and_retry_after():
+    app = FastAPI()
+    gate = {}
+
+    @app.get("/predict")
+    async def predict():
+        gate.setdefault("event", asyncio.Event())
+        await gate["event"].wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    ctl = controller(max_inflight=1, queue_size=0)
+    app.add_middleware(
+        RequestPipelineMiddleware, limiter=GCRALimiter(rate_per_min=10**6), admission=ctl
+    )
+
+    async def run(client):
+        slow = asyncio.ensure_future(client.get("/predict"))
+        while ctl.inflight == 0:
+            await asyncio.sleep(0.001)
+        shed = await client.get("/predict")
+        ok = await client.get("/health")
+        gate["event"].set()
+        return shed, ok, await slow
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            return await run(client)
+
+    shed, ok, slow = asyncio.run(main())
+    assert shed.status_code == 503 and shed.headers["Retry-After"] == "1"
+    assert ok.status_code == 200 and slow.status_code == 200
+    assert ctl.inflight == 0
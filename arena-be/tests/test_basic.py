@@ -1,4 +1,5 @@
 from fastapi.testclient import TestClient
+
 from main import app
 
 client = TestClient(app)
@@ -12,3 +13,72 @@ def test_price():
     r = client.get("/api/v1/price")
     assert r.status_code == 200
     assert r.json()["asset"] == "ETH"
+
+
+def test_pipeline_headers():
+    r = client.get("/health", headers={"X-Request-ID": "abc-123"})
+    assert r.status_code == 200
+    assert r.headers["X-Request-ID"] == "abc-123"
+    assert "X-RateLimit-Remaining" in r.headers
+    assert client.get("/health").headers["X-Request-ID"]
+
+
+def test_ready_separate_from_health():
+    import asyncio
+
+    from app.services.container import ServiceContainer, container
+
+    assert container.state == "idle"  # lifespan not run by this client
+    assert client.get("/health").status_code == 200
+    r = client.get("/ready")
+    assert r.status_code == 503 and r.json()["status"] == "idle"
+
+    async def boot():
+        services = ServiceContainer(names=("price", "ml", "leaderboard"), started=())
+        await services.start()
+        assert services.state == "starting"
+        return await services.wait_ready(), services.build_seconds
+
+    ready, built = asyncio.run(boot())
+    assert ready and set(built) == {"price", "ml", "leaderboard"}
+
+
+def test_import_main_stays_light():
+    import os
+    import subprocess
+    import sys
+
+    # a fresh interpreter: this one has long since imported numpy for other tests
+    probe = "import sys, main; print(sorted(m for m in ('numpy', 'web3') if m in sys.modules))"
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=here, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_logging_sampled_per_call_site_and_bounded_queue():
+    import logging
+    import queue
+    import time
+
+    from app.utils.logger import LOG_DROPPED, BoundedQueueHandler, SamplingFilter
+
+    sampler = SamplingFilter(burst=2, window=0.05)
+
+    def record(line):
+        return logging.LogRecord("t", logging.WARNING, "upstream.py", line, "fail", None, None)
+
+    assert [sampler.filter(record(10)) for _ in range(5)] == [True, True, False, False, False]
+    assert sampler.filter(record(11))  # other call sites keep their own budget
+    time.sleep(0.06)
+    rec = record(10)
+    assert sampler.filter(rec) and rec.suppressed == 3
+
+    dropped = LOG_DROPPED.labels(reason="queue_full")
+    before = dropped._value.get()
+    q = queue.Queue(1)
+    handler = BoundedQueueHandler(q)
+    handler.handle(record(20))
+    handler.handle(record(20))
+    assert q.qsize() == 1 and dropped._value.get() == before + 1
@@ -0,0 +1,143 @@
+import asyncio
+
+import fakeredis
+
+from app.utils.cache import MISSING, Cache, MemoryBackend, RedisBackend, cache
+
+
+def test_single_flight_and_hit():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        c = Cache("t_single_flight", ttl=60)
+        first = await asyncio.gather(*(c.get_or_compute("k", compute) for _ in range(5)))
+        again = await c.get_or_compute("k", compute)
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == ["value"] * 5
+    assert again == "value"
+    assert len(calls) == 1
+
+
+def test_cached_none_is_a_hit():
+    calls = []
+
+    @cache(60)
+    async def lookup(x):
+        calls.append(x)
+        return None
+
+    async def run():
+        return [await lookup(1), await lookup(1)]
+
+    assert asyncio.run(run()) == [None, None]
+    assert calls == [1]
+
+
+def test_explicit_zero_ttl_is_not_stored():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "value"
+
+    async def run():
+        c = Cache("t_zero_ttl", ttl=60)
+        await c.get_or_compute("k", compute, ttl=0)
+        await c.get_or_compute("k", compute, ttl=0)
+        await c.set("s", "value", ttl=0)
+        return await c.get("s")
+
+    assert asyncio.run(run()) is MISSING
+    assert len(calls) == 2
+
+
+def test_negative_caching():
+    calls = []
+
+    async def boom():
+        calls.append(1)
+        raise ValueError("upstream down")
+
+    async def run():
+        c = Cache("t_negative", ttl=60, negative_ttl=60)
+        for _ in range(3):
+            try:
+                await c.get_or_compute("k", boom)
+            except ValueError:
+                pass
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_method_keys_are_per_instance():
+    class Svc:
+        def __init__(self, factor, namespace=None):
+            self.factor = factor
+            self.calls = 0
+            if namespace:
+                self.cache_namespace = namespace
+
+        @cache(60)
+        async def get(self, x):
+            self.calls += 1
+            return x * self.factor
+
+    svc, other = Svc(2), Svc(3)
+    named, same_name = Svc(5, "svc"), Svc(7, "svc")
+
+    async def run():
+        first = [await svc.get(2), await svc.get(x=2), await svc.get(2)]
+        return first, await other.get(2), await named.get(2), await same_name.get(2)
+
+    assert asyncio.run(run()) == ([4, 4, 4], 6, 10, 10)
+    assert svc.calls == 2  # positional and keyword calls are distinct keys
+    assert other.calls == 1 and same_name.calls == 0  # an explicit namespace is shared
+
+
+def test_memory_backend_lru_and_lfu_eviction():
+    async def run():
+        lru = MemoryBackend(maxsize=2, policy="lru")
+        await lru.set("a", 1, 60)
+        await lru.set("b", 2, 60)
+        await lru.get("a")
+        await lru.set("c", 3, 60)
+        lfu = MemoryBackend(maxsize=2, policy="lfu")
+        await lfu.set("a", 1, 60)
+        await lfu.set("b", 2, 60)
+        await lfu.get("a")
+        await lfu.get("a")
+        await lfu.get("b")
+        await lfu.set("c", 3, 60)
+        return (
+            [await lru.get(k) for k in "abc"],
+            [await lfu.get(k) for k in "abc"],
+            len(lru),
+        )
+
+    lru, lfu, size = asyncio.run(run())
+    assert lru == [1, MISSING, 3]
+    assert lfu == [1, MISSING, 3]
+    assert size == 2
+
+
+def test_shared_backend_visible_across_caches():
+    async def run():
+        server = fakeredis.FakeServer()
+        worker_a = Cache("shared", RedisBackend(client=fakeredis.FakeAsyncRedis(server=server)))
+        worker_b = Cache("shared", RedisBackend(client=fakeredis.FakeAsyncRedis(server=server)))
+        other = Cache("other", RedisBackend(client=fakeredis.FakeAsyncRedis(server=server)))
+        await worker_a.set("price", {"usd": 2500.0})
+        await other.set("price", 1.0)
+        seen = await worker_b.get("price")
+        await worker_b.clear()  # only the "shared" cache's keys
+        return seen, await worker_a.get("price"), await other.get("price")
+
+    assert asyncio.run(run()) == ({"usd": 2500.0}, MISSING, 1.0)
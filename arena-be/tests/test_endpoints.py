@@ -1,4 +1,12 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
 from fastapi.testclient import TestClient
+
+from app.services.price_history import PriceHistory
 from main import app
 
 client = TestClient(app)
@@ -40,3 +48,183 @@ def test_leaderboard():
     if data["entries"]:
         row = data["entries"][0]
         assert set(["rank", "user_address", "accuracy_score", "total_predictions", "avg_error"]).issubset(row.keys())
+
+
+def test_leaderboard_cursor_and_rank():
+    first = client.get("/api/v1/leaderboard", params={"limit": 1}).json()
+    assert len(first["entries"]) == 1
+    assert first["next_cursor"]
+    second = client.get(
+        "/api/v1/leaderboard", params={"limit": 1, "cursor": first["next_cursor"]}
+    ).json()
+    assert second["entries"][0]["rank"] == 2
+    address = second["entries"][0]["user_address"]
+    r = client.get(f"/api/v1/leaderboard/rank/{address}")
+    assert r.status_code == 200
+    assert r.json()["rank"] == 2
+    assert client.get("/api/v1/leaderboard", params={"cursor": "@@"}).status_code == 400
+
+
+def test_predict_llm_deadline_falls_back(monkeypatch):
+    from app.services import gemini
+    from app.services.prediction_service import settings
+
+    async def slow(market, ml_pred):
+        await asyncio.sleep(5)
+        return "too late"
+
+    monkeypatch.setattr(gemini, "analyze_market_sentiment", slow)
+    monkeypatch.setattr(settings, "predict_llm_timeout", 0.05)
+    payload = {
+        "user_address": "0x74232704659A37D66D6a334eF3E087eF6c139414",
+        "prediction_value": 2600,
+    }
+    r = client.post("/api/v1/predict", json=payload)
+    assert r.status_code == 200, r.text
+    assert r.json()["ai_reasoning"] != "too late"
+
+
+def test_predict_stage_timings_and_slow_log(monkeypatch, caplog):
+    from app.middleware.pipeline import settings
+    from app.utils.timing import UPSTREAM_ERRORS
+
+    monkeypatch.setattr(settings, "slow_request_threshold", 1e-6)
+    timeouts = UPSTREAM_ERRORS.labels(upstream="gemini", kind="timeout")
+    before = timeouts._value.get()
+    test_predict_llm_deadline_falls_back(monkeypatch)
+    assert timeouts._value.get() == before  # a stage deadline, not a Gemini call timing out
+
+    r = client.post(
+        "/api/v1/predict",
+        json={"user_address": "0x74232704659A37D66D6a334eF3E087eF6c139414", "prediction_value": 1},
+        headers={"X-Request-ID": "slow-1"},
+    )
+    stages = dict(part.split(";dur=") for part in r.headers["Server-Timing"].split(", "))
+    assert {"market", "forecast", "reasoning", "chain", "db", "total"} <= set(stages)
+    slow = [rec for rec in caplog.records if rec.getMessage().startswith("Slow request POST")]
+    assert slow[-1].request_id == "slow-1"
+    assert set(slow[-1].stages) >= {"market", "reasoning", "chain"}
+
+
+def test_chain_predictions_read_local_table():
+    r = client.get("/api/v1/chain/predictions/0x00000000000000000000000000000000000000aa")
+    assert r.status_code == 200 and r.json() == []
+    assert client.get("/api/v1/chain/predictions/not-an-address").status_code == 422
+
+
+def test_price_history_candles(monkeypatch):
+    from app.services import price
+
+    history = PriceHistory(capacity=16)
+    now = time.time()
+    for i in range(3):
+        history.append(now - 2 + i, 2500.0 + i)
+    monkeypatch.setattr(price, "history", history)
+    asyncio.run(price._candles.clear())  # keyed on the history version, which restarted
+    r = client.get("/api/v1/price/history?resolution=1d&limit=2")
+    assert r.status_code == 200, r.text
+    last = r.json()["candles"][-1]
+    assert last["high"] == 2502.0 and last["ticks"] == 3
+    assert client.get("/api/v1/price/history?resolution=7m").status_code == 422
+
+
+def test_predict_batch_shares_upstream_work(monkeypatch):
+    from app.services import blockchain, gemini
+
+    calls = []
+
+    async def reasoning(market, ml_pred):
+        calls.append(ml_pred)
+        return "shared"
+
+    monkeypatch.setattr(gemini, "analyze_market_sentiment", reasoning)
+    items = [
+        {"user_address": "0x74232704659A37D66D6a334eF3E087eF6c139414", "prediction_value": 2600},
+        {"user_address": "not-an-address", "prediction_value": 2600},
+        {"user_address": "0x8ba1f109551bD432803012645Ac136ddd64DBA72", "prediction_value": 2500},
+    ]
+    r = client.post("/api/v1/predict/batch", json={"items": items})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1) and len(calls) == 1
+    ok = [x for x in body["results"] if x["ok"]]
+    assert [x["index"] for x in ok] == [0, 2]
+    assert ok[0]["result"]["transaction_hash"] != ok[1]["result"]["transaction_hash"]
+    assert "user_address" in body["results"][1]["error"]
+
+    async def down(items):
+        raise ConnectionError("rpc down")
+
+    # a chain problem shows in the status but fails no item
+    store = blockchain.store_predictions
+    monkeypatch.setattr(blockchain, "store_predictions", down)
+    body = client.post("/api/v1/predict/batch", json={"items": items}).json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert body["results"][0]["result"]["transaction_status"] == "failed"
+
+    # priced per item: the largest legal batch fits one full burst, one more item is refused
+    from app.middleware.rate_limit import limiter
+    from app.schemas import MAX_BATCH_SIZE
+
+    monkeypatch.setattr(blockchain, "store_predictions", store)
+    limiter._tat.clear()  # a fresh client: full bucket
+    r = client.post("/api/v1/predict/batch", json={"items": items[:1] * MAX_BATCH_SIZE})
+    assert r.status_code == 200 and r.json()["succeeded"] == MAX_BATCH_SIZE, r.text
+    limiter._tat.clear()
+    r = client.post("/api/v1/predict/batch", json={"items": items[:1] * (MAX_BATCH_SIZE + 1)})
+    assert r.status_code == 422
+
+
+def test_leaderboard_bytes_cached_until_index_changes():
+    from app.services import leaderboard
+    from app.services.ranking import RankedEntry
+
+    first = client.get("/api/v1/leaderboard?limit=5")
+    assert first.headers["content-type"] == "application/json"
+    assert client.get("/api/v1/leaderboard?limit=5").content == first.content
+    entry = RankedEntry("0x" + "cd" * 20, 0.999, 1, 1.0)
+    leaderboard.apply([entry])
+    after = client.get("/api/v1/leaderboard?limit=5").json()
+    assert after["entries"][0]["user_address"] == entry.user_address
+    assert after["total_players"] == first.json()["total_players"] + 1
+
+
+def test_metrics_unrouted_paths_share_label():
+    client.get("/no-such-page-123")
+    text = client.get("/metrics").text
+    assert 'path="unmatched"' in text
+    assert "no-such-page-123" not in text
+
+
+def test_multiprocess_metrics_archive_exited_workers(tmp_path):
+    from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+    from app.utils import metrics_store
+
+    def write(name, pid, key, value):
+        d = MmapedDict(str(tmp_path / f"{name}_{pid}.db"))
+        d.write_value(key, value, 0.0)
+        d.close()
+
+    hits = mmap_key("hits_total", "hits_total", ["path"], ["/a"], "Hits")
+    gauge = mmap_key("conns", "conns", [], [], "Conns")
+    gone = []
+    for _ in range(2):  # pids of processes that have exited
+        proc = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True
+        )
+        gone.append(int(proc.stdout))
+    write("counter", gone[0], hits, 3.0)
+    write("counter", gone[1], hits, 4.0)
+    write("gauge_livesum", gone[0], gauge, 9.0)
+    write("counter", os.getpid(), hits, 5.0)
+
+    text = metrics_store.collect(str(tmp_path)).decode()
+    assert 'hits_total{path="/a"} 12.0' in text
+    assert "conns" not in text  # live gauges of exited workers are dropped
+    files = {p.name for p in tmp_path.glob("*.db")}
+    assert files == {"counter_archive.db", f"counter_{os.getpid()}.db"}
+
+    metrics_store.mark_process_dead(os.getpid(), str(tmp_path))
+    assert [p.name for p in tmp_path.glob("*.db")] == ["counter_archive.db"]
+    assert 'hits_total{path="/a"} 12.0' in metrics_store.collect(str(tmp_path)).decode()
@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.ranking import RankedEntry, RankingIndex, decode_cursor, encode_cursor
+
+
+def _entry(i, acc, total=10):
+    return RankedEntry(f"0x{i:040x}", acc, total, 100.0)
+
+
+def test_rank_and_incremental_update():
+    idx = RankingIndex()
+    idx.load(_entry(i, acc=i / 100) for i in range(100))
+    assert len(idx) == 100
+    assert idx.rank(f"0x{99:040x}") == 1
+    assert idx.rank(f"0x{0:040x}") == 100
+
+    idx.upsert(_entry(0, acc=0.995))
+    assert idx.rank(f"0x{0:040x}") == 1
+    assert idx.rank(f"0x{99:040x}") == 2
+    idx.remove(f"0x{0:040x}")
+    assert idx.rank(f"0x{0:040x}") is None
+    assert len(idx) == 99
+
+
+def test_keyset_pagination_walks_everything_once():
+    idx = RankingIndex()
+    idx.load(_entry(i, acc=0.5, total=i % 7) for i in range(1000))  # lots of ties
+    seen, after = [], None
+    while True:
+        page = idx.page(64, after)
+        if not page:
+            break
+        seen.extend(page)
+        after = decode_cursor(encode_cursor(page[-1][1].key))
+    assert [rank for rank, _ in seen] == list(range(1, 1001))
+    assert len({e.user_address for _, e in seen}) == 1000
+
+
+def test_bad_cursor_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_upsert_many_matches_single_upserts():
+    base = [RankedEntry(f"0x{i:02x}", i / 100, i, 1.0) for i in range(100)]
+    changes = [RankedEntry(f"0x{i:02x}", 1 - i / 100, 5, 2.0) for i in range(0, 100, 3)]
+    one, many = RankingIndex(), RankingIndex()
+    one.load(base)
+    many.load(base)
+    for e in changes:
+        one.upsert(e)
+    many.upsert_many(changes)
+    assert many.page(100) == one.page(100)
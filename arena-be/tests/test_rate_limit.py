@@ -0,0 +1,67 @@
+import asyncio
+
+import fakeredis
+
+from app.middleware.rate_limit import (
+    SCOPE_KEY,
+    GCRALimiter,
+    SharedGCRALimiter,
+    charge_more,
+    parse_costs,
+)
+
+
+def test_gcra_burst_then_steady_rate():
+    lim = GCRALimiter(rate_per_min=60, burst=3)  # 1 token/s
+    t = 1000.0
+    assert [lim.check_sync("ip", now=t).allowed for _ in range(4)] == [True, True, True, False]
+    denied = lim.check_sync("ip", now=t)
+    assert 0 < denied.retry_after <= 1.0
+    assert lim.check_sync("ip", now=t + 1.0).allowed
+    assert not lim.check_sync("ip", now=t + 1.0).allowed
+
+
+def test_gcra_no_double_burst_across_minute_boundary():
+    lim = GCRALimiter(rate_per_min=10)
+    allowed = sum(lim.check_sync("ip", now=59.9).allowed for _ in range(20))
+    allowed += sum(lim.check_sync("ip", now=60.1).allowed for _ in range(20))
+    assert allowed == 10
+
+
+def test_gcra_route_cost_and_sweep():
+    lim = GCRALimiter(rate_per_min=10, sweep_interval=1)
+    assert lim.check_sync("a", cost=10, now=100.0).allowed
+    assert not lim.check_sync("a", cost=1, now=100.0).allowed
+    for i in range(100):
+        lim.check_sync(f"client-{i}", now=100.0)
+    # all buckets are full again a minute later, so a sweep drops every key
+    lim.check_sync("late", now=200.0)
+    assert len(lim) == 1
+    assert parse_costs("/api/v1/predict=5, /x=0") == {"/api/v1/predict": 5, "/x": 1}
+
+
+def test_charge_more_scales_with_request_size():
+    lim = GCRALimiter(rate_per_min=60, burst=10)
+    assert lim.check_sync("ip", cost=2).allowed  # what the pipeline charged up front
+    scope = {SCOPE_KEY: (lim, "ip", 2)}
+
+    async def run():
+        ok = await charge_more(scope, 6)
+        too_big = await charge_more(scope, 3)  # 11 tokens can never fit a burst of 10
+        limited = await charge_more({SCOPE_KEY: (lim, "ip", 2)}, 4)
+        return ok, too_big, limited
+
+    ok, too_big, limited = asyncio.run(run())
+    assert ok is None and scope[SCOPE_KEY][2] == 8
+    assert too_big.status_code == 413
+    assert limited.status_code == 429 and "Retry-After" in limited.headers
+
+
+def test_shared_limiter_holds_across_workers():
+    async def run():
+        server = fakeredis.FakeServer()
+        a = SharedGCRALimiter(fakeredis.FakeAsyncRedis(server=server), rate_per_min=60, burst=2)
+        b = SharedGCRALimiter(fakeredis.FakeAsyncRedis(server=server), rate_per_min=60, burst=2)
+        return [(await w.check("ip")).allowed for w in (a, b, a, b)]
+
+    assert asyncio.run(run()) == [True, True, False, False]
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.resilience import CLOSED, HALF_OPEN, OPEN, CircuitOpen, Upstream
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    calls = []
+
+    async def down():
+        calls.append(1)
+        raise ConnectionError("refused")
+
+    async def up():
+        calls.append(1)
+        return "ok"
+
+    async def run():
+        u = Upstream("t_breaker", max_timeout=1.0)
+        u.breaker.failure_threshold, u.breaker.reset_timeout = 3, 0.05
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await u.call(down)
+        assert u.breaker.state == OPEN
+        start = time.perf_counter()
+        with pytest.raises(CircuitOpen):
+            await u.call(down)
+        fast = time.perf_counter() - start
+        assert len(calls) == 3 and fast < 0.001  # rejected without calling the upstream
+
+        await asyncio.sleep(0.06)
+        with pytest.raises(ConnectionError):
+            await u.call(down)  # half-open trial fails: open again
+        assert u.breaker.state == OPEN
+        await asyncio.sleep(0.06)
+        assert u.breaker.allow() and u.breaker.state == HALF_OPEN
+        assert not u.breaker.allow()  # one trial at a time
+        u.breaker.release()
+        assert await u.call(up) == "ok" and u.breaker.state == CLOSED
+
+    asyncio.run(run())
+
+
+def test_upstream_failures_counted_once():
+    from app.utils.timing import UPSTREAM_ERRORS, span
+
+    errors = UPSTREAM_ERRORS.labels(upstream="t_count", kind="error")
+    timeouts = UPSTREAM_ERRORS.labels(upstream="t_count", kind="timeout")
+    before = errors._value.get(), timeouts._value.get()
+
+    async def down():
+        raise ConnectionError("refused")
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    async def run():
+        u = Upstream("t_count", max_timeout=0.01)
+        for fn, exc in ((down, ConnectionError), (hang, asyncio.TimeoutError)):
+            with pytest.raises(exc):
+                with span("outer"):  # stages around the call only time it
+                    await u.call(fn)
+        with pytest.raises(ValueError):
+            with span("local"):
+                raise ValueError("not an upstream")
+
+    asyncio.run(run())
+    assert (errors._value.get(), timeouts._value.get()) == (before[0] + 1, before[1] + 1)
+
+
+def test_deadline_adapts_and_slow_reads_are_hedged():
+    attempts = []
+
+    async def read():
+        attempts.append(1)
+        # the first attempt of the hedged call stalls, the second is quick
+        await asyncio.sleep(0.5 if len(attempts) == 31 else 0.002)
+        return len(attempts)
+
+    async def run():
+        u = Upstream("t_hedge", max_timeout=5.0)
+        assert u.deadline() == 5.0  # nothing observed yet
+        for _ in range(30):
+            await u.call(read, hedge=True)
+        assert u.deadline() < 1.0  # p99 * multiplier, clamped to adaptive_timeout_min
+        start = time.perf_counter()
+        result = await u.call(read, hedge=True)
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == 32 and elapsed < 0.3
+
+
+def test_price_falls_back_immediately_while_coingecko_is_open():
+    from app.services.price_service import PriceService
+
+    async def run():
+        svc = PriceService()
+        breaker = svc._upstream.breaker
+        saved = breaker.state, breaker._opened_at
+        breaker._set(OPEN)
+        breaker._opened_at = time.monotonic()
+        try:
+            start = time.perf_counter()
+            snap, live = await svc._fetch()
+            return snap, time.perf_counter() - start, live
+        finally:
+            breaker._set(saved[0])
+            breaker._opened_at = saved[1]
+
+    snap, elapsed, live = asyncio.run(run())
+    assert snap["asset"] == "ETH" and not live
+    assert elapsed < 0.01
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import delete, select
+
+from app.db.bulk import upsert
+from app.db.models import ChainEvent, LeaderboardEntry
+from app.db.session import AsyncSessionLocal, engine
+from app.services.leaderboard_service import LeaderboardService
+from app.services.scoring_service import ScoringService, score_round
+
+
+def test_score_round_groups_per_address():
+    s = score_round(["0xb", "0xa", "0xb"], [110.0, 90.0, 100.0], 100.0)
+    assert s.addresses.tolist() == ["0xa", "0xb"]
+    assert s.predictions.tolist() == [1, 2]
+    np.testing.assert_allclose(s.avg_error, [10.0, 5.0])
+    np.testing.assert_allclose(s.accuracy, [0.9, 0.95])
+
+
+def test_rounds_fold_into_running_averages_once():
+    a, b = "0x" + "a1" * 20, "0x" + "b2" * 20
+    svc = ScoringService()
+
+    async def run():
+        first = await svc.resolve_round("round-1", [a, b], [2500.0, 2000.0], 2500.0)
+        again = await svc.resolve_round("round-1", [a, b], [2500.0, 2000.0], 2500.0)
+        second = await svc.resolve_round("round-2", [a], [2400.0], 2500.0)
+        async with AsyncSessionLocal() as db:
+            rows = (
+                await db.scalars(
+                    select(LeaderboardEntry)
+                    .where(LeaderboardEntry.user_address.in_([a, b]))
+                    .order_by(LeaderboardEntry.user_address)
+                )
+            ).all()
+        stats = [(r.total_predictions, r.avg_error, r.accuracy_score) for r in rows]
+        return first, again, second, stats
+
+    first, again, second, rows = asyncio.run(run())
+    assert (first, again, second) == (2, 0, 1)
+    (na, ea, ca), (nb, eb, cb) = rows
+    assert na == 2 and abs(ea - 50.0) < 1e-9 and abs(ca - 0.98) < 1e-9
+    assert nb == 1 and abs(eb - 500.0) < 1e-9 and abs(cb - 0.8) < 1e-9
+
+
+def test_leaderboard_reload_reads_only_changes():
+    svc = LeaderboardService()
+    changes = []
+    svc.subscribe(lambda: changes.append(svc.version))
+    other = "0x" + "c3" * 20
+
+    async def run():
+        await asyncio.gather(svc._seed(), svc._seed())  # racing first loads: no IntegrityError
+        await svc._load()
+        loaded = len(svc.index)
+        await svc._load()  # nothing changed: no event
+        unchanged = len(changes)
+        now = datetime.utcnow()
+        async with engine.begin() as conn:  # a write by another worker
+            await upsert(
+                conn,
+                LeaderboardEntry.__table__,
+                [
+                    {
+                        "user_address": other,
+                        "accuracy_score": 0.5,
+                        "total_predictions": 3,
+                        "avg_error": 7.0,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                ],
+                ["user_address"],
+                update=["accuracy_score", "total_predictions", "avg_error", "updated_at"],
+            )
+        await svc._load()
+        return loaded, unchanged
+
+    loaded, unchanged = asyncio.run(run())
+    assert loaded >= 3 and unchanged == 1
+    assert len(changes) == 2 and svc.index.get(other).total_predictions == 3
+
+
+def test_resolve_pending_scores_indexed_events():
+    users = ["0x" + f"{i:040x}" for i in range(1, 4)]
+
+    def event(i, name, user, value):
+        return {
+            "block_number": i, "block_hash": "0x" + "00" * 32, "transaction_hash": f"0xscore{i}",
+            "log_index": 0, "event": name, "user_address": user, "value": value,
+            "event_timestamp": 0,
+        }
+
+    rows = [event(i + 1, "PredictionStored", u, 200000 + i * 1000) for i, u in enumerate(users)]
+    rows.append(event(10, "Resolved", None, 200000))
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(delete(ChainEvent))  # only this test's events form the round
+            await upsert(conn, ChainEvent.__table__, rows, ["transaction_hash", "log_index"])
+        svc = ScoringService()
+        scored = await svc.resolve_pending()
+        async with AsyncSessionLocal() as db:
+            errors = (
+                await db.scalars(
+                    select(LeaderboardEntry.avg_error)
+                    .where(LeaderboardEntry.user_address.in_(users))
+                    .order_by(LeaderboardEntry.user_address)
+                )
+            ).all()
+        return scored, await svc.resolve_pending(), errors
+
+    scored, rescored, errors = asyncio.run(run())
+    assert scored == 3 and rescored == 0
+    assert errors == [0.0, 10.0, 20.0]  # values are unscaled (price * 100 on chain)
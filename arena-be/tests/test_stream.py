@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.services.ranking import RankedEntry
+from app.utils.broadcast import RESYNC, Broadcaster
+from main import app
+
+client = TestClient(app)
+
+
+def test_slow_subscriber_is_resynced_not_blocking():
+    async def run():
+        hub = Broadcaster(maxsize=2)
+        fast, slow = hub.subscribe(["price"]), hub.subscribe(["price"])
+        got = []
+        for i in range(3):
+            hub.publish("price", "price", {"i": i})
+            got.append(await fast.get(0))
+        backlog = [await slow.get(0), await slow.get(0)]
+        slow.close()
+        return got, backlog, len(hub)
+
+    got, backlog, remaining = asyncio.run(run())
+    assert [json.loads(m.json)["data"]["i"] for m in got] == [0, 1, 2]
+    assert got[0].sse.startswith(b"event: price\ndata: ")
+    assert backlog == [RESYNC, None]  # third message overflowed: backlog dropped
+    assert remaining == 1
+
+
+def test_websocket_snapshot_then_leaderboard_diff():
+    from app.services import leaderboard
+
+    with client.websocket_connect("/api/v1/ws?topics=leaderboard") as ws:
+        snap = json.loads(ws.receive_text())
+        assert snap["type"] == "leaderboard.snapshot" and snap["data"]["entries"]
+        leader = RankedEntry("0x" + "ee" * 20, 1.0, 999, 0.5)
+        leaderboard.apply([leader])  # published from this thread to the server's loop
+        diff = json.loads(ws.receive_text())
+    assert diff["type"] == "leaderboard.diff"
+    top = [r for r in diff["data"]["upserts"] if r["user_address"] == leader.user_address]
+    assert top and top[0]["rank"] == 1
+    leaderboard.index.remove(leader.user_address)
+
+
+def test_stream_rejects_unknown_topics():
+    assert client.get("/api/v1/stream?topics=price,weather").status_code == 400
@@ -16,7 +16,13 @@ if (!fs.existsSync(artifact)) {
 }
 
 const { abi } = JSON.parse(fs.readFileSync(artifact, "utf8"));
-const feDir = path.join(__dirname, "..", "..", "arena-fe", "src", "abi");
-fs.mkdirSync(feDir, { recursive: true });
-fs.writeFileSync(path.join(feDir, "PredictionArena.json"), JSON.stringify({ abi }, null, 2));
-console.log("ABI exported to arena-fe/src/abi/PredictionArena.json");
+const targets = [
+  ["arena-fe", "src", "abi"],
+  ["arena-be", "app", "abi"], // backend tx submission + event indexer
+];
+for (const parts of targets) {
+  const dir = path.join(__dirname, "..", "..", ...parts);
+  fs.mkdirSync(dir, { recursive: true });
+  fs.writeFileSync(path.join(dir, "PredictionArena.json"), JSON.stringify({ abi }, null, 2) + "\n");
+  console.log(`ABI exported to ${parts.join("/")}/PredictionArena.json`);
+}
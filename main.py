@@ -1,31 +1,31 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
 from app.api.routes import api_router
+from app.middleware.pipeline import RequestPipelineMiddleware
+from app.services.container import container
 from app.utils.logger import logger
+from app.utils.metrics_store import exporter
 from config import get_settings
-from app.middleware.request_id import RequestIdMiddleware
-from app.middleware.rate_limit import RateLimitMiddleware
-from app.middleware.metrics import MetricsMiddleware
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from fastapi.responses import PlainTextResponse
-from app.db.models import Base
-from app.db.session import engine
-from contextlib import asynccontextmanager
 
 settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: services are built in the background; /ready flips once they are up
     logger.info("🚀 Backend online – Gemini + ML + Blockchain")
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("DB tables ensured via metadata.create_all")
-    except Exception as e:
-        logger.error(f"DB init error: {e}")
+    await container.start()
+    await exporter.start()
     yield
-    # Shutdown (no-op for now)
+    # Shutdown: drains buffered prediction records, broadcasts queued transactions
+    await container.stop()
+    # multi-worker metrics: this worker's counters move into the shared archive
+    await exporter.stop()
 
 
 app = FastAPI(
@@ -34,6 +34,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -44,9 +45,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(RequestIdMiddleware)
-app.add_middleware(RateLimitMiddleware)
-app.add_middleware(MetricsMiddleware)
+# request id + rate limit + metrics in one pure-ASGI layer (outermost)
+app.add_middleware(RequestPipelineMiddleware)
 
 app.include_router(api_router, prefix="/api/v1")
 
@@ -58,10 +58,19 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    # readiness (services built, tables ensured, loops running); /health is liveness only
+    if container.ready:
+        return {"status": "ready"}
+    return ORJSONResponse(
+        {"status": container.state, "error": container.error or None}, status_code=503
+    )
+
 @app.get("/metrics")
 async def metrics():
-    data = generate_latest()
-    return PlainTextResponse(content=data.decode("utf-8"), media_type=CONTENT_TYPE_LATEST)
+    # all workers when PROMETHEUS_MULTIPROC_DIR is set, else this process
+    return Response(content=await exporter.render(), media_type=CONTENT_TYPE_LATEST)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)